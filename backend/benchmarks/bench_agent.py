@@ -0,0 +1,135 @@
+"""Sync WSGI vs async ASGI throughput of the agent endpoint.
+
+    python benchmarks/bench_agent.py --requests 400 --concurrency 200 --latency 0.5
+
+Starts the fake LLM server, then gunicorn (sync view, /api/agent/) and
+uvicorn (async view, /api/agent/async/) in turn, each with the same number
+of workers, and fires the same chat-only load at both. Requires gunicorn,
+uvicorn and httpx. Both servers run on a migrated scratch copy of the
+database, with the response cache and rate limits disabled so every
+request reaches the fake LLM.
+
+Measured on a single-core container (400 requests, 0.5s LLM latency,
+2 workers, 8 gunicorn threads per worker; the fake LLM shares the core):
+
+    concurrency 100
+    sync WSGI          25.4 req/s   p50    3433 ms   p95    3980 ms   errors 0
+    async ASGI         31.9 req/s   p50    2149 ms   p95    6831 ms   errors 0
+    concurrency 200
+    sync WSGI          23.9 req/s   p50    6026 ms   p95    8496 ms   errors 0
+    async ASGI         34.8 req/s   p50    4363 ms   p95    7622 ms   errors 1
+
+The sync side is capped at workers x threads concurrent LLM calls; with
+one core both are CPU-bound well before the async side's cap, so expect
+a wider gap on more cores.
+"""
+import argparse, asyncio, os, shutil, statistics, subprocess, sys, tempfile, time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from fake_llm import serve  # noqa: E402
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def start_server(cmd, env):
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return proc
+
+
+def wait_ready(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server at {url} did not start")
+
+
+async def load(url, total, concurrency):
+    sem = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async with httpx.AsyncClient(timeout=120, limits=httpx.Limits(max_connections=concurrency)) as http:
+        async def one(i):
+            nonlocal errors
+            async with sem:
+                t0 = time.perf_counter()
+                try:
+                    r = await http.post(url, json={"input": f"my laptop is slow, any tips? #{i}"})
+                    r.raise_for_status()
+                    latencies.append(time.perf_counter() - t0)
+                except httpx.HTTPError:
+                    errors += 1
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50": statistics.median(latencies) if latencies else float("nan"),
+        "p95": latencies[int(len(latencies) * 0.95) - 1] if latencies else float("nan"),
+        "errors": errors,
+    }
+
+
+def run(label, cmd, url, env, args):
+    proc = start_server(cmd, env)
+    try:
+        wait_ready(url.rsplit("/api/", 1)[0] + "/")
+        stats = asyncio.run(load(url, args.requests, args.concurrency))
+    finally:
+        proc.terminate()
+        proc.wait()
+    print(f"{label:<14} {stats['rps']:>8.1f} req/s   p50 {stats['p50']*1000:>7.0f} ms   "
+          f"p95 {stats['p95']*1000:>7.0f} ms   errors {stats['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.5, help="fake LLM latency (s)")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=8, help="gunicorn threads per worker")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--llm-port", type=int, default=8765)
+    args = parser.parse_args()
+
+    serve(args.llm_port, args.latency, background=True)
+    scratch = tempfile.mkdtemp(prefix="bench_agent_")
+    env = dict(
+        os.environ,
+        GROQ_BASE_URL=f"http://127.0.0.1:{args.llm_port}",
+        GROQ_API_KEY="bench",
+        LLM_CACHE_BACKEND="none",
+        LLM_MAX_CONCURRENCY=str(args.concurrency),
+        RATE_LIMIT_ENABLED="0",
+        SQLITE_PATH=os.path.join(scratch, "db.sqlite3"),
+        SQLITE_WAL="1",
+        DEBUG="False",
+    )
+    subprocess.run([sys.executable, "manage.py", "migrate", "-v", "0"], cwd=BACKEND_DIR, env=env, check=True)
+    base = f"http://127.0.0.1:{args.port}"
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}, LLM latency {args.latency}s, "
+          f"{args.workers} workers")
+    run("sync WSGI", [
+        sys.executable, "-m", "gunicorn", "mimic_backend.wsgi",
+        "--workers", str(args.workers), "--threads", str(args.threads), "--bind", f"127.0.0.1:{args.port}",
+    ], f"{base}/api/agent/", env, args)
+    run("async ASGI", [
+        sys.executable, "-m", "uvicorn", "mimic_backend.asgi:application",
+        "--workers", str(args.workers), "--port", str(args.port), "--log-level", "warning",
+    ], f"{base}/api/agent/async/", env, args)
+    shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
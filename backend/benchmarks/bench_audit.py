@@ -0,0 +1,87 @@
+"""Audit-log throughput: one INSERT per row ("sync") vs the write-behind sink ("buffered").
+
+    python benchmarks/bench_audit.py --threads 8 --rows 2000
+
+Runs against a throwaway SQLite file (migrated on start), never db.sqlite3.
+Each of --threads request-like threads records --rows Log rows; the clock
+stops once every row is durable, i.e. after the buffered sink's final
+flush. Reports rows/s and the per-record latency a request pays.
+"""
+import argparse, os, statistics, sys, tempfile, threading, time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mimic_backend.settings")
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from main.models import Log  # noqa: E402
+from mimic_backend.audit import BufferedSink, SyncSink  # noqa: E402
+
+
+def run(sink, threads, rows):
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(n):
+        mine = []
+        for i in range(rows):
+            start = time.perf_counter()
+            sink.record(Log(user=f"bench{n}", log_type="chat", action=f"message {i}"))
+            mine.append(time.perf_counter() - start)
+        connection.close()
+        with lock:
+            latencies.extend(mine)
+
+    start = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    sink.close()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rows/s": threads * rows / elapsed,
+        "record p50 ms": statistics.median(latencies) * 1000,
+        "record p99 ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--flush-interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.DATABASES["default"]["NAME"] = os.path.join(tmp, "bench.sqlite3")
+        settings.DATABASES["default"].setdefault("OPTIONS", {})["timeout"] = 30
+        call_command("migrate", verbosity=0)
+
+        results = {
+            "sync": run(SyncSink(), args.threads, args.rows),
+            "buffered": run(BufferedSink(args.batch_size, args.flush_interval), args.threads, args.rows),
+        }
+        expected = 2 * args.threads * args.rows
+        assert Log.objects.count() == expected, f"{Log.objects.count()} rows written, expected {expected}"
+        connection.close()
+
+    print(f"{args.threads} threads x {args.rows} rows, batch {args.batch_size}, interval {args.flush_interval}s")
+    print(f"{'mode':>9} {'rows/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for mode, r in results.items():
+        print(f"{mode:>9} {r['rows/s']:>10.0f} {r['record p50 ms']:>8.3f} {r['record p99 ms']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Concurrent writers against the configured database profile.
+
+    python benchmarks/bench_db.py --procs 8 --writes 300
+    DB_PROFILE=postgres POSTGRES_DB=mimic_bench python benchmarks/bench_db.py
+
+Each of --procs processes (like gunicorn workers) performs --writes small
+write transactions, i.e. an AppRequest insert plus its Log row in one
+atomic block. That is the shape of the agent and approval endpoints. A
+reader process keeps paging logs meanwhile.
+
+For SQLite, two runs use a throwaway file, never db.sqlite3: "default" has
+Django's stock settings and "tuned" has the WAL pragmas, busy_timeout and
+IMMEDIATE transactions from settings. For PostgreSQL the configured
+database is used as is; it must be migrated, and the rows the benchmark
+writes are deleted afterwards. Reports commits/s, p50/p99 transaction
+latency and failed transactions ("database is locked").
+"""
+import argparse, multiprocessing as mp, os, statistics, sys, tempfile, time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mimic_backend.settings")
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection, transaction, OperationalError  # noqa: E402
+
+from main.models import AppRequest, Log  # noqa: E402
+
+BENCH_USER = "db-bench"
+TUNED_OPTIONS = dict(settings.DATABASES["default"].get("OPTIONS", {}))
+# WAL even when SQLITE_WAL is off: the benchmark file is a throwaway
+TUNED_PRAGMAS = {"journal_mode": "WAL", "synchronous": "NORMAL", **getattr(settings, "SQLITE_PRAGMAS", {})}
+
+
+def configure(profile):
+    """Point this process at the benchmark database (before its next connection)"""
+    if profile["name"] in ("default", "tuned"):
+        tuned = profile["name"] == "tuned"
+        settings.DATABASES["default"]["NAME"] = profile["path"]
+        settings.DATABASES["default"]["OPTIONS"] = dict(TUNED_OPTIONS) if tuned else {}
+        settings.SQLITE_PRAGMAS = dict(TUNED_PRAGMAS) if tuned else {}
+
+
+def writer(profile, n, writes, out):
+    configure(profile)
+    latencies, failed = [], 0
+    for i in range(writes):
+        start = time.perf_counter()
+        try:
+            with transaction.atomic():
+                req = AppRequest.objects.create(app_name="Zoom", version="5.1", requested_by=BENCH_USER)
+                Log.objects.create(user=BENCH_USER, log_type="install", action=f"request {req.pk} from worker {n}")
+        except OperationalError:
+            failed += 1
+            continue
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+    out.put((latencies, failed))
+
+
+def reader(profile, stop):
+    configure(profile)
+    while not stop.is_set():
+        list(Log.objects.order_by("-timestamp", "-id").values_list("id", "action")[:50])
+    connection.close()
+
+
+def run(profile, procs, writes):
+    ctx = mp.get_context("fork")
+    out, stop = ctx.Queue(), ctx.Event()
+    read = ctx.Process(target=reader, args=(profile, stop))
+    read.start()
+    start = time.perf_counter()
+    pool = [ctx.Process(target=writer, args=(profile, n, writes, out)) for n in range(procs)]
+    for p in pool:
+        p.start()
+    results = [out.get() for _ in pool]
+    elapsed = time.perf_counter() - start
+    for p in pool:
+        p.join()
+    stop.set()
+    read.join()
+
+    latencies = sorted(l for ls, _ in results for l in ls)
+    return {
+        "commits/s": len(latencies) / elapsed,
+        "p50 ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99 ms": latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000 if latencies else 0.0,
+        "failed": sum(f for _, f in results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--procs", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=300)
+    args = parser.parse_args()
+
+    results = {}
+    if settings.DATABASES["default"]["ENGINE"].endswith("sqlite3"):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ("default", "tuned"):
+                profile = {"name": name, "path": os.path.join(tmp, f"{name}.sqlite3")}
+                configure(profile)
+                call_command("migrate", verbosity=0)
+                connection.close()
+                results[f"sqlite {name}"] = run(profile, args.procs, args.writes)
+    else:
+        profile = {"name": "postgres"}
+        connection.close()
+        results["postgres " + ("pool" if settings.DATABASES["default"]["OPTIONS"].get("pool") else "persistent")] = (
+            run(profile, args.procs, args.writes)
+        )
+        Log.objects.filter(user=BENCH_USER).delete()
+        AppRequest.objects.filter(requested_by=BENCH_USER).delete()
+
+    print(f"{args.procs} writer processes x {args.writes} transactions, 1 reader")
+    print(f"{'profile':>18} {'commits/s':>10} {'p50 ms':>8} {'p99 ms':>9} {'failed':>7}")
+    for name, r in results.items():
+        print(f"{name:>18} {r['commits/s']:>10.0f} {r['p50 ms']:>8.2f} {r['p99 ms']:>9.2f} {r['failed']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Trigram AppMatcher vs the old substring + difflib scan, on synthetic catalogs.
+
+    python benchmarks/bench_matcher.py --apps 100 1000 5000 --queries 500
+
+Each query is "install <app name with one typo> <version>". Reports mean
+per-message latency for a cold matcher (first sight of every span) and a
+warm one (spans memoized), next to the difflib loop the chat tab used to
+run, plus how often each picks the intended app.
+"""
+import argparse, difflib, os, random, string, sys, time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import django  # noqa: E402
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mimic_backend.settings")
+django.setup()
+
+from main.app_matcher import AppMatcher  # noqa: E402
+
+
+def make_catalog(n, rng):
+    apps = {}
+    while len(apps) < n:
+        name = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 12))).title()
+        suffix = rng.choice(["", " Pro", " Studio", " Suite"])
+        apps[name + suffix] = ["1.0", "2.0", "latest"]
+    return apps
+
+
+def typo(name, rng):
+    i = rng.randrange(len(name))
+    return name[:i] + rng.choice(string.ascii_lowercase) + name[i + 1:]
+
+
+def old_scan(text, allowed_apps):
+    """The chat tab's previous detection: substring loop, then difflib"""
+    words = text.split()
+    app_from_text = " ".join(words[1:-1])
+    for app in allowed_apps:
+        if app_from_text.lower() in app.lower():
+            return app
+    close = difflib.get_close_matches(app_from_text, allowed_apps, n=1, cutoff=0.5)
+    return close[0] if close else None
+
+
+def timed(fn, queries):
+    hits = 0
+    start = time.perf_counter()
+    for text, expected in queries:
+        hits += fn(text) == expected
+    return (time.perf_counter() - start) / len(queries) * 1000, hits / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--apps", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'apps':>6} {'cold ms':>9} {'warm ms':>9} {'difflib ms':>11} {'trigram acc':>12} {'difflib acc':>12}")
+    for n in args.apps:
+        rng = random.Random(args.seed)
+        apps = make_catalog(n, rng)
+        names = list(apps)
+        queries = [(f"install {typo(name, rng)} 2.0", name) for name in rng.choices(names, k=args.queries)]
+
+        matcher = AppMatcher(apps, aliases={})
+        best = lambda text: getattr(matcher.best(text), "app", None)
+        cold, acc = timed(best, queries)
+        warm, _ = timed(best, queries)
+        # difflib is O(catalog) per message; a sample is enough to time it
+        sample = queries[: max(20, args.queries // 10)]
+        old, old_acc = timed(lambda text: old_scan(text, names), sample)
+        print(f"{n:>6} {cold:>9.3f} {warm:>9.3f} {old:>11.3f} {acc:>12.1%} {old_acc:>12.1%}")
+
+
+if __name__ == "__main__":
+    main()
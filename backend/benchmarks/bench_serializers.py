@@ -0,0 +1,117 @@
+"""List serialization: ModelSerializer + JSONRenderer vs the values_list() fast path.
+
+    python benchmarks/bench_serializers.py --rows 1000 10000 --repeat 5
+
+Runs against a throwaway SQLite file (migrated on start), never db.sqlite3.
+For Log, AppRequest, Task and Ticket it times the whole list body,
+i.e. query + serialization + rendering, three ways:
+
+    serializer   Serializer(qs, many=True).data through JSONRenderer (before)
+    rows         FastRows dicts through the stock JSONRenderer
+    orjson       FastRows dicts through ORJSONRenderer (after)
+
+Every run checks that the three bodies are byte-identical. Rows contain
+non-ASCII text, U+2028, quotes and control characters on purpose. Reports
+the best of --repeat as rows/s.
+"""
+import argparse, os, random, sys, tempfile, time
+from datetime import timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mimic_backend.settings")
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from main.models import AppRequest, Log, Task, Ticket  # noqa: E402
+from main.serializers import AppRequestSerializer, LogSerializer, TaskSerializer, TicketSerializer  # noqa: E402
+from mimic_backend.fastjson import ORJSONRenderer, fast_rows, orjson  # noqa: E402
+
+TEXT = ["install Zoom 5.1", "héllo wörld ✅", 'quote " and \\ backslash', "line\nbreak\ttab", "sep arator", "日本語"]
+CASES = {
+    "Log": (Log, LogSerializer, "-timestamp"),
+    "AppRequest": (AppRequest, AppRequestSerializer, "-created_at"),
+    "Task": (Task, TaskSerializer, "-created_at"),
+    "Ticket": (Ticket, TicketSerializer, "-created_at"),
+}
+
+
+def populate(n, rng):
+    now = timezone.now()
+    ts = lambda: now - timedelta(seconds=rng.randrange(10**7), microseconds=rng.choice([0, rng.randrange(10**6)]))
+    Log.objects.bulk_create(
+        [Log(user=f"user{i % 50}", log_type=rng.choice(["chat", "install", "file", "system"]),
+             action=rng.choice(TEXT), timestamp=ts()) for i in range(n)],
+        batch_size=2000,
+    )
+    AppRequest.objects.bulk_create(
+        [AppRequest(app_name=rng.choice(["Zoom", "Slack", "Visual Studio Code"]), version="1.0",
+                    requested_by=f"user{i % 50}", status=rng.choice(["pending", "approved", "rejected"]),
+                    decided_at=rng.choice([None, ts()]), note=rng.choice([None, *TEXT])) for i in range(n)],
+        batch_size=2000,
+    )
+    Task.objects.bulk_create(
+        [Task(title=rng.choice(TEXT), description=rng.choice([None, *TEXT]), completed=bool(i % 2), created_at=ts())
+         for i in range(n)],
+        batch_size=2000,
+    )
+    Ticket.objects.bulk_create(
+        [Ticket(ticket_id=f"t{i:08x}", user=f"user{i % 50}", action=rng.choice(TEXT), created_at=ts()) for i in range(n)],
+        batch_size=2000,
+    )
+
+
+def bodies(model, serializer_class, ordering, n):
+    qs = model.objects.order_by(ordering)[:n]
+    plan = fast_rows(serializer_class)
+    return {
+        "serializer": lambda: JSONRenderer().render(serializer_class(qs, many=True).data),
+        "rows": lambda: JSONRenderer().render(plan.rows(plan.values(qs))),
+        "orjson": lambda: ORJSONRenderer().render(plan.rows(plan.values(qs))),
+    }
+
+
+def best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.DATABASES["default"]["NAME"] = os.path.join(tmp, "bench.sqlite3")
+        call_command("migrate", verbosity=0)
+        populate(max(args.rows), random.Random(7))
+
+        print(f"orjson {'available' if orjson else 'missing (orjson column uses the stock renderer)'}")
+        print(f"{'model':>11} {'rows':>7} {'serializer':>12} {'rows':>12} {'orjson':>12} {'speedup':>8}")
+        for name, (model, serializer_class, ordering) in CASES.items():
+            for n in args.rows:
+                fns = bodies(model, serializer_class, ordering, n)
+                outputs = {mode: fn() for mode, fn in fns.items()}
+                assert len(set(outputs.values())) == 1, f"{name}: fast path output differs from the serializer"
+                rates = {mode: n / best(fn, args.repeat) for mode, fn in fns.items()}
+                print(f"{name:>11} {n:>7} {rates['serializer']:>12,.0f} {rates['rows']:>12,.0f} "
+                      f"{rates['orjson']:>12,.0f} {rates['orjson'] / rates['serializer']:>7.1f}x")
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Local OpenAI/Groq-compatible chat completion server for benchmarks.
+
+    python benchmarks/fake_llm.py --port 8765 --latency 0.5
+
+Point the backend at it with GROQ_BASE_URL=http://127.0.0.1:8765 and any
+GROQ_API_KEY. Every completion takes `latency` seconds; streaming requests
+(stream=true) get SSE chunks spread over that time.
+"""
+import argparse, json, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(latency):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            prompt = body.get("messages", [{}])[-1].get("content", "")
+            reply = f"(fake) You asked: {prompt}"
+            try:
+                if body.get("stream"):
+                    self._stream(body, reply)
+                else:
+                    self._complete(body, reply)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # client timed out and cancelled the call
+
+        def _complete(self, body, reply):
+            time.sleep(latency)
+            payload = json.dumps({
+                "id": "fake-1",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": reply},
+                }],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _stream(self, body, reply):
+            # Latency is spread over the tokens, like a real completion
+            tokens = reply.split(" ")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for i, token in enumerate(tokens):
+                time.sleep(latency / len(tokens))
+                chunk = {
+                    "id": "fake-1",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": body.get("model", "fake"),
+                    "choices": [{"index": 0, "delta": {"content": token + (" " if i < len(tokens) - 1 else "")},
+                                 "finish_reason": None}],
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.close_connection = True
+
+    return Handler
+
+
+def serve(port=8765, latency=0.5, background=False):
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(latency))
+    server.daemon_threads = True
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5)
+    args = parser.parse_args()
+    serve(args.port, args.latency)
@@ -0,0 +1,235 @@
+# core/export_jobs.py
+"""Background log exports.
+
+A job is identified by a content key: the hash of its parameters plus a
+cheap version of the rows it covers (count, max id, max timestamp). Two
+users asking for the same export share one job, and a finished artifact is
+served from EXPORT_CACHE_DIR until new logs change the key. Job state is
+mirrored to a JSON sidecar next to the artifact so any worker process can
+answer status polls.
+
+Across worker processes the build is claimed by creating <key>.<fmt>.part
+with O_EXCL: a second worker asked for the same export finds the sidecar
+(or the part file) in progress and reports that job instead of writing
+its own copy. A build that stops making progress for PART_STALE seconds
+is considered dead and may be taken over.
+"""
+import hashlib, json, os, re, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Max
+from rest_framework.exceptions import ValidationError
+
+from main.views import _parse_bound as parse_query_bound
+from .models import InstallLog
+from . import exporters
+
+JOB_ID_RE = re.compile(r"^[0-9a-f]{64}$")
+PROGRESS_EVERY = 1000   # rows between sidecar updates
+PART_STALE = 300        # seconds without progress before a build is taken over
+
+
+class ExportError(ValueError):
+    pass
+
+
+# --------------------------- QUERY --------------------------- #
+def _parse_bound(value, name):
+    """ISO datetime or date (taken as midnight), parsed like the /api/logs/ bounds"""
+    try:
+        return parse_query_bound(value, name)
+    except ValidationError:
+        raise ExportError(f"Invalid {name}: {value}") from None
+
+def log_queryset(role="user", user="", since=None, until=None):
+    """InstallLog rows visible to role/user, optionally limited to [since, until)"""
+    if role in ("admin", "manager"):
+        logs = InstallLog.objects.all()
+    else:
+        logs = InstallLog.objects.filter(user_prompt__icontains=user)
+    if since:
+        logs = logs.filter(timestamp__gte=_parse_bound(since, "since"))
+    if until:
+        logs = logs.filter(timestamp__lt=_parse_bound(until, "until"))
+    return logs.order_by("-timestamp")
+
+
+# --------------------------- CACHE --------------------------- #
+def cache_dir():
+    path = Path(getattr(settings, "EXPORT_CACHE_DIR", settings.BASE_DIR / "export_cache"))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+def _sidecar(job_id):
+    return cache_dir() / f"{job_id}.json"
+
+def _building_elsewhere(job_id, part):
+    """Whether some worker made progress on this build within PART_STALE seconds"""
+    newest = 0
+    for path in (part, _sidecar(job_id)):
+        try:
+            newest = max(newest, path.stat().st_mtime)
+        except FileNotFoundError:
+            pass
+    return part.exists() and time.time() - newest < PART_STALE
+
+def _claim_part(job_id, part):
+    """Create the part file exclusively → its fd, or None while another worker builds it"""
+    for _ in range(2):
+        try:
+            return os.open(part, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            if _building_elsewhere(job_id, part):
+                return None
+            part.unlink(missing_ok=True)   # left by a dead build
+    return None
+
+def prune_cache():
+    """Drop artifacts older than EXPORT_CACHE_MAX_AGE seconds"""
+    cutoff = time.time() - getattr(settings, "EXPORT_CACHE_MAX_AGE", 24 * 3600)
+    for path in cache_dir().iterdir():
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+# --------------------------- JOBS --------------------------- #
+class ExportJob:
+    def __init__(self, job_id, fmt, params, total):
+        self.job_id = job_id
+        self.fmt = fmt
+        self.params = params
+        self.total = total
+        self.rows = 0
+        self.status = "queued"
+        self.error = None
+
+    @property
+    def path(self):
+        return cache_dir() / f"{self.job_id}.{self.fmt}"
+
+    @property
+    def part(self):
+        return cache_dir() / f"{self.job_id}.{self.fmt}.part"
+
+    def to_dict(self):
+        progress = 1.0 if self.status == "done" else (self.rows / self.total if self.total else 0.0)
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "progress": round(progress, 4),
+            "rows": self.rows,
+            "total": self.total,
+            "format": self.fmt,
+            "params": self.params,
+            "error": self.error,
+        }
+
+    def save(self):
+        tmp = _sidecar(self.job_id).with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(self.to_dict()))
+        os.replace(tmp, _sidecar(self.job_id))
+
+    @classmethod
+    def load(cls, job_id):
+        try:
+            data = json.loads(_sidecar(job_id).read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+        job = cls(job_id, data["format"], data["params"], data["total"])
+        job.rows, job.status, job.error = data["rows"], data["status"], data["error"]
+        if job.path.exists():   # the artifact is the truth, whatever a late sidecar write says
+            job.status, job.rows = "done", job.total
+        return job
+
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+_executor = None
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "EXPORT_WORKERS", 2), thread_name_prefix="log-export"
+        )
+    return _executor
+
+
+def _run(job):
+    fd = _claim_part(job.job_id, job.part)
+    if fd is None:   # another worker is writing this artifact; its sidecar answers polls
+        with _jobs_lock:
+            _jobs.pop(job.job_id, None)
+        return
+    try:
+        job.status = "running"
+        job.save()
+        qs = log_queryset(**job.params)
+
+        def counted(rows):
+            for row in rows:
+                job.rows += 1
+                if job.rows % PROGRESS_EVERY == 0:
+                    job.save()
+                yield row
+
+        with os.fdopen(fd, "wb") as out:
+            exporters.WRITERS[job.fmt](counted(exporters.iter_rows(qs)), out)
+        os.replace(job.part, job.path)
+        job.status = "done"
+    except Exception as e:
+        job.status = "failed"
+        job.error = str(e)
+        job.part.unlink(missing_ok=True)
+    finally:
+        job.save()
+        with _jobs_lock:
+            _jobs.pop(job.job_id, None)
+        connection.close()   # this thread's connection; the pool thread is reused
+
+
+def submit(role="user", user="", since=None, until=None, fmt="xlsx"):
+    """Start (or join) the export for these parameters and return its job"""
+    if fmt not in exporters.WRITERS:
+        raise ExportError(f"fmt must be one of {sorted(exporters.WRITERS)}")
+    if fmt == "parquet" and not exporters.parquet_available():
+        raise ExportError("parquet export requires pyarrow")
+
+    params = {"role": role, "user": "" if role in ("admin", "manager") else user, "since": since, "until": until}
+    version = log_queryset(**params).aggregate(n=Count("id"), last_id=Max("id"), last_ts=Max("timestamp"))
+    raw = json.dumps({"params": params, "fmt": fmt, "version": version}, sort_keys=True, default=str)
+    job_id = hashlib.sha256(raw.encode()).hexdigest()
+
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is not None:
+            return job
+        job = ExportJob(job_id, fmt, params, version["n"])
+        if job.path.exists():
+            job.status, job.rows = "done", job.total
+            os.utime(job.path)   # keep recently requested artifacts from being pruned
+            job.save()
+            return job
+        other = ExportJob.load(job_id)
+        if other is not None and other.status in ("queued", "running") and _building_elsewhere(job_id, job.part):
+            return other   # another worker process is building it
+        _jobs[job_id] = job
+        job.save()
+
+    prune_cache()
+    _get_executor().submit(_run, job)
+    return job
+
+
+def get_job(job_id):
+    if not JOB_ID_RE.match(job_id):
+        return None
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    return job or ExportJob.load(job_id)
@@ -0,0 +1,102 @@
+# core/exporters.py
+"""Constant-memory exports of InstallLog rows.
+
+Rows come straight from the database in chunks (`.values_list().iterator()`)
+with the app name joined and the timestamp formatted in SQL, so neither
+model instances nor the full result set are ever held in memory.
+"""
+import csv, tempfile
+
+from main.log_query import FormatTimestamp
+
+HEADERS = ["timestamp", "app", "version", "status", "user_prompt"]
+FIELDS = [FormatTimestamp("timestamp"), "app__app_name", "version", "status", "user_prompt"]
+CHUNK_SIZE = 2000
+
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def iter_rows(queryset, chunk_size=CHUNK_SIZE):
+    """Yield export rows as tuples (timestamp already formatted like the old export)"""
+    return queryset.values_list(*FIELDS).iterator(chunk_size=chunk_size)
+
+
+# --------------------------- CSV --------------------------- #
+class _Echo:
+    """File-like object whose write() just hands the line back"""
+    def write(self, value):
+        return value
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(HEADERS)
+    for row in rows:
+        yield writer.writerow(row)
+
+def write_csv(rows, out=None):
+    out = out if out is not None else tempfile.TemporaryFile()
+    for line in stream_csv(rows):
+        out.write(line.encode())
+    out.seek(0)
+    return out
+
+
+# --------------------------- XLSX --------------------------- #
+def write_xlsx(rows, out=None):
+    """Write rows with xlsxwriter's constant_memory mode to `out` (default: an anonymous temp file).
+
+    An xlsx is a zip whose directory comes last, so it can't be streamed while
+    it's built; the temp file is served from disk and deleted when closed.
+    """
+    import xlsxwriter
+
+    out = out if out is not None else tempfile.TemporaryFile()
+    wb = xlsxwriter.Workbook(out, {"constant_memory": True})
+    ws = wb.add_worksheet("logs")
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        ws.write_column(0, 0, ["info", "no logs"])
+    else:
+        ws.write_row(0, 0, HEADERS)
+        ws.write_row(1, 0, first)
+        for n, row in enumerate(rows, start=2):
+            ws.write_row(n, 0, row)
+    wb.close()
+    out.seek(0)
+    return out
+
+
+# --------------------------- PARQUET --------------------------- #
+def parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def write_parquet(rows, out=None, chunk_size=CHUNK_SIZE):
+    """Write rows as parquet row groups of chunk_size to `out` (default: an anonymous temp file)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(name, pa.string()) for name in HEADERS])
+    out = out if out is not None else tempfile.TemporaryFile()
+    with pq.ParquetWriter(out, schema) as writer:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                writer.write_table(pa.Table.from_pylist([dict(zip(HEADERS, r)) for r in batch], schema))
+                batch = []
+        if batch:
+            writer.write_table(pa.Table.from_pylist([dict(zip(HEADERS, r)) for r in batch], schema))
+    out.seek(0)
+    return out
+
+
+WRITERS = {"csv": write_csv, "xlsx": write_xlsx, "parquet": write_parquet}
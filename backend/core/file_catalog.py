@@ -0,0 +1,301 @@
+# core/file_catalog.py
+"""Role-aware file catalog: search index over core.models.File and ranged downloads from disk.
+
+Filenames are folded to lowercase alphanumeric words. The index keeps a
+sorted (word, file id) list for prefix lookups (bisect, no scan) and
+per-word character-trigram postings for typos, so "zoo inst" finds
+"Zoom_Installer.exe" and "instaler" still ranks it. Results are scoped to
+the role: public files are visible to everyone, private ones only in the
+categories FILE_PERMISSIONS grants the role ("*" for all of them).
+
+The index is process-wide and rebuilt when the File table changes. Local
+saves and deletes invalidate it immediately; other processes' writes are
+picked up after FILE_INDEX_REFRESH seconds.
+
+Files live under FILE_STORAGE_DIR (File.path is relative to it). See
+file_response() for how downloads are served.
+"""
+import mimetypes, os, re, threading, time
+from bisect import bisect_left
+from collections import Counter, namedtuple
+from itertools import chain
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_save
+from django.http import FileResponse, HttpResponse
+from django.utils.http import content_disposition_header, parse_etags
+
+from .models import File
+
+ALL_CATEGORIES = "*"
+DEFAULT_PERMISSIONS = {            # role → categories of private files it may see
+    "manager": ["general", "finance"],
+    "admin": [ALL_CATEGORIES],
+}
+WORD_RE = re.compile(r"[a-z0-9]+")
+TRIGRAM_CUTOFF = 0.6   # share of the query's trigrams a filename must contain
+SHORTLIST = 50
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+CATEGORY_BY_EXT = {
+    **dict.fromkeys((".exe", ".msi", ".dmg", ".pkg", ".deb", ".rpm", ".appimage"), "installers"),
+    **dict.fromkeys((".pdf", ".doc", ".docx", ".txt", ".md", ".xlsx", ".csv", ".pptx"), "documents"),
+    **dict.fromkeys((".zip", ".tar", ".gz", ".7z", ".iso"), "archives"),
+    **dict.fromkeys((".png", ".jpg", ".jpeg", ".gif", ".svg"), "images"),
+}
+
+Entry = namedtuple("Entry", "id filename category size is_public")
+
+
+def _words(text):
+    return WORD_RE.findall(text.lower())
+
+def _trigrams(words):
+    grams = set()
+    for word in words:
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def guess_category(relpath):
+    """Top-level folder under FILE_STORAGE_DIR, else by extension"""
+    parts = Path(relpath).parts
+    if len(parts) > 1:
+        return parts[0].lower()
+    return CATEGORY_BY_EXT.get(Path(relpath).suffix.lower(), "other")
+
+def private_categories(role):
+    """Categories of private files the role may see; None means every category"""
+    categories = getattr(settings, "FILE_PERMISSIONS", DEFAULT_PERMISSIONS).get(role, ())
+    return None if ALL_CATEGORIES in categories else frozenset(categories)
+
+def can_see(role, is_public, category):
+    if is_public:
+        return True
+    categories = private_categories(role)
+    return categories is None or category in categories
+
+
+# --------------------------- INDEX --------------------------- #
+class FileIndex:
+    def __init__(self, entries):
+        self.entries = {e.id: e for e in entries}
+        self._prefix = sorted((word, e.id) for e in entries for word in set(_words(e.filename)))
+        self._postings = {}                    # trigram → [file id]
+        for e in entries:
+            for gram in _trigrams(_words(e.filename)):
+                self._postings.setdefault(gram, []).append(e.id)
+
+    @classmethod
+    def from_db(cls):
+        return cls([Entry(*row) for row in File.objects.values_list(*Entry._fields)])
+
+    def visible(self, role, category=None):
+        """Files the role may see, in the listing order (public first)"""
+        rows = [
+            e for e in self.entries.values()
+            if can_see(role, e.is_public, e.category) and (not category or e.category == category)
+        ]
+        return sorted(rows, key=lambda e: (not e.is_public, e.filename))
+
+    def categories(self, role):
+        return sorted({e.category for e in self.visible(role) if e.category})
+
+    def _prefixed(self, word):
+        """File ids with a filename word starting with `word`"""
+        ids = set()
+        for token, file_id in self._prefix[bisect_left(self._prefix, (word,)):]:
+            if not token.startswith(word):
+                break
+            ids.add(file_id)
+        return ids
+
+    def search(self, query, role, category=None, limit=50):
+        """[(Entry, score)] best first; every query word must prefix-match, else trigram similarity ranks"""
+        words = _words(query)
+        if not words:
+            return [(e, 1.0) for e in self.visible(role, category)[:limit]]
+
+        # Prefix hits: each query word must start some filename word
+        hits = set.intersection(*(self._prefixed(w) for w in words))
+        scores = {file_id: 1.0 for file_id in hits}
+
+        # Typos: share of the query's trigrams found in the name, for the names sharing the most
+        grams = _trigrams(words)
+        shared = Counter(chain.from_iterable(self._postings.get(g, ()) for g in grams))
+        for file_id, n in shared.most_common(SHORTLIST):
+            score = n / len(grams)
+            if score >= TRIGRAM_CUTOFF and file_id not in scores:
+                scores[file_id] = round(score, 4)
+
+        found = [
+            (self.entries[file_id], score) for file_id, score in scores.items()
+            if can_see(role, self.entries[file_id].is_public, self.entries[file_id].category)
+            and (not category or self.entries[file_id].category == category)
+        ]
+        found.sort(key=lambda item: (-item[1], item[0].filename))
+        return found[:limit]
+
+
+# --------------------------- SHARED INDEX --------------------------- #
+_index = None
+_signature = None
+_checked_at = float("-inf")
+_index_lock = threading.Lock()
+
+def _table_signature():
+    return tuple(File.objects.aggregate(n=Count("id"), last_id=Max("id"), last=Max("updated_at")).values())
+
+def get_index():
+    """Process-wide index, rebuilt when the File table changed"""
+    global _index, _signature, _checked_at
+    refresh = getattr(settings, "FILE_INDEX_REFRESH", 30)
+    if _index is not None and time.monotonic() - _checked_at < refresh:
+        return _index
+    with _index_lock:
+        if _index is None or time.monotonic() - _checked_at >= refresh:
+            signature = _table_signature()
+            if _index is None or signature != _signature:
+                _index, _signature = FileIndex.from_db(), signature
+            _checked_at = time.monotonic()
+    return _index
+
+def _invalidate(sender, **kwargs):
+    def expire():
+        global _checked_at
+        _checked_at = float("-inf")   # next get_index() compares signatures and rebuilds
+    transaction.on_commit(expire)
+
+post_save.connect(_invalidate, sender=File, dispatch_uid="file-index-save")
+post_delete.connect(_invalidate, sender=File, dispatch_uid="file-index-delete")
+
+
+# --------------------------- STORAGE --------------------------- #
+def storage_root():
+    return Path(getattr(settings, "FILE_STORAGE_DIR", settings.BASE_DIR / "files")).resolve()
+
+def resolve_path(f):
+    """Absolute path of f on disk, or None when it has none (or points outside the storage root)"""
+    if not f.path:
+        return None
+    root = storage_root()
+    path = (root / f.path).resolve()
+    if root not in path.parents or not path.is_file():
+        return None
+    return path
+
+
+# --------------------------- DOWNLOADS --------------------------- #
+class _FileRange:
+    """Read-only view of bytes [start, start + length) of an open file.
+
+    fileno() is the real file's and the offset is already at `start`, so a
+    WSGI file_wrapper that uses os.sendfile (gunicorn) sends the range
+    zero-copy, bounded by Content-Length; other servers read() it in blocks.
+    """
+
+    def __init__(self, f, start, length):
+        self._f = f
+        self._left = length
+        f.seek(start)
+
+    def read(self, size=-1):
+        if self._left <= 0:
+            return b""
+        size = self._left if size is None or size < 0 else min(size, self._left)
+        data = self._f.read(size)
+        self._left -= len(data)
+        return data
+
+    def fileno(self):
+        return self._f.fileno()
+
+    def close(self):
+        self._f.close()
+
+
+def parse_range(header, size):
+    """(start, end) inclusive for a single "bytes=" range, None to serve it all, or ValueError if unsatisfiable"""
+    m = RANGE_RE.match(header.strip()) if header else None
+    if not m or not any(m.groups()):
+        return None   # absent, malformed or multi-range → whole file (RFC 9110 allows ignoring Range)
+    first, last = m.groups()
+    if not first:    # suffix range: the last N bytes
+        n = int(last)
+        if n == 0:
+            raise ValueError("empty suffix range")
+        return max(size - n, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("range not satisfiable")
+    return start, end
+
+
+def _etag(stat):
+    return f'"{stat.st_size:x}-{int(stat.st_mtime_ns):x}"'
+
+
+def file_response(request, path, filename, etag=None, root=None):
+    """Stream `path` as an attachment, honouring Range / If-Range / If-None-Match.
+
+    etag defaults to one derived from size and mtime; root (default
+    FILE_STORAGE_DIR) is what X-Accel-Redirect paths are relative to.
+
+    - FILE_SENDFILE = "x-sendfile" or "x-accel-redirect": the body is left
+      to the front web server (which handles Range itself). For nginx the
+      internal location is FILE_SENDFILE_PREFIX + the path relative to root.
+    - Otherwise a FileResponse wraps the open file handle, so bytes never sit
+      in Python memory and the WSGI server can use sendfile.
+    """
+    mode = getattr(settings, "FILE_SENDFILE", "")
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    if mode in ("x-sendfile", "x-accel-redirect"):
+        response = HttpResponse(content_type=content_type)
+        if mode == "x-sendfile":
+            response["X-Sendfile"] = str(path)
+        else:
+            prefix = getattr(settings, "FILE_SENDFILE_PREFIX", "/protected-files/")
+            relpath = path.resolve().relative_to((root or storage_root()).resolve()).as_posix()
+            response["X-Accel-Redirect"] = prefix.rstrip("/") + "/" + relpath
+        response["Content-Disposition"] = content_disposition_header(True, filename)
+        if etag:
+            response["ETag"] = etag
+        return response
+
+    f = open(path, "rb")
+    stat = os.fstat(f.fileno())
+    size, etag = stat.st_size, etag or _etag(stat)
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        f.close()
+        response = HttpResponse(status=304)
+        response["ETag"] = etag
+        return response
+    header = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+    if header and if_range and if_range != etag:
+        header = None   # the client's partial copy is stale: send the whole file
+    try:
+        byte_range = parse_range(header, size)
+    except ValueError:
+        f.close()
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        response["Accept-Ranges"] = "bytes"
+        return response
+
+    if byte_range is None:
+        response = FileResponse(f, as_attachment=True, filename=filename, content_type=content_type)
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = FileResponse(_FileRange(f, start, length), status=206, as_attachment=True,
+                                filename=filename, content_type=content_type)
+        response["Content-Length"] = str(length)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    return response
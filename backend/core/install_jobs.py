@@ -0,0 +1,242 @@
+# core/install_jobs.py
+"""Persistent install job queue.
+
+POST /install/ only inserts an InstallJob row. Workers claim queued jobs
+with a conditional UPDATE (status queued → running), so any number of
+threads or processes, on SQLite or PostgreSQL, can share the table
+without running a job twice. They then run STEPS in order, saving
+step/progress after each one; a heartbeat thread keeps the lease fresh
+while a long step (a slow fetch, the deploy) is still running.
+
+A failing step puts the job back in the queue with exponential backoff
+(INSTALL_RETRY_BACKOFF * 2^(attempt-1) seconds) until max_attempts; after
+that it is failed with the error. A job whose worker died (no heartbeat
+for INSTALL_LEASE seconds) is requeued by the next worker that polls. A
+worker that finds its lease taken over stops without touching the job.
+
+Workers:
+- INSTALL_INLINE_WORKERS threads started lazily inside the web process
+  (default; 0 disables them)
+- `manage.py install_workers --processes N`, a separate process pool
+"""
+import hashlib, logging, os, socket, threading, time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from .models import InstallJob
+from . import package_store
+
+logger = logging.getLogger(__name__)
+
+LIST_LIMIT = 50
+
+
+# --------------------------- STEPS --------------------------- #
+def _step_fetch(job, ctx):
+    ctx["package"], ctx["path"] = package_store.get(job.app_name, job.version)
+
+def _step_verify(job, ctx):
+    digest = hashlib.sha256()
+    with open(ctx["path"], "rb") as f:
+        for chunk in iter(lambda: f.read(package_store.CHUNK_SIZE), b""):
+            digest.update(chunk)
+    if digest.hexdigest() != ctx["package"].sha256:
+        raise RuntimeError(f"checksum mismatch for {job.app_name} {job.version}")
+
+def _step_deploy(job, ctx):
+    time.sleep(getattr(settings, "INSTALL_DEPLOY_SECONDS", 1.5))   # simulated rollout to the endpoint
+
+def _step_record(job, ctx):
+    from mimic_backend import audit
+    from .models import ApplicationCatalog, InstallLog
+    from .sn_excel import append_request
+
+    if not job.request_id:
+        job.request_id = str(append_request(
+            job.note or f"Install {job.app_name} {job.version}", job.app_name, job.version, status="Installed"
+        ))
+    app = ApplicationCatalog.objects.filter(app_name=job.app_name).first()
+    audit.record(InstallLog(user_prompt=job.note, app=app, version=job.version, status="Installed"))
+
+STEPS = [
+    ("fetch", _step_fetch),     # package into the local store
+    ("verify", _step_verify),   # SHA-256 of the blob
+    ("deploy", _step_deploy),
+    ("record", _step_record),   # request row + InstallLog
+]
+
+
+# --------------------------- QUEUE --------------------------- #
+def to_dict(job):
+    return {
+        "job_id": job.pk,
+        "app_name": job.app_name,
+        "version": job.version,
+        "user": job.user,
+        "status": job.status,
+        "step": job.step,
+        "progress": round(job.progress, 4),
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "error": job.error,
+        "request_id": job.request_id,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
+
+
+def submit(app_name, version, user="", note=""):
+    job = InstallJob.objects.create(
+        app_name=app_name, version=version, user=user or "", note=note or "",
+        max_attempts=getattr(settings, "INSTALL_MAX_ATTEMPTS", 3),
+    )
+    _wake.set()
+    ensure_inline_workers()
+    return job
+
+
+def get_job(job_id):
+    return InstallJob.objects.filter(pk=job_id).first()
+
+
+def jobs_for(user="", limit=LIST_LIMIT):
+    """Most recent jobs, optionally only one user's"""
+    jobs = InstallJob.objects.order_by("-created_at", "-id")
+    if user:
+        jobs = jobs.filter(user=user)
+    return jobs[:limit]
+
+
+def recover_stale():
+    """Requeue running jobs whose worker stopped heart-beating"""
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, "INSTALL_LEASE", 60))
+    return InstallJob.objects.filter(status="running", heartbeat_at__lt=cutoff).update(
+        status="queued", worker="", run_after=timezone.now()
+    )
+
+
+def claim(worker_id):
+    """Atomically take the next due job, or None"""
+    now = timezone.now()
+    due = InstallJob.objects.filter(status="queued", run_after__lte=now).order_by("run_after", "id")
+    for pk in due.values_list("id", flat=True)[:5]:
+        taken = InstallJob.objects.filter(pk=pk, status="queued").update(
+            status="running", worker=worker_id, started_at=now, heartbeat_at=now, error="",
+        )
+        if taken:
+            return InstallJob.objects.get(pk=pk)
+    return None
+
+
+class LeaseLost(Exception):
+    """Another worker requeued and claimed the job"""
+
+
+class _Heartbeat:
+    """Refresh job.heartbeat_at every INSTALL_LEASE/3 seconds while a step runs"""
+
+    def __init__(self, job):
+        self.job = job
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"install-heartbeat-{job.pk}", daemon=True)
+
+    def _run(self):
+        interval = getattr(settings, "INSTALL_LEASE", 60) / 3
+        try:
+            while not self._stop.wait(interval):
+                alive = InstallJob.objects.filter(pk=self.job.pk, status="running", worker=self.job.worker).update(
+                    heartbeat_at=timezone.now()
+                )
+                if not alive:
+                    self.lost.set()
+                    break
+        finally:
+            connection.close()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def _save(job, **fields):
+    for name, value in fields.items():
+        setattr(job, name, value)
+    job.heartbeat_at = timezone.now()
+    job.save(update_fields=[*fields, "heartbeat_at", "updated_at"])
+
+
+def run(job):
+    """Run the job's steps; on failure schedule a retry or fail it"""
+    ctx = {}
+    _save(job, attempts=job.attempts + 1)
+    try:
+        for n, (name, step) in enumerate(STEPS):
+            _save(job, step=name, progress=n / len(STEPS))
+            with _Heartbeat(job) as heartbeat:
+                step(job, ctx)
+            if heartbeat.lost.is_set():
+                raise LeaseLost(f"install job {job.pk} was taken over during {name}")
+        _save(job, status="succeeded", step="done", progress=1.0, finished_at=timezone.now(),
+              request_id=job.request_id, worker="")
+    except LeaseLost:
+        logger.warning("install job %s: lease lost, leaving it to its new worker", job.pk)
+    except Exception as e:
+        logger.exception("install job %s failed in step %s", job.pk, job.step)
+        if job.attempts < job.max_attempts:
+            backoff = getattr(settings, "INSTALL_RETRY_BACKOFF", 5) * 2 ** (job.attempts - 1)
+            _save(job, status="queued", error=str(e), worker="", request_id=job.request_id,
+                  run_after=timezone.now() + timedelta(seconds=backoff))
+        else:
+            _save(job, status="failed", error=str(e), worker="", finished_at=timezone.now(),
+                  request_id=job.request_id)
+    return job
+
+
+def run_once(worker_id="inline"):
+    """Claim and run one job; returns it, or None when nothing was due"""
+    recover_stale()
+    job = claim(worker_id)
+    return run(job) if job is not None else None
+
+
+# --------------------------- WORKERS --------------------------- #
+_wake = threading.Event()
+_inline = []
+_inline_lock = threading.Lock()
+
+def worker_loop(worker_id, stop=None, poll=None):
+    """Run jobs until stop is set; sleeps up to `poll` seconds when the queue is empty"""
+    poll = poll if poll is not None else getattr(settings, "INSTALL_POLL_INTERVAL", 1.0)
+    while stop is None or not stop.is_set():
+        close_old_connections()
+        try:
+            job = run_once(worker_id)
+        except Exception:
+            logger.exception("install worker %s: poll failed", worker_id)
+            job = None
+        if job is None:
+            _wake.wait(poll)
+            _wake.clear()
+    connection.close()
+
+def ensure_inline_workers():
+    """Start INSTALL_INLINE_WORKERS daemon threads in this process (once)"""
+    wanted = getattr(settings, "INSTALL_INLINE_WORKERS", 2)
+    if len(_inline) >= wanted:
+        return
+    with _inline_lock:
+        base = f"{socket.gethostname()}:{os.getpid()}"
+        while len(_inline) < wanted:
+            t = threading.Thread(
+                target=worker_loop, args=(f"{base}:t{len(_inline)}",), name=f"install-worker-{len(_inline)}", daemon=True
+            )
+            t.start()
+            _inline.append(t)
@@ -0,0 +1,91 @@
+# core/intent.py
+"""Deterministic intent classifier that runs ahead of the Groq call.
+
+Apps are found by main.app_matcher, the same fuzzy matcher /api/match/ and
+/api/agent/ use (aliases, typos, versions). File names are matched with a
+regex compiled from core.file_catalog's index, so both follow their table
+across processes: the app matcher rebuilds when the ApplicationCatalog
+signature moves, the file regex when the file index was rebuilt. Inputs it
+can classify with confidence never reach the LLM.
+"""
+import re, threading
+
+from django.conf import settings
+
+from main.app_matcher import get_matcher as get_app_matcher
+from . import file_catalog
+
+VERB_RE = re.compile(r"\b(?P<verb>install|download|set\s*up|setup|deploy|get|need)\b", re.I)
+DOWNLOAD_VERBS = {"download", "get"}
+APP_CUTOFF = 0.8   # app matcher score needed to name an app without asking the LLM
+
+
+def _entity_pattern(text):
+    """'VPN_Guide.pdf' → matches 'vpn guide', 'vpn-guide', 'VPN_Guide.pdf'"""
+    stem, dot, ext = text.rpartition(".")
+    if not dot or not stem:
+        stem, ext = text, ""
+    words = [w for w in re.split(r"[\s_\-]+", stem) if w]
+    body = r"[\s_\-]*".join(re.escape(w) for w in words)
+    if ext:
+        body += rf"(?:\.{re.escape(ext)})?"
+    return rf"(?<![\w]){body}(?![\w])"
+
+
+class FileMatcher:
+    def __init__(self, filenames):
+        # Longest first so "VPN_Guide_v2.pdf" wins over "VPN_Guide.pdf"
+        self.names = sorted(set(filenames), key=len, reverse=True)
+        groups = "|".join(f"(?P<e{i}>{_entity_pattern(n)})" for i, n in enumerate(self.names))
+        self.regex = re.compile(groups, re.I) if self.names else None
+
+    def find(self, text):
+        m = self.regex.search(text) if self.regex else None
+        return self.names[int(m.lastgroup[1:])] if m else None
+
+
+# --------------------------- SHARED MATCHER --------------------------- #
+_files = None
+_files_source = None
+_files_lock = threading.Lock()
+
+def get_file_matcher():
+    """File-name matcher, recompiled whenever core.file_catalog rebuilt its index"""
+    global _files, _files_source
+    index = file_catalog.get_index()
+    if _files_source is not index:
+        with _files_lock:
+            if _files_source is not index:
+                _files = FileMatcher(e.filename for e in index.entries.values())
+                _files_source = index
+    return _files
+
+
+def classify(text):
+    """Return {intent, app, version, file, confidence}"""
+    verb = VERB_RE.search(text)
+    filename = get_file_matcher().find(text)
+    app = version = None
+    if not filename:
+        found = get_app_matcher().best(text, cutoff=APP_CUTOFF)
+        if found:
+            app, version = found.app, found.version
+
+    if verb and (app or filename):
+        intent = "download" if filename or verb.group("verb").lower() in DOWNLOAD_VERBS else "install"
+        confidence = 0.95
+    elif not verb and not (app or filename):
+        intent, confidence = "other", 0.9
+    else:
+        # Verb without a known entity, or an entity without a verb: let the LLM decide
+        intent = "other"
+        confidence = 0.5 if (app or filename) else 0.4
+
+    return {"intent": intent, "app": app, "version": version, "file": filename, "confidence": confidence}
+
+
+def classify_local(text):
+    """Local classification, or None when confidence is below LOCAL_INTENT_THRESHOLD"""
+    parsed = classify(text)
+    threshold = getattr(settings, "LOCAL_INTENT_THRESHOLD", 0.8)
+    return parsed if parsed["confidence"] >= threshold else None
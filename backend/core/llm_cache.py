@@ -0,0 +1,295 @@
+# core/llm_cache.py
+"""Response cache for groq_chat.
+
+Entries are keyed on a canonical (model, messages, temperature) tuple so that
+"Install  Zoom" and "install zoom" share one completion. Two backends are
+available: an in-process LRU (per worker) and a SQLite file that every
+gunicorn worker on the host can share. Both evict on TTL and on size (LRU).
+
+SingleFlight coalesces misses: identical prompts that are already in flight
+(thread or coroutine, same key) wait for that one upstream call instead of
+making their own.
+"""
+import asyncio, hashlib, json, os, sqlite3, threading, time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from django.conf import settings
+
+
+# --------------------------- KEYS --------------------------- #
+def _normalize(text):
+    return " ".join(str(text).split()).casefold()
+
+def make_key(model, messages, temperature):
+    """Stable hash of the normalized prompt"""
+    canonical = {
+        "model": model,
+        "temperature": round(float(temperature), 3),
+        "messages": [
+            {"role": m.get("role", ""), "content": _normalize(m.get("content", ""))}
+            for m in messages
+        ],
+    }
+    raw = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+# --------------------------- BACKENDS --------------------------- #
+class BaseCache:
+    def __init__(self, maxsize=1024, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def _count(self, hit):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key):
+        value = self._get(key)
+        self._count(value is not None)
+        return value
+
+    def set(self, key, value):
+        self._set(key, value)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "backend": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "size": len(self),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+        }
+
+
+class MemoryCache(BaseCache):
+    """Per-process LRU with TTL"""
+    name = "memory"
+
+    def __init__(self, maxsize=1024, ttl=3600):
+        super().__init__(maxsize, ttl)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def _get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def _set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.time() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class SQLiteCache(BaseCache):
+    """File-backed LRU with TTL, shared by all workers on the host"""
+    name = "sqlite"
+
+    def __init__(self, path, maxsize=1024, ttl=3600):
+        super().__init__(maxsize, ttl)
+        self.path = str(path)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_access ON llm_cache (last_access)")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    def _get(self, key):
+        conn = self._conn()
+        now = time.time()
+        row = conn.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at < now:
+            conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            return None
+        conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+        return value
+
+    def _set(self, key, value):
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl, now),
+            )
+            conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (now,))
+            conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                " SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def clear(self):
+        self._conn().execute("DELETE FROM llm_cache")
+
+
+class NullCache(BaseCache):
+    """Cache disabled: every lookup is a miss"""
+    name = "none"
+
+    def __len__(self):
+        return 0
+
+    def _get(self, key):
+        return None
+
+    def _set(self, key, value):
+        pass
+
+    def clear(self):
+        pass
+
+
+# --------------------------- IN-FLIGHT --------------------------- #
+class SingleFlight:
+    """One upstream call per key at a time; identical callers share its result.
+
+    Results are concurrent.futures.Futures, so sync callers, async callers
+    and callers on different event loops can all wait on the same leader.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def join(self, key):
+        """(future, is_leader); the leader must call finish(key, ...) when done"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = self._calls[key] = Future()
+            self.leaders += 1
+            return future, True
+
+    def finish(self, key, result=None, error=None):
+        with self._lock:
+            future = self._calls.pop(key, None)
+        if future is None or future.done():
+            return
+        if error is not None:
+            # Followers must not see the leader's own cancellation as theirs
+            future.set_exception(error if isinstance(error, Exception) else RuntimeError("upstream call was cancelled"))
+        else:
+            future.set_result(result)
+
+    def run(self, key, fn, timeout=None):
+        future, leader = self.join(key)
+        if not leader:
+            return future.result(timeout)
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, error=e)
+            raise
+        self.finish(key, result)
+        return result
+
+    async def arun(self, key, fn, timeout=None):
+        future, leader = self.join(key)
+        if not leader:
+            # shield: a follower giving up must not cancel the shared future
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+        try:
+            result = await fn()
+        except BaseException as e:
+            self.finish(key, error=e)
+            raise
+        self.finish(key, result)
+        return result
+
+    def stats(self):
+        with self._lock:
+            in_flight = len(self._calls)
+        return {"leaders": self.leaders, "coalesced": self.coalesced, "in_flight": in_flight}
+
+
+_flight = SingleFlight()
+
+def get_flight():
+    return _flight
+
+
+# --------------------------- FACTORY --------------------------- #
+_cache = None
+_cache_lock = threading.Lock()
+
+def build_cache(backend=None, path=None, maxsize=None, ttl=None):
+    backend = backend or getattr(settings, "LLM_CACHE_BACKEND", "memory")
+    maxsize = maxsize or getattr(settings, "LLM_CACHE_MAXSIZE", 1024)
+    ttl = ttl or getattr(settings, "LLM_CACHE_TTL", 3600)
+    if backend == "sqlite":
+        path = path or getattr(settings, "LLM_CACHE_PATH", os.path.join(settings.BASE_DIR, "llm_cache.sqlite3"))
+        return SQLiteCache(path, maxsize=maxsize, ttl=ttl)
+    if backend == "memory":
+        return MemoryCache(maxsize=maxsize, ttl=ttl)
+    return NullCache(maxsize=0, ttl=0)
+
+def get_cache():
+    """Process-wide cache configured from settings"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = build_cache()
+    return _cache
+
+def set_cache(cache):
+    """Swap the process-wide cache (tests, management commands)"""
+    global _cache
+    _cache = cache
@@ -0,0 +1,38 @@
+import multiprocessing as mp, os, signal, socket
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core import install_jobs
+
+
+def _work(n, stop):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)   # the parent handles Ctrl-C / SIGTERM and sets stop
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    install_jobs.worker_loop(f"{socket.gethostname()}:{os.getpid()}:p{n}", stop=stop)
+
+
+class Command(BaseCommand):
+    help = "Run a pool of install job worker processes (use with INSTALL_INLINE_WORKERS=0 on the web tier)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=4)
+
+    def handle(self, *args, **options):
+        connections.close_all()   # children must not share the parent's sockets
+        ctx = mp.get_context("fork")
+        stop = ctx.Event()
+        pool = [ctx.Process(target=_work, args=(n, stop), name=f"install-worker-{n}") for n in range(options["processes"])]
+        for p in pool:
+            p.start()
+
+        def shutdown(signum, frame):
+            if not stop.is_set():
+                self.stdout.write("Stopping after the current jobs...")
+                stop.set()
+
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+        self.stdout.write(self.style.SUCCESS(f"{len(pool)} install workers running; Ctrl-C to stop"))
+        for p in pool:
+            p.join()
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from core import file_catalog
+from core.models import File
+
+
+class Command(BaseCommand):
+    help = "Index FILE_STORAGE_DIR into core.File: add new files, refresh size/category, report missing ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--private", action="store_true", help="Mark newly added files private (visible per FILE_PERMISSIONS)")
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        root = file_catalog.storage_root()
+        if not root.is_dir():
+            self.stderr.write(self.style.WARNING(f"{root} does not exist; nothing to index"))
+            return
+
+        on_disk = {
+            p.relative_to(root).as_posix(): p.stat().st_size
+            for p in root.rglob("*") if p.is_file() and not p.name.startswith(".")
+        }
+        known = {f.path: f for f in File.objects.exclude(path="")}
+        added = updated = 0
+        for relpath, size in sorted(on_disk.items()):
+            category = file_catalog.guess_category(relpath)
+            f = known.get(relpath)
+            if f is None:
+                added += 1
+                if not options["dry_run"]:
+                    File.objects.create(filename=relpath.rsplit("/", 1)[-1], path=relpath, size=size,
+                                        category=category, is_public=not options["private"])
+            elif f.size != size or not f.category:
+                updated += 1
+                if not options["dry_run"]:
+                    f.size, f.category = size, f.category or category
+                    f.save(update_fields=["size", "category", "updated_at"])
+
+        for relpath in sorted(set(known) - set(on_disk)):
+            self.stderr.write(self.style.WARNING(f"missing on disk: {relpath} (File {known[relpath].id})"))
+        verb = "Would add" if options["dry_run"] else "Added"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {added}, updated {updated} of {len(on_disk)} files under {root}"))
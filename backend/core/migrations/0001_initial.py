@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='File',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filename', models.CharField(max_length=255)),
+                ('is_public', models.BooleanField(default=True)),
+                ('category', models.CharField(blank=True, default='', max_length=50)),
+                ('size', models.BigIntegerField(blank=True, null=True)),
+                ('path', models.CharField(blank=True, default='', max_length=500)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['is_public', 'filename'], name='file_public_name_idx'), models.Index(fields=['category', 'filename'], name='file_category_name_idx')],
+            },
+        ),
+    ]
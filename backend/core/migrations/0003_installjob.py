@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_package'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InstallJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('app_name', models.CharField(max_length=100)),
+                ('version', models.CharField(max_length=50)),
+                ('user', models.CharField(blank=True, default='', max_length=50)),
+                ('note', models.TextField(blank=True, default='')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('step', models.CharField(blank=True, default='', max_length=30)),
+                ('progress', models.FloatField(default=0.0)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('max_attempts', models.PositiveIntegerField(default=3)),
+                ('error', models.TextField(blank=True, default='')),
+                ('request_id', models.CharField(blank=True, default='', max_length=50)),
+                ('worker', models.CharField(blank=True, default='', max_length=100)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'run_after'], name='installjob_status_run_idx'), models.Index(fields=['user', '-created_at'], name='installjob_user_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:38
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+# Catalog previously hard-coded in the frontend (AVAILABLE_APPS)
+SEED_CATALOG = {
+    "MS Word": (["2016", "2019", "2021"], "Microsoft Word word processor"),
+    "MS Excel": (["2016", "2019", "2021"], "Microsoft Excel spreadsheets"),
+    "Zoom": (["5.0", "5.1", "latest"], "Zoom video meetings"),
+    "Slack": (["4.20", "4.21", "latest"], "Slack team chat"),
+}
+
+
+def seed_catalog(apps, schema_editor):
+    ApplicationCatalog = apps.get_model("core", "ApplicationCatalog")
+    ApplicationCatalog.objects.bulk_create(
+        [
+            ApplicationCatalog(app_name=app, versions=",".join(versions), description=description)
+            for app, (versions, description) in SEED_CATALOG.items()
+        ],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_installjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationCatalog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('app_name', models.CharField(max_length=100, unique=True)),
+                ('versions', models.CharField(blank=True, default='', max_length=255)),
+                ('description', models.TextField(blank=True, default='')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='InstallLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_prompt', models.TextField(blank=True, default='')),
+                ('version', models.CharField(max_length=50)),
+                ('status', models.CharField(default='Installed', max_length=20)),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+                ('app', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='install_logs', to='core.applicationcatalog')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-timestamp', '-id'], name='installlog_ts_id_idx'), models.Index(fields=['app', '-timestamp', '-id'], name='installlog_app_ts_idx')],
+            },
+        ),
+        migrations.RunPython(seed_catalog, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,108 @@
 from django.db import models
+from django.utils import timezone
+
+class ApplicationCatalog(models.Model):
+    """Installable application and the versions it ships in"""
+    app_name = models.CharField(max_length=100, unique=True)
+    versions = models.CharField(max_length=255, blank=True, default="")   # comma-separated, oldest first
+    description = models.TextField(blank=True, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def version_list(self):
+        return [v.strip() for v in self.versions.split(",") if v.strip()]
+
+    def __str__(self):
+        return self.app_name
+
+
+class InstallLog(models.Model):
+    """One (simulated) install, written through mimic_backend.audit"""
+    user_prompt = models.TextField(blank=True, default="")
+    app = models.ForeignKey(ApplicationCatalog, null=True, blank=True, on_delete=models.SET_NULL,
+                            related_name="install_logs")
+    version = models.CharField(max_length=50)
+    status = models.CharField(max_length=20, default="Installed")
+    timestamp = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-timestamp", "-id"], name="installlog_ts_id_idx"),
+            models.Index(fields=["app", "-timestamp", "-id"], name="installlog_app_ts_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.app} {self.version} - {self.status}"
+
 
 class File(models.Model):
     filename = models.CharField(max_length=255)
     is_public = models.BooleanField(default=True)
+    category = models.CharField(max_length=50, blank=True, default="")   # installers, documents, ...
+    size = models.BigIntegerField(null=True, blank=True)                   # bytes; None until indexed
+    path = models.CharField(max_length=500, blank=True, default="")        # relative to FILE_STORAGE_DIR
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["is_public", "filename"], name="file_public_name_idx"),
+            models.Index(fields=["category", "filename"], name="file_category_name_idx"),
+        ]
+
+    def __str__(self):
+        return self.filename
+
+
+class Package(models.Model):
+    """Installer for one (app, version), stored by content hash in core.package_store"""
+    app_name = models.CharField(max_length=100)
+    version = models.CharField(max_length=50)
+    sha256 = models.CharField(max_length=64, db_index=True)   # several versions may share one blob
+    size = models.BigIntegerField()
+    filename = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["app_name", "version"], name="package_app_version_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.app_name} {self.version} ({self.sha256[:12]})"
+
+
+class InstallJob(models.Model):
+    """One queued deployment, run step by step by core.install_jobs workers"""
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("succeeded", "Succeeded"),
+        ("failed", "Failed"),
+    ]
+
+    app_name = models.CharField(max_length=100)
+    version = models.CharField(max_length=50)
+    user = models.CharField(max_length=50, blank=True, default="")
+    note = models.TextField(blank=True, default="")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="queued")
+    step = models.CharField(max_length=30, blank=True, default="")        # current / last step
+    progress = models.FloatField(default=0.0)                              # 0..1
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    error = models.TextField(blank=True, default="")
+    request_id = models.CharField(max_length=50, blank=True, default="")  # ServiceNow-style request row
+    worker = models.CharField(max_length=100, blank=True, default="")     # who holds the lease
+    run_after = models.DateTimeField(default=timezone.now)                 # retry backoff
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="installjob_status_run_idx"),
+            models.Index(fields=["user", "-created_at"], name="installjob_user_created_idx"),
+        ]
 
     def __str__(self):
-        return self.filename
\ No newline at end of file
+        return f"#{self.pk} {self.app_name} {self.version} - {self.status}"
@@ -0,0 +1,193 @@
+# core/package_store.py
+"""Content-addressed installer cache.
+
+Installers live once per content hash under PACKAGE_STORE_DIR:
+
+    blobs/ab/ab12...ef    the bytes, named by SHA-256
+    tmp/                  partial writes (renamed into blobs/ when complete)
+
+and core.Package maps (app, version) → sha256, so "Zoom latest" and "Zoom
+5.1" share one file when they are the same binary.
+
+The store is a cache in front of a source:
+- PACKAGE_SOURCE_DIR/<app>/<version>/<installer>, the first file found
+- otherwise the placeholder installer the UI used to build inline
+
+Every hit bumps the blob's mtime. After each insert the least recently
+used blobs are evicted until the store fits PACKAGE_STORE_QUOTA bytes.
+The Package row (and so the published checksum) survives eviction; the
+next download refetches the blob and checks it against the hash.
+
+Blobs are served through file_catalog.file_response, i.e. FileResponse on
+the open handle (sendfile-able), Range and X-Sendfile/X-Accel-Redirect,
+with the SHA-256 as a strong ETag so clients can skip what they have.
+"""
+import hashlib, os, re, tempfile, threading, time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from .models import Package
+
+CHUNK_SIZE = 1 << 20
+SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+TOUCH_EVERY = 60   # seconds between mtime bumps of a hot blob
+
+_evict_lock = threading.Lock()
+
+
+class PackageError(Exception):
+    pass
+
+
+def store_root():
+    return Path(getattr(settings, "PACKAGE_STORE_DIR", settings.BASE_DIR / "package_store"))
+
+def quota():
+    return int(getattr(settings, "PACKAGE_STORE_QUOTA", 5 * 1024 ** 3))
+
+def blob_path(sha256):
+    if not SHA256_RE.match(sha256):
+        raise PackageError(f"Invalid sha256: {sha256}")
+    return store_root() / "blobs" / sha256[:2] / sha256
+
+
+# --------------------------- SOURCES --------------------------- #
+def _placeholder(app_name, version):
+    """The dummy installer the UI used to generate inline"""
+    return f"Dummy installer for {app_name} {version}".encode()
+
+def open_source(app_name, version):
+    """(readable binary file, filename) for the upstream installer"""
+    source = getattr(settings, "PACKAGE_SOURCE_DIR", "")
+    if source:
+        folder = Path(source) / app_name / version
+        if folder.is_dir():
+            for path in sorted(folder.iterdir()):
+                if path.is_file() and not path.name.startswith("."):
+                    return open(path, "rb"), path.name
+    f = tempfile.SpooledTemporaryFile()
+    f.write(_placeholder(app_name, version))
+    f.seek(0)
+    return f, f"{app_name}-{version}.zip"
+
+
+# --------------------------- WRITE --------------------------- #
+def _ingest(fileobj):
+    """Hash while copying into tmp/, then move into blobs/ (deduplicated) → (sha256, size)"""
+    tmp_dir = store_root() / "tmp"
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    digest, size = hashlib.sha256(), 0
+    fd, tmp = tempfile.mkstemp(dir=tmp_dir)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+        sha256 = digest.hexdigest()
+        target = blob_path(sha256)
+        if target.exists():
+            os.utime(target)          # identical binary already stored: keep one copy
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp, target)   # atomic: readers never see a partial blob
+            tmp = None
+        return sha256, size
+    finally:
+        if tmp is not None:
+            os.unlink(tmp)
+
+
+def put(app_name, version, fileobj, filename):
+    """Store an installer for (app, version); returns its Package"""
+    sha256, size = _ingest(fileobj)
+    with transaction.atomic():
+        current = Package.objects.select_for_update().filter(app_name=app_name, version=version).first()
+        if current is not None and current.sha256 == sha256 and current.filename == filename:
+            package = current
+        else:
+            # A changed binary gets a new row (new pk), which moves the catalog's validators
+            if current is not None:
+                current.delete()
+            try:
+                with transaction.atomic():
+                    package = Package.objects.create(
+                        app_name=app_name, version=version, sha256=sha256, size=size, filename=filename
+                    )
+            except IntegrityError:   # another worker stored it first
+                package = Package.objects.get(app_name=app_name, version=version)
+    evict(keep={sha256})
+    return package
+
+
+# --------------------------- READ --------------------------- #
+def _touch(path):
+    try:
+        if time.time() - path.stat().st_mtime > TOUCH_EVERY:
+            os.utime(path)
+    except FileNotFoundError:
+        pass
+
+
+def get(app_name, version):
+    """(Package, blob path), fetching from the source on a miss or after eviction"""
+    package = Package.objects.filter(app_name=app_name, version=version).first()
+    if package is not None:
+        path = blob_path(package.sha256)
+        if path.is_file():
+            _touch(path)
+            return package, path
+    fileobj, filename = open_source(app_name, version)
+    with fileobj:
+        package = put(app_name, version, fileobj, filename)
+    return package, blob_path(package.sha256)
+
+
+def checksums(app_name=None):
+    """{app_name: {version: {"sha256", "size", "filename"}}} for stored packages"""
+    rows = Package.objects.order_by("app_name", "version")
+    if app_name:
+        rows = rows.filter(app_name=app_name)
+    data = {}
+    for app, version, sha256, size, filename in rows.values_list("app_name", "version", "sha256", "size", "filename"):
+        data.setdefault(app, {})[version] = {"sha256": sha256, "size": size, "filename": filename}
+    return data
+
+
+# --------------------------- EVICTION --------------------------- #
+def usage():
+    """[(mtime, size, path)] of every blob, oldest first"""
+    blobs = []
+    root = store_root() / "blobs"
+    if not root.is_dir():
+        return blobs
+    for shard in os.scandir(root):
+        if not shard.is_dir():
+            continue
+        for entry in os.scandir(shard.path):
+            if entry.is_file():
+                st = entry.stat()
+                blobs.append((st.st_mtime, st.st_size, Path(entry.path)))
+    return sorted(blobs)
+
+
+def evict(keep=(), limit=None):
+    """Delete least recently used blobs until the store fits the quota; returns bytes freed"""
+    limit = quota() if limit is None else limit
+    with _evict_lock:
+        blobs = usage()
+        total = sum(size for _, size, _ in blobs)
+        freed = 0
+        for _, size, path in blobs:
+            if total - freed <= limit:
+                break
+            if path.name in keep:
+                continue
+            try:
+                path.unlink()   # open handles keep streaming the unlinked file
+            except FileNotFoundError:
+                pass
+            freed += size
+    return freed
@@ -0,0 +1,601 @@
+import asyncio, hashlib, io, json, os, tempfile, time
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from main import live
+from main.models import AppRequest, Log, Ticket
+from . import export_jobs, exporters, file_catalog, install_jobs, intent, llm_cache, package_store, views
+from .models import ApplicationCatalog, File, InstallJob, InstallLog, Package
+
+
+@override_settings(AUDIT_LOG_MODE="sync", INSTALL_INLINE_WORKERS=0)
+class ConfigTests(TestCase):
+    """/api/config/ is routed and scopes private files to the role's FILE_PERMISSIONS categories"""
+
+    @classmethod
+    def setUpTestData(cls):
+        File.objects.bulk_create([
+            File(filename="Employee_Handbook.pdf", category="general", is_public=True),
+            File(filename="Finance_Q3.xlsx", category="finance", is_public=False),
+            File(filename="Prod_DB_Creds.txt", category="sensitive", is_public=False),
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+        file_catalog._checked_at = float("-inf")   # rebuild the process-wide index for this test's rows
+
+    def filenames(self, role):
+        response = self.client.get("/api/config/", {"role": role})
+        self.assertEqual(response.status_code, 200)
+        return [f["filename"] for f in response.data["files"]]
+
+    def test_catalog_and_policy(self):
+        data = self.client.get("/api/config/", {"role": "user"}).data
+        self.assertEqual([a["app_name"] for a in data["catalog"]], ["MS Excel", "MS Word", "Slack", "Zoom"])
+        self.assertEqual(data["eligibility"]["user"], {"Zoom": ["latest", "5.0"]})
+
+    def test_files_per_role(self):
+        self.assertEqual(self.filenames("user"), ["Employee_Handbook.pdf"])
+        self.assertEqual(self.filenames("manager"), ["Employee_Handbook.pdf", "Finance_Q3.xlsx"])
+        self.assertEqual(self.filenames("admin"), ["Employee_Handbook.pdf", "Finance_Q3.xlsx", "Prod_DB_Creds.txt"])
+
+    def test_manager_cannot_download_sensitive(self):
+        creds = File.objects.get(filename="Prod_DB_Creds.txt")
+        response = self.client.get(f"/api/files/{creds.id}/download/", {"role": "manager"})
+        self.assertEqual(response.status_code, 403)
+        search = self.client.get("/api/files/", {"role": "manager", "q": "creds"})
+        self.assertEqual(search.data, [])
+
+    def test_not_modified(self):
+        etag = self.client.get("/api/config/", {"role": "user"})["ETag"]
+        response = self.client.get("/api/config/", {"role": "user"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_file_list_etag_follows_the_served_index(self):
+        first = self.client.get("/api/files/", {"role": "user"})
+        self.assertEqual(first.status_code, 200)
+        # Another process renames the file; this one still serves its index until the next refresh
+        File.objects.filter(filename="Employee_Handbook.pdf").update(
+            filename="Employee_Handbook_2024.pdf", updated_at=timezone.now(),
+        )
+        stale = self.client.get("/api/files/", {"role": "user"}, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(stale.status_code, 304)
+        file_catalog._checked_at = float("-inf")   # FILE_INDEX_REFRESH elapsed
+        fresh = self.client.get("/api/files/", {"role": "user"}, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(fresh.status_code, 200)
+        self.assertEqual([f["filename"] for f in fresh.data], ["Employee_Handbook_2024.pdf"])
+        self.assertNotEqual(fresh["ETag"], first["ETag"])
+        again = self.client.get("/api/files/", {"role": "user"}, HTTP_IF_NONE_MATCH=fresh["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+
+@override_settings(AUDIT_LOG_MODE="sync")
+class BootstrapTests(TestCase):
+    """/api/bootstrap/ is routed and scopes its sections by role"""
+
+    def setUp(self):
+        Log.objects.create(user="alice", log_type="chat", action="hello")
+        Log.objects.create(user="bob", log_type="chat", action="hi")
+        Ticket.objects.create(user="alice", action="install zoom 5.1")
+        Ticket.objects.create(user="bob", action="install slack latest", role="manager")
+        AppRequest.objects.create(app_name="Zoom", version="5.1", requested_by="alice")
+
+    def get(self, **params):
+        response = APIClient().get("/api/bootstrap/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_user_sees_own_rows_only(self):
+        data = self.get(user="alice", role="user")
+        self.assertIsInstance(data["live_cursor"], int)
+        self.assertIn("Zoom", [app["app_name"] for app in data["catalog"]])
+        self.assertEqual({row["user"] for row in data["logs"]["results"]}, {"alice"})
+        self.assertIsNone(data["logs"]["next"])
+        self.assertEqual(data["tickets"]["count"], 1)
+        self.assertNotIn("open_tickets", data)
+        self.assertNotIn("app_requests", data)
+
+    def test_privileged_roles_get_the_admin_sections(self):
+        data = self.get(user="admin", role="admin")
+        self.assertEqual({row["user"] for row in data["logs"]["results"]}, {"alice", "bob"})
+        self.assertEqual(data["tickets"]["count"], 2)
+        self.assertEqual(len(data["open_tickets"]), 2)
+        self.assertEqual([r["app_name"] for r in data["app_requests"]], ["Zoom"])
+
+    def test_logs_link_to_the_next_page(self):
+        Log.objects.bulk_create(Log(user="alice", log_type="chat", action=str(i)) for i in range(views.LOG_PAGE_SIZE))
+        data = self.get(user="alice", role="user")
+        self.assertEqual(len(data["logs"]["results"]), views.LOG_PAGE_SIZE)
+        self.assertIn("/api/logs/?", data["logs"]["next"])
+        self.assertIn("user=alice", data["logs"]["next"])
+
+
+@override_settings(AUDIT_LOG_MODE="sync")
+class BootstrapLiveCursorTests(TestCase):
+    """/api/bootstrap/ hands out the live cursor its snapshot was taken at; later changes replay after it"""
+
+    def test_delta_after_seed(self):
+        Log.objects.create(user="alice", log_type="chat", action="before the snapshot")
+        response = APIClient().get("/api/bootstrap/", {"user": "alice", "role": "user"})
+        self.assertEqual(response.status_code, 200)
+        cursor = response.data["live_cursor"]
+        self.assertEqual(cursor, live.current_cursor())
+        rows = {row["id"]: row for row in response.data["logs"]["results"]}
+        seeded = set(rows)
+
+        log = Log.objects.create(user="alice", log_type="chat", action="after the snapshot")
+        events = live.replay(cursor, live.current_cursor(), ["logs"], user="alice")
+        self.assertEqual([(stream, data["id"]) for _, stream, _, _, data in events], [("logs", log.id)])
+
+        # What the frontend's live_table does: seed rows, then apply the deltas after the cursor
+        rows.update({data["id"]: data for _, _, _, _, data in events})
+        self.assertEqual(set(rows), seeded | {log.id})
+        self.assertEqual(rows[log.id]["action"], "after the snapshot")
+
+
+@override_settings(AUDIT_LOG_MODE="sync", INSTALL_INLINE_WORKERS=0, INSTALL_DEPLOY_SECONDS=0, INSTALL_RETRY_BACKOFF=5)
+class InstallQueueTests(TransactionTestCase):
+    """Claiming, retries and stale-lease recovery of the install job queue"""
+    serialized_rollback = True   # keep the seeded catalog and eligibility policy
+
+    def setUp(self):
+        tmp = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(
+            PACKAGE_STORE_DIR=os.path.join(tmp, "packages"),
+            SERVICE_NOW_EXCEL=os.path.join(tmp, "requests.xlsx"),
+        ))
+
+    def test_install_endpoint_runs_to_success(self):
+        response = APIClient().post("/api/install/", {"app_name": "Zoom", "version": "5.0", "user": "alice"},
+                                    format="json")
+        self.assertEqual(response.status_code, 202)
+        job = install_jobs.run_once("w1")
+        self.assertEqual((job.pk, job.status, job.progress), (response.data["job_id"], "succeeded", 1.0))
+        self.assertEqual(job.request_id, "REQ0000001")
+        self.assertTrue(InstallLog.objects.filter(app__app_name="Zoom", version="5.0").exists())
+        status = APIClient().get(f"/api/install/jobs/{job.pk}/").data
+        self.assertEqual(status["status"], "succeeded")
+
+    def test_claim_is_exclusive(self):
+        first = install_jobs.submit("Zoom", "5.0")
+        second = install_jobs.submit("Zoom", "5.1")
+        self.assertEqual(install_jobs.claim("w1").pk, first.pk)
+        self.assertEqual(install_jobs.claim("w2").pk, second.pk)
+        self.assertIsNone(install_jobs.claim("w3"))
+        self.assertEqual(InstallJob.objects.get(pk=first.pk).worker, "w1")
+
+    def test_failed_step_is_retried_with_backoff_then_failed(self):
+        def broken(job, ctx):
+            raise RuntimeError("registry unavailable")
+
+        job = install_jobs.submit("Zoom", "5.0")
+        with mock.patch.object(install_jobs, "STEPS", [("fetch", broken)]), self.assertLogs(install_jobs.logger, "ERROR"):
+            job = install_jobs.run_once("w1")
+            self.assertEqual((job.status, job.attempts, job.error), ("queued", 1, "registry unavailable"))
+            self.assertGreater(job.run_after, timezone.now())
+            self.assertIsNone(install_jobs.run_once("w1"))   # not due during the backoff
+
+            for attempt in (2, 3):
+                InstallJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+                job = install_jobs.run_once("w1")
+                self.assertEqual(job.attempts, attempt)
+        self.assertEqual((job.status, job.worker), ("failed", ""))
+
+    def test_stale_job_is_recovered(self):
+        job = install_jobs.submit("Zoom", "5.0")
+        install_jobs.claim("dead-worker")
+        InstallJob.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(seconds=120))
+        with self.settings(INSTALL_LEASE=60):
+            self.assertEqual(install_jobs.recover_stale(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker), ("queued", ""))
+
+    def test_long_step_keeps_its_lease(self):
+        recovered = []
+
+        def slow_fetch(job, ctx):
+            for _ in range(6):
+                time.sleep(0.1)
+                recovered.append(install_jobs.recover_stale())
+
+        install_jobs.submit("Zoom", "5.0")
+        with self.settings(INSTALL_LEASE=0.15), mock.patch.object(install_jobs, "STEPS", [("fetch", slow_fetch)]):
+            job = install_jobs.run_once("w1")
+        self.assertEqual(job.status, "succeeded")
+        self.assertEqual(sum(recovered), 0)
+
+    def test_worker_that_lost_its_lease_stops(self):
+        def taken_over(job, ctx):
+            InstallJob.objects.filter(pk=job.pk).update(worker="w2")
+            time.sleep(0.2)
+
+        job = install_jobs.submit("Zoom", "5.0")
+        with self.settings(INSTALL_LEASE=0.15), mock.patch.object(install_jobs, "STEPS", [("fetch", taken_over)]), \
+                self.assertLogs(install_jobs.logger, "WARNING"):
+            install_jobs.run_once("w1")
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker), ("running", "w2"))
+
+
+class RangeParsingTests(SimpleTestCase):
+    def test_parse_range(self):
+        self.assertEqual(file_catalog.parse_range("bytes=0-99", 1000), (0, 99))
+        self.assertEqual(file_catalog.parse_range("bytes=900-", 1000), (900, 999))
+        self.assertEqual(file_catalog.parse_range("bytes=-100", 1000), (900, 999))
+        self.assertEqual(file_catalog.parse_range("bytes=-5000", 1000), (0, 999))
+        self.assertEqual(file_catalog.parse_range("bytes=500-5000", 1000), (500, 999))
+        for ignored in (None, "", "items=0-1", "bytes=0-1,5-9", "bytes=-"):
+            self.assertIsNone(file_catalog.parse_range(ignored, 1000))
+        for unsatisfiable in ("bytes=1000-", "bytes=5-2", "bytes=-0"):
+            with self.assertRaises(ValueError):
+                file_catalog.parse_range(unsatisfiable, 1000)
+
+
+class FileDownloadTests(TestCase):
+    """/api/files/<id>/download/ streams from FILE_STORAGE_DIR with Range, If-Range and If-None-Match"""
+
+    def setUp(self):
+        root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(FILE_STORAGE_DIR=root, FILE_SENDFILE=""))
+        self.body = bytes(range(256)) * 4
+        with open(os.path.join(root, "VPN_Guide.pdf"), "wb") as f:
+            f.write(self.body)
+        self.file = File.objects.create(filename="VPN_Guide.pdf", path="VPN_Guide.pdf", category="general")
+        self.url = f"/api/files/{self.file.id}/download/"
+        self.client = APIClient()
+
+    def test_whole_file(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), self.body)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+
+    def test_partial_content(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=10-19")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 10-19/{len(self.body)}")
+        self.assertEqual(response["Content-Length"], "10")
+        self.assertEqual(b"".join(response.streaming_content), self.body[10:20])
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get(self.url, HTTP_RANGE=f"bytes={len(self.body)}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(self.body)}")
+
+    def test_if_range(self):
+        etag = self.client.get(self.url)["ETag"]
+        fresh = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=etag)
+        self.assertEqual(fresh.status_code, 206)
+        stale = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(stale.status_code, 200)
+        self.assertEqual(b"".join(stale.streaming_content), self.body)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_missing_content(self):
+        File.objects.filter(pk=self.file.pk).update(path="../outside.pdf")
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class PackageStoreTests(TestCase):
+    """Content-addressed installer store: one blob per binary, LRU eviction, routed downloads"""
+
+    def setUp(self):
+        tmp = self.enterContext(tempfile.TemporaryDirectory())
+        self.source = os.path.join(tmp, "source")
+        self.enterContext(override_settings(
+            PACKAGE_STORE_DIR=os.path.join(tmp, "store"), PACKAGE_SOURCE_DIR=self.source, FILE_SENDFILE="",
+        ))
+
+    def add_source(self, app, version, data, name="setup.exe"):
+        folder = os.path.join(self.source, app, version)
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, name), "wb") as f:
+            f.write(data)
+
+    def test_identical_binaries_share_one_blob(self):
+        self.add_source("Zoom", "5.1", b"zoom build 5.1")
+        self.add_source("Zoom", "latest", b"zoom build 5.1")
+        first, path = package_store.get("Zoom", "5.1")
+        second, same_path = package_store.get("Zoom", "latest")
+        self.assertEqual(first.sha256, hashlib.sha256(b"zoom build 5.1").hexdigest())
+        self.assertEqual((second.sha256, same_path), (first.sha256, path))
+        self.assertEqual(len(package_store.usage()), 1)
+        self.assertEqual(Package.objects.count(), 2)
+
+    def test_changed_binary_replaces_the_row(self):
+        self.add_source("Slack", "4.21", b"old")
+        old, _ = package_store.get("Slack", "4.21")
+        new = package_store.put("Slack", "4.21", io.BytesIO(b"new"), "setup.exe")
+        self.assertNotEqual((new.pk, new.sha256), (old.pk, old.sha256))
+        self.assertEqual(Package.objects.filter(app_name="Slack").count(), 1)
+
+    def test_least_recently_used_blobs_are_evicted(self):
+        blobs = []
+        for n in range(3):
+            package = package_store.put("Zoom", f"5.{n}", io.BytesIO(bytes([n]) * 100), "setup.exe")
+            path = package_store.blob_path(package.sha256)
+            os.utime(path, (1000 + n, 1000 + n))   # 5.0 oldest
+            blobs.append(path)
+        freed = package_store.evict(limit=250)
+        self.assertEqual(freed, 100)
+        self.assertEqual([p.exists() for p in blobs], [False, True, True])
+        self.assertEqual(package_store.evict(keep={blobs[1].name}, limit=0), 100)
+        self.assertEqual([p.exists() for p in blobs], [False, True, False])
+
+    def test_evicted_blob_is_refetched(self):
+        self.add_source("MS Word", "2021", b"word 2021")
+        package, path = package_store.get("MS Word", "2021")
+        package_store.evict(limit=0)
+        self.assertFalse(path.exists())
+        again, path = package_store.get("MS Word", "2021")
+        self.assertEqual((again.pk, again.sha256), (package.pk, package.sha256))
+        self.assertTrue(path.exists())
+
+    def test_download_endpoint(self):
+        self.add_source("Zoom", "5.0", b"zoom 5.0")
+        client = APIClient()
+        response = client.get("/api/packages/Zoom/5.0/download/", {"user": "alice"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"zoom 5.0")
+        self.assertEqual(response["X-Checksum-SHA256"], hashlib.sha256(b"zoom 5.0").hexdigest())
+        self.assertEqual(client.get("/api/packages/Slack/4.21/download/", {"user": "alice"}).status_code, 403)
+        self.assertEqual(client.get("/api/packages/Zoom/9.9/download/", {"user": "alice"}).status_code, 404)
+        self.assertIn("5.0", client.get("/api/packages/", {"app": "Zoom"}).data["Zoom"])
+
+
+@override_settings(AUDIT_LOG_MODE="sync")
+class ExportJobTests(TestCase):
+    """Only one worker process builds a given export artifact"""
+
+    def setUp(self):
+        self.enterContext(override_settings(EXPORT_CACHE_DIR=self.enterContext(tempfile.TemporaryDirectory())))
+        self.executor = self.enterContext(mock.patch.object(export_jobs, "_get_executor")).return_value
+        self.enterContext(mock.patch.object(export_jobs, "connection"))   # _run closes its thread's connection
+        InstallLog.objects.create(user_prompt="install zoom", version="5.0")
+
+    def forget_in_process_jobs(self):
+        """What a second worker process sees: only the files in EXPORT_CACHE_DIR"""
+        export_jobs._jobs.clear()
+
+    def test_run_writes_the_artifact(self):
+        job = export_jobs.submit(role="admin", fmt="csv")
+        export_jobs._run(job)
+        self.assertEqual(job.status, "done")
+        self.assertIn(b"install zoom", job.path.read_bytes())
+        self.assertFalse(job.part.exists())
+
+    def test_second_worker_reports_the_running_build(self):
+        job = export_jobs.submit(role="admin", fmt="csv")
+        os.close(export_jobs._claim_part(job.job_id, job.part))   # the first worker started writing
+        self.forget_in_process_jobs()
+        other = export_jobs.submit(role="admin", fmt="csv")
+        self.assertEqual((other.job_id, other.status), (job.job_id, "queued"))
+        self.assertEqual(self.executor.submit.call_count, 1)
+
+    def test_claimed_part_is_not_written_twice(self):
+        job = export_jobs.submit(role="admin", fmt="csv")
+        job.part.write_bytes(b"partial")
+        export_jobs._run(job)
+        self.assertEqual(job.part.read_bytes(), b"partial")
+        self.assertFalse(job.path.exists())
+
+    def test_stale_part_is_taken_over(self):
+        job = export_jobs.submit(role="admin", fmt="csv")
+        job.part.write_bytes(b"partial")
+        old = time.time() - export_jobs.PART_STALE - 1
+        for path in (job.part, export_jobs._sidecar(job.job_id)):
+            os.utime(path, (old, old))
+        export_jobs._run(job)
+        self.assertEqual(job.status, "done")
+        self.assertEqual(export_jobs.get_job(job.job_id).status, "done")
+
+
+class LogExportTests(TestCase):
+    """/api/logs/export/ streams InstallLog rows as csv, xlsx or parquet"""
+
+    def setUp(self):
+        zoom = ApplicationCatalog.objects.get(app_name="Zoom")
+        InstallLog.objects.create(user_prompt="alice: install zoom", app=zoom, version="5.1")
+        InstallLog.objects.create(user_prompt="bob: install zoom", app=zoom, version="5.0")
+
+    def export(self, **params):
+        response = APIClient().get("/api/logs/export/", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], exporters.CONTENT_TYPES[params["fmt"]])
+        self.assertIn(f'deployment_logs.{params["fmt"]}', response["Content-Disposition"])
+        return b"".join(response.streaming_content)
+
+    def test_csv(self):
+        lines = self.export(fmt="csv", role="user", user="alice").decode().splitlines()
+        self.assertEqual(lines[0], ",".join(exporters.HEADERS))
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].endswith(",Zoom,5.1,Installed,alice: install zoom"))
+
+    def test_xlsx(self):
+        from openpyxl import load_workbook
+
+        rows = list(load_workbook(io.BytesIO(self.export(fmt="xlsx", role="admin"))).active.values)
+        self.assertEqual(list(rows[0]), exporters.HEADERS)
+        self.assertEqual(sorted(row[2] for row in rows[1:]), ["5.0", "5.1"])
+
+    def test_parquet(self):
+        if not exporters.parquet_available():
+            self.skipTest("pyarrow is not installed")
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(io.BytesIO(self.export(fmt="parquet", role="manager")))
+        self.assertEqual(table.column_names, exporters.HEADERS)
+        self.assertEqual(sorted(table.column("version").to_pylist()), ["5.0", "5.1"])
+
+    def test_bad_parameters_are_400(self):
+        client = APIClient()
+        self.assertEqual(client.get("/api/logs/export/", {"fmt": "pdf"}).status_code, 400)
+        self.assertEqual(client.get("/api/logs/export/", {"fmt": "csv", "since": "yesterday"}).status_code, 400)
+
+
+@override_settings(FILE_INDEX_REFRESH=0)
+class IntentTests(TestCase):
+    """The local classifier shares main.app_matcher and follows the File table across processes"""
+
+    def setUp(self):
+        file_catalog._checked_at = float("-inf")
+
+    def test_app_intent(self):
+        self.assertEqual(
+            intent.classify_local("please install zoom 5.1"),
+            {"intent": "install", "app": "Zoom", "version": "5.1", "file": None, "confidence": 0.95},
+        )
+        self.assertEqual(intent.classify("get msexcel 2019")["app"], "MS Excel")   # alias, as in /api/match/
+        self.assertIsNone(intent.classify_local("install something"))             # left to the LLM
+
+    def test_file_written_by_another_process_is_matched(self):
+        self.assertIsNone(intent.classify("download the vpn guide")["file"])
+        # bulk_create sends no signals, like a write made by another worker
+        File.objects.bulk_create([File(filename="VPN_Guide.pdf", category="general")])
+        parsed = intent.classify_local("download the vpn guide")
+        self.assertEqual((parsed["intent"], parsed["file"]), ("download", "VPN_Guide.pdf"))
+
+
+class _StubStream:
+    """Groq-shaped client whose streamed completion arrives in three chunks"""
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=self)
+        self.calls = 0
+
+    def create(self, model, messages, temperature, stream=False):
+        self.calls += 1
+        return iter([
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=part))])
+            for part in ("Try ", "restarting ", "it.")
+        ])
+
+
+@override_settings(AUDIT_LOG_MODE="sync", RATE_LIMIT_ENABLED=False)
+class AgentStreamTests(TestCase):
+    """/api/agent/stream/ is routed and sends chat tokens as Server-Sent Events"""
+
+    def setUp(self):
+        self.llm = _StubStream()
+        self.enterContext(mock.patch.object(views, "get_client", return_value=self.llm))
+        llm_cache.set_cache(llm_cache.MemoryCache())
+        self.addCleanup(llm_cache.set_cache, None)
+
+    def events(self, text):
+        response = APIClient().post("/api/agent/stream/", {"input": text, "user": "alice"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        body = b"".join(response.streaming_content).decode()
+        events = []
+        for block in filter(None, body.split("\n\n")):
+            lines = dict(line.split(": ", 1) for line in block.splitlines())
+            events.append((lines.get("event"), json.loads(lines["data"])))
+        return events
+
+    def test_chat_tokens_stream(self):
+        events = self.events("my laptop is slow")
+        self.assertEqual(events[0], ("meta", {"classified_by": "local"}))
+        self.assertEqual([data["delta"] for event, data in events if event is None], ["Try ", "restarting ", "it."])
+        self.assertEqual(events[-1], ("done", {}))
+        # The assembled reply was cached: asking again streams it as one chunk without an LLM call
+        again = self.events("my laptop is slow")
+        self.assertEqual([data["delta"] for event, data in again if event is None], ["Try restarting it."])
+        self.assertEqual(self.llm.calls, 1)
+
+    def test_install_intent_is_one_result_event(self):
+        events = self.events("install zoom 5.1")
+        self.assertEqual(events[0][0], "result")
+        self.assertEqual((events[0][1]["app"], events[0][1]["version"], events[0][1]["code"]), ("Zoom", "5.1", 200))
+        self.assertEqual(self.llm.calls, 0)
+
+
+class _StubAsyncCompletions:
+    """AsyncGroq-shaped client: each call takes `delay` seconds; tracks how many run at once"""
+
+    def __init__(self, delay=0.0):
+        self.chat = SimpleNamespace(completions=self)
+        self.delay = delay
+        self.calls = self.running = self.peak = 0
+        self.cancelled = 0
+
+    async def create(self, model, messages, temperature, **kwargs):
+        self.calls += 1
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.running -= 1
+        message = SimpleNamespace(content=f"async reply to {messages[-1]['content']}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+@override_settings(AUDIT_LOG_MODE="sync", RATE_LIMIT_ENABLED=False)
+class AsyncAgentTests(TestCase):
+    """/api/agent/async/ and agroq_chat: shared cache, timeouts and bounded concurrency"""
+
+    def setUp(self):
+        llm_cache.set_cache(llm_cache.MemoryCache())
+        self.addCleanup(llm_cache.set_cache, None)
+        self.enterContext(mock.patch.dict(os.environ, {"GROQ_API_KEY": "test"}))
+
+    def test_chat_matches_the_sync_agent(self):
+        sync_llm = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+            create=mock.Mock(return_value=SimpleNamespace(choices=[SimpleNamespace(
+                message=SimpleNamespace(content="Try restarting it."))]))
+        )))
+        async_llm = _StubAsyncCompletions()
+        self.enterContext(mock.patch.object(views, "get_client", return_value=sync_llm))
+        self.enterContext(mock.patch.object(views, "get_aclient", return_value=async_llm))
+        client = APIClient()
+        body = {"input": "my laptop is slow", "user": "alice"}
+        sync_reply = client.post("/api/agent/", body, format="json")
+        async_reply = client.post("/api/agent/async/", body, format="json")
+        self.assertEqual(async_reply.status_code, 200)
+        self.assertEqual(async_reply.json(), {**sync_reply.data, "classified_by": "local"})
+        self.assertEqual(async_llm.calls, 0)   # the same prompt is answered from the shared cache
+
+    def test_install_intent_matches_the_stream_result(self):
+        self.enterContext(mock.patch.object(views, "get_aclient", return_value=_StubAsyncCompletions()))
+        response = APIClient().post("/api/agent/async/", {"input": "install zoom 5.1", "user": "alice"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            "message": "✅ Installed Zoom 5.1 (simulated)", "app": "Zoom", "version": "5.1",
+            "status": "Installed", "classified_by": "local",
+        })
+        self.assertTrue(InstallLog.objects.filter(app__app_name="Zoom", version="5.1").exists())
+
+    def test_timeout_cancels_the_call(self):
+        llm = _StubAsyncCompletions(delay=5)
+        messages = [{"role": "user", "content": "slow"}]
+        reply = async_to_sync(views.agroq_chat)(messages, llm=llm, timeout=0.05)
+        self.assertEqual(reply, "(Groq error: timed out after 0.05s)")
+        self.assertEqual(llm.cancelled, 1)
+        llm.delay = 0   # the error was not cached: the next call reaches the LLM
+        self.assertEqual(async_to_sync(views.agroq_chat)(messages, llm=llm), "async reply to slow")
+
+    @override_settings(LLM_MAX_CONCURRENCY=2)
+    def test_semaphore_bounds_concurrent_calls(self):
+        llm = _StubAsyncCompletions(delay=0.05)
+
+        async def burst():
+            replies = await asyncio.gather(*(
+                views.agroq_chat([{"role": "user", "content": f"question {i}"}], llm=llm) for i in range(6)
+            ))
+            return replies, views._llm_semaphore()
+
+        replies, sem = async_to_sync(burst)()
+        self.assertEqual(replies, [f"async reply to question {i}" for i in range(6)])
+        self.assertEqual((llm.calls, llm.peak), (6, 2))
+        _, other = async_to_sync(burst)()   # another event loop gets its own semaphore
+        self.assertIsNot(other, sem)
+
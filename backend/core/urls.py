@@ -5,17 +5,38 @@ from . import views
 def api_index(request):
     """Return a JSON list of available API endpoints."""
     endpoints = {
+        "main": {
+            "tasks": "/api/tasks/",
+            "logs": "/api/logs/",
+            "app_requests": "/api/app-requests/",
+            "tickets": "/api/tickets/",
+            "match": "/api/match/",
+            "eligibility": "/api/eligibility/",
+            "stats": "/api/stats/",
+            "live": "/api/live/",
+        },
         "applications": {
             "catalog": "/api/catalog/",
-            "logs": "/api/logs/",
+            "install_logs": "/api/install-logs/",
             "install": "/api/install/",
+            "install_jobs": "/api/install/jobs/",
+            "install_job": "/api/install/jobs/<id>/",
+            "packages": "/api/packages/",
+            "package_download": "/api/packages/<app>/<version>/download/",
         },
         "files": {
             "list": "/api/files/",
             "download": "/api/files/<id>/download/",
         },
+        "config": "/api/config/",
+        "bootstrap": "/api/bootstrap/",
         "logs_export": "/api/logs/export/",
+        "logs_export_jobs": "/api/logs/export/jobs/",
         "agent": "/api/agent/",
+        "agent_stream": "/api/agent/stream/",
+        "agent_async": "/api/agent/async/",
+        "agent_cache": "/api/agent/cache/",
+        "agent_metrics": "/api/agent/metrics/",
     }
     return JsonResponse({"endpoints": endpoints})
 
@@ -26,16 +47,33 @@ urlpatterns = [
 
     # ---------------- Applications ---------------- #
     path("catalog/", views.catalog, name="catalog"),
-    path("logs/", views.logs, name="logs"),
+    path("install-logs/", views.logs, name="install_logs"),
     path("install/", views.install_direct, name="install_direct"),
+    path("install/jobs/", views.install_job_list, name="install_job_list"),
+    path("install/jobs/<int:job_id>/", views.install_job_status, name="install_job_status"),
+    path("packages/", views.list_packages, name="list_packages"),
+    path("packages/<str:app_name>/<str:version>/download/", views.download_package, name="download_package"),
 
     # ---------------- Files ---------------- #
     path("files/", views.list_files, name="list_files"),
     path("files/<int:file_id>/download/", views.download_file, name="download_file"),
 
+    # ---------------- Frontend Config ---------------- #
+    path("config/", views.frontend_config, name="frontend_config"),
+
+    # ---------------- Page Bootstrap ---------------- #
+    path("bootstrap/", views.bootstrap, name="bootstrap"),
+
     # ---------------- Logs Export ---------------- #
     path("logs/export/", views.export_logs_excel, name="export_logs_excel"),
+    path("logs/export/jobs/", views.export_job_create, name="export_job_create"),
+    path("logs/export/jobs/<str:job_id>/", views.export_job_status, name="export_job_status"),
+    path("logs/export/jobs/<str:job_id>/download/", views.export_job_download, name="export_job_download"),
 
     # ---------------- Agent (Groq) ---------------- #
-    path("agent/", views.agent_entry, name="agent_entry"),
+    # /api/agent/ itself is main.views.agent_view
+    path("agent/stream/", views.agent_stream, name="agent_stream"),
+    path("agent/async/", views.agent_entry_async, name="agent_entry_async"),
+    path("agent/cache/", views.agent_cache_stats, name="agent_cache_stats"),
+    path("agent/metrics/", views.agent_metrics, name="agent_metrics"),
 ]
\ No newline at end of file
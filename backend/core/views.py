@@ -1,71 +1,231 @@
 # core/views.py
-import os, io, json, traceback, datetime as dt
-import pandas as pd
-from django.http import JsonResponse, FileResponse
+import os, json, asyncio, hashlib, traceback, weakref
+from urllib.parse import urlencode
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.urls import reverse
+from django.utils.http import parse_etags
+from django.http import JsonResponse, FileResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from groq import Groq
-
-from .models import ApplicationCatalog, InstallLog, File
-from .sn_excel import append_request
+from rest_framework.utils.urls import replace_query_param
+from groq import Groq, AsyncGroq
+
+from main.models import Log, Ticket, AppRequest
+from main.eligibility import eligibility_data, get_index
+from main import live, log_query
+from main.pagination import KeysetPagination
+from main.serializers import LogSerializer, TicketSerializer, AppRequestSerializer
+from .models import ApplicationCatalog, InstallLog, File, Package
+from .llm_cache import get_cache, get_flight, make_key
+from .intent import classify_local
+from . import exporters, export_jobs, file_catalog, install_jobs, package_store
+from mimic_backend import audit
+from mimic_backend.conditional import conditional
+from mimic_backend.fastjson import serialize_many
+from mimic_backend.ratelimit import get_limiter, rate_limited
+
+LOG_PAGE_SIZE = 100      # first page of the Logs tab
+TICKET_PAGE_SIZE = 25    # first page of the Tickets tab
 
 # --------------------------- INIT GROQ --------------------------- #
-client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
+# Built on first use, so the app loads (and answers from the local matcher) without GROQ_API_KEY
+_client = None
+_aclient = None
+
+def get_client():
+    global _client
+    if _client is None:
+        _client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
+    return _client
+
+def get_aclient():
+    global _aclient
+    if _aclient is None:
+        _aclient = AsyncGroq(api_key=os.environ.get("GROQ_API_KEY"), max_retries=0)
+    return _aclient
+
+def groq_chat(messages, model="llama-3.1-8b-instant", temperature=0.3, llm=None, cache=None, flight=None):
+    """Chat completion through the response cache; identical in-flight prompts share one call; errors are never cached"""
+    cache = cache if cache is not None else get_cache()
+    flight = flight if flight is not None else get_flight()
+    key = make_key(model, messages, temperature)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    def call():
+        try:
+            resp = (llm if llm is not None else get_client()).chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+            )
+            content = resp.choices[0].message.content
+        except Exception as e:
+            return f"(Groq error: {e})"
+        if content is not None:
+            cache.set(key, content)
+        return content
 
-def groq_chat(messages, model="llama-3.1-8b-instant"):
     try:
-        resp = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            temperature=0.3,
-        )
-        return resp.choices[0].message.content
+        return flight.run(key, call)
+    except Exception as e:   # the leader this call was waiting on failed
+        return f"(Groq error: {e})"
+
+def groq_chat_stream(messages, model="llama-3.1-8b-instant", temperature=0.3, llm=None, cache=None, flight=None):
+    """Yield completion chunks as Groq produces them; the assembled reply is cached.
+
+    A caller whose prompt is already streaming for someone else waits for
+    that reply and gets it as one chunk.
+    """
+    cache = cache if cache is not None else get_cache()
+    flight = flight if flight is not None else get_flight()
+    key = make_key(model, messages, temperature)
+    cached = cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+    future, leader = flight.join(key)
+    if not leader:
+        try:
+            reply = future.result()
+        except Exception as e:
+            reply = f"(Groq error: {e})"
+        if reply:
+            yield reply
+        return
+    parts, reply = [], None
+    try:
+        try:
+            stream = (llm if llm is not None else get_client()).chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                stream=True,
+            )
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        except Exception as e:
+            reply = f"(Groq error: {e})"
+            yield reply
+            return
+        reply = "".join(parts)
+        if parts:
+            cache.set(key, reply)
+    finally:
+        if reply is None:   # our client went away mid-stream
+            flight.finish(key, error=RuntimeError("upstream stream was abandoned"))
+        else:
+            flight.finish(key, reply)
+
+# One semaphore per event loop: WSGI runs each async view in its own loop
+_llm_slots = weakref.WeakKeyDictionary()
+
+def _llm_semaphore():
+    loop = asyncio.get_running_loop()
+    sem = _llm_slots.get(loop)
+    if sem is None:
+        sem = _llm_slots[loop] = asyncio.Semaphore(getattr(settings, "LLM_MAX_CONCURRENCY", 64))
+    return sem
+
+async def agroq_chat(messages, model="llama-3.1-8b-instant", temperature=0.3, llm=None, cache=None, timeout=None,
+                     flight=None):
+    """Async groq_chat: bounded concurrency, per-call timeout, cancelled on expiry, in-flight calls shared"""
+    cache = cache if cache is not None else get_cache()
+    flight = flight if flight is not None else get_flight()
+    timeout = timeout if timeout is not None else getattr(settings, "LLM_TIMEOUT", 20)
+    key = make_key(model, messages, temperature)
+    cached = await sync_to_async(cache.get, thread_sensitive=False)(key)
+    if cached is not None:
+        return cached
+
+    async def call():
+        try:
+            async with _llm_semaphore():
+                resp = await asyncio.wait_for(
+                    (llm if llm is not None else get_aclient()).chat.completions.create(
+                        model=model, messages=messages, temperature=temperature,
+                    ),
+                    timeout,
+                )
+            content = resp.choices[0].message.content
+        except asyncio.TimeoutError:
+            return f"(Groq error: timed out after {timeout}s)"
+        except Exception as e:
+            return f"(Groq error: {e})"
+        if content is not None:
+            await sync_to_async(cache.set, thread_sensitive=False)(key, content)
+        return content
+
+    try:
+        return await flight.arun(key, call, timeout=timeout)
+    except asyncio.TimeoutError:
+        return f"(Groq error: timed out after {timeout}s)"
     except Exception as e:
         return f"(Groq error: {e})"
 
 # --------------------------- APPLICATIONS --------------------------- #
-@api_view(["GET"])
-def catalog(request):
-    """Return list of available applications"""
+def catalog_data():
     apps = ApplicationCatalog.objects.order_by("app_name")
-    data = [
+    checksums = package_store.checksums()
+    return [
         {
             "app_name": app.app_name,
             "versions": app.version_list(),
             "description": app.description,
+            # SHA-256 of installers already in the package store, so clients can skip what they have
+            "checksums": {v: p["sha256"] for v, p in checksums.get(app.app_name, {}).items()},
         }
         for app in apps
     ]
-    return Response(data)
 
 @api_view(["GET"])
-def logs(request):
-    """Return install logs (optionally filtered by app)"""
+@conditional(lambda request: (ApplicationCatalog.objects.all(), Package.objects.all()))
+def catalog(request):
+    """Return list of available applications"""
+    return Response(catalog_data())
+
+INSTALL_LOG_FIELDS = {
+    "timestamp": log_query.FormatTimestamp("timestamp"),
+    "app": "app__app_name",
+    "version": "version",
+    "status": "status",
+    "user_prompt": "user_prompt",
+}
+
+def _install_logs_for(request):
     app = request.query_params.get("app")
-    qs = InstallLog.objects.select_related("app").order_by("-timestamp")[:200]
-    if app:
-        qs = qs.filter(app__app_name=app)
+    qs = InstallLog.objects.all()
+    return qs.filter(app__app_name=app) if app else qs
 
-    data = [
-        {
-            "timestamp": l.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
-            "app": l.app.app_name if l.app else None,
-            "version": l.version,
-            "status": l.status,
-            "user_prompt": l.user_prompt,
-        }
-        for l in qs
-    ]
-    return Response(data)
+@api_view(["GET"])
+@conditional()
+def logs(request):
+    """Return install logs, newest first (?app=&limit=&offset=&cursor=); the next page is in the Link header"""
+    try:
+        page = log_query.page_params(request.query_params)
+        rows, next_cursor = log_query.fetch(_install_logs_for(request), INSTALL_LOG_FIELDS, **page)
+    except log_query.LogQueryError as e:
+        return Response({"detail": str(e)}, status=400)
+    response = Response(rows)
+    if next_cursor:
+        url = replace_query_param(request.build_absolute_uri(), "cursor", next_cursor)
+        response["Link"] = f'<{url}>; rel="next"'
+    return response
 
 @api_view(["POST"])
 def install_direct(request):
-    """Direct install trigger (UI button can use this)"""
+    """Queue an install (app_name, version, user, note) → 202 with the job to poll"""
     app_name = request.data.get("app_name")
     version = request.data.get("version")
     note = request.data.get("note", "")
+    user = request.data.get("user")
 
     if not app_name or not version:
         return Response({"detail": "app_name and version required"}, status=400)
@@ -73,144 +233,413 @@ def install_direct(request):
     app = ApplicationCatalog.objects.filter(app_name=app_name).first()
     if not app:
         return Response({"detail": "App not found"}, status=404)
-    if version not in app.version_list():
+    index = get_index()
+    if not index.is_available(app_name, version):
         return Response({"detail": "Version not available"}, status=400)
+    if user and not index.check_user(user, app_name, version):
+        return Response({"detail": f"{user} is not eligible for {app_name} {version}"}, status=403)
 
-    req_id = append_request(note or f"Install {app_name} {version}", app_name, version, status="Installed")
-    InstallLog.objects.create(user_prompt=note, app=app, version=version, status="Installed")
-
+    # Deployment runs in the install workers; poll /install/jobs/<job_id>/ for progress
+    job = install_jobs.submit(app_name, version, user=user, note=note)
     return Response({
-        "message": f"Installed (simulated) {app_name} {version}",
-        "request_id": req_id
-    })
+        "message": f"Install of {app_name} {version} queued",
+        **install_jobs.to_dict(job),
+    }, status=202)
 
-# --------------------------- FILES --------------------------- #
 @api_view(["GET"])
-def list_files(request):
-    """Role-based file listing"""
-    role = request.query_params.get("role", "user")
+def install_job_status(request, job_id):
+    """Poll an install job: status, current step, progress (0..1), attempts, error"""
+    job = install_jobs.get_job(job_id)
+    if not job:
+        return Response({"detail": "Install job not found"}, status=404)
+    return Response(install_jobs.to_dict(job))
 
-    if role in ("admin", "manager"):
-        files = File.objects.all().order_by("-is_public", "filename")
-    else:
-        files = File.objects.filter(is_public=True).order_by("filename")
+@api_view(["GET"])
+def install_job_list(request):
+    """Most recent install jobs, newest first (?user=&limit=)"""
+    try:
+        limit = min(int(request.query_params.get("limit", install_jobs.LIST_LIMIT)), install_jobs.LIST_LIMIT)
+    except ValueError:
+        return Response({"detail": "limit must be an integer"}, status=400)
+    jobs = install_jobs.jobs_for(request.query_params.get("user", ""), limit=max(limit, 1))
+    return Response([install_jobs.to_dict(job) for job in jobs])
+
+# --------------------------- PACKAGES --------------------------- #
+def _packages_for(request):
+    app = request.query_params.get("app")
+    qs = Package.objects.all()
+    return qs.filter(app_name=app) if app else qs
 
-    data = [{"id": f.id, "filename": f.filename, "is_public": f.is_public} for f in files]
-    return Response(data)
+@api_view(["GET"])
+@conditional(_packages_for, timestamp_field="created_at")
+def list_packages(request):
+    """Stored installers with their SHA-256, size and filename (?app=)"""
+    return Response(package_store.checksums(request.query_params.get("app")))
+
+@api_view(["GET"])
+def download_package(request, app_name, version):
+    """Installer for an eligible (app, version) from the content-addressed store (?user= or ?role=)"""
+    params = request.query_params
+    index = get_index()
+    if not index.is_available(app_name, version):
+        return Response({"detail": "Version not available"}, status=404)
+    user, role = params.get("user"), params.get("role")
+    allowed = index.check_user(user, app_name, version) if user else index.check(role or "user", app_name, version)
+    if not allowed:
+        return Response({"detail": f"{user or role or 'user'} is not eligible for {app_name} {version}"}, status=403)
+    try:
+        package, path = package_store.get(app_name, version)
+    except (OSError, package_store.PackageError) as e:
+        return Response({"detail": f"Package unavailable: {e}"}, status=503)
+    response = file_catalog.file_response(
+        request, path, package.filename, etag=f'"{package.sha256}"', root=package_store.store_root() / "blobs",
+    )
+    response["X-Checksum-SHA256"] = package.sha256
+    return response
+
+# --------------------------- FILES --------------------------- #
+FILE_SEARCH_MAX = 200
+
+def _file_dict(entry):
+    return {"id": entry.id, "filename": entry.filename, "is_public": entry.is_public,
+            "category": entry.category, "size": entry.size}
+
+def files_data(role):
+    return [_file_dict(e) for e in file_catalog.get_index().visible(role)]
+
+@api_view(["GET"])
+@conditional()   # validated on the listing served from the in-process index, which may lag the table
+def list_files(request):
+    """Role-based file listing; ?q= searches names (prefix + typo tolerant), ?category= narrows"""
+    params = request.query_params
+    role = params.get("role", "user")
+    q, category = params.get("q", ""), params.get("category") or None
+    index = file_catalog.get_index()
+    if not q.strip():
+        return Response([_file_dict(e) for e in index.visible(role, category)])
+    try:
+        limit = min(max(int(params.get("limit", 50)), 1), FILE_SEARCH_MAX)
+    except ValueError:
+        return Response({"detail": "limit must be an integer"}, status=400)
+    return Response([
+        {**_file_dict(e), "score": score} for e, score in index.search(q, role, category=category, limit=limit)
+    ])
 
 @api_view(["GET"])
 def download_file(request, file_id):
-    """Dummy file download, respecting role permissions"""
+    """Stream a file from FILE_STORAGE_DIR (Range requests supported), respecting role permissions"""
     role = request.query_params.get("role", "user")
     f = File.objects.filter(id=file_id).first()
     if not f:
         return Response({"detail": "File not found"}, status=404)
-    if not f.is_public and role not in ("admin", "manager"):
+    if not file_catalog.can_see(role, f.is_public, f.category):
         return Response({"detail": "Forbidden"}, status=403)
+    path = file_catalog.resolve_path(f)
+    if path is None:
+        return Response({"detail": f"No stored content for {f.filename}"}, status=404)
+    return file_catalog.file_response(request, path, f.filename)
 
-    buf = io.BytesIO()
-    buf.write(f"Dummy file: {f.filename}\nGenerated at {dt.datetime.now()}".encode())
-    buf.seek(0)
-    return FileResponse(buf, as_attachment=True, filename=f.filename)
+# --------------------------- FRONTEND CONFIG --------------------------- #
+@api_view(["GET"])
+def frontend_config(request):
+    """Catalog, eligibility policy and role-visible files for the UI.
 
-# --------------------------- EXPORT LOGS --------------------------- #
+    Versioned by a content hash sent as ETag / X-Config-Version; a client
+    that sends the current version back in If-None-Match gets a 304.
+    """
+    role = request.query_params.get("role", "user")
+    data = {
+        "catalog": catalog_data(),
+        "eligibility": eligibility_data(),
+        "files": files_data(role),
+    }
+    version = hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()[:16]
+    etag = f'"{version}"'
+
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = Response(status=304)
+    else:
+        response = Response({**data, "version": version})
+    response["ETag"] = etag
+    response["X-Config-Version"] = version
+    response["Cache-Control"] = "no-cache"   # always revalidate; a 304 costs almost nothing
+    return response
+
+# --------------------------- PAGE BOOTSTRAP --------------------------- #
 @api_view(["GET"])
-def export_logs_excel(request):
-    """Export logs filtered by role/user to Excel"""
+def bootstrap(request):
+    """Everything the Streamlit page renders on load, in one round trip.
+
+    Each section matches the first page of its own endpoint (/logs/,
+    /tickets/, /app-requests/, /catalog/, /files/) for this user/role.
+    live_cursor is the /api/live/ event id the snapshot was taken at.
+    """
     role = request.query_params.get("role", "user")
     user = request.query_params.get("user", "")
+    privileged = role in ("admin", "manager")
+    # Taken before the snapshot: /api/live/?after=live_cursor replays anything newer (rows are keyed, so overlap is harmless)
+    live_cursor = live.current_cursor()
+
+    logs = Log.objects.order_by("-timestamp", "-id")
+    tickets = Ticket.objects.order_by("-created_at")
+    if not privileged:
+        logs = logs.filter(user=user)
+        tickets = tickets.filter(user=user)
+
+    log_rows = list(logs[:LOG_PAGE_SIZE + 1])
+    next_logs = None
+    if len(log_rows) > LOG_PAGE_SIZE:
+        query = {"page_size": LOG_PAGE_SIZE, "cursor": KeysetPagination().encode_cursor(log_rows[LOG_PAGE_SIZE - 1])}
+        if not privileged:
+            query["user"] = user
+        next_logs = request.build_absolute_uri(f"{reverse('log-list')}?{urlencode(query)}")
+
+    data = {
+        "live_cursor": live_cursor,
+        "catalog": catalog_data(),
+        "files": files_data(role),
+        "logs": {
+            "next": next_logs,
+            "results": LogSerializer(log_rows[:LOG_PAGE_SIZE], many=True).data,
+        },
+        "tickets": {
+            "count": tickets.count(),
+            "results": TicketSerializer(tickets[:TICKET_PAGE_SIZE], many=True).data,
+        },
+    }
+    if privileged:
+        data["open_tickets"] = serialize_many(TicketSerializer, Ticket.objects.filter(status="open").order_by("-created_at")[:200])
+        data["app_requests"] = serialize_many(AppRequestSerializer, AppRequest.objects.order_by("-created_at"))
+    return Response(data)
 
-    if role in ("admin", "manager"):
-        logs = InstallLog.objects.all().order_by("-timestamp")
-    else:
-        logs = InstallLog.objects.filter(user_prompt__icontains=user).order_by("-timestamp")
+# --------------------------- EXPORT LOGS --------------------------- #
+@api_view(["GET"])
+def export_logs_excel(request):
+    """Export logs filtered by role/user/range as xlsx (default), csv or parquet (?fmt=)"""
+    params = request.query_params
+    fmt = params.get("fmt", "xlsx")
 
-    rows = [
-        {
-            "timestamp": l.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
-            "app": l.app.app_name if l.app else None,
-            "version": l.version,
-            "status": l.status,
-            "user_prompt": l.user_prompt,
-        }
-        for l in logs
-    ]
+    if fmt not in exporters.CONTENT_TYPES:
+        return Response({"detail": f"fmt must be one of {sorted(exporters.CONTENT_TYPES)}"}, status=400)
+    if fmt == "parquet" and not exporters.parquet_available():
+        return Response({"detail": "parquet export requires pyarrow"}, status=501)
 
-    df = pd.DataFrame(rows or [])
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine="xlsxwriter") as xw:
-        (df if not df.empty else pd.DataFrame({"info": ["no logs"]})).to_excel(xw, index=False, sheet_name="logs")
-    output.seek(0)
-    return FileResponse(output, as_attachment=True, filename="deployment_logs.xlsx")
+    try:
+        logs = export_jobs.log_queryset(
+            params.get("role", "user"), params.get("user", ""), params.get("since"), params.get("until")
+        )
+    except export_jobs.ExportError as e:
+        return Response({"detail": str(e)}, status=400)
+
+    rows = exporters.iter_rows(logs)
+    filename = f"deployment_logs.{fmt}"
+    if fmt == "csv":
+        response = StreamingHttpResponse(exporters.stream_csv(rows), content_type=exporters.CONTENT_TYPES["csv"])
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    out = exporters.write_parquet(rows) if fmt == "parquet" else exporters.write_xlsx(rows)
+    return FileResponse(out, as_attachment=True, filename=filename, content_type=exporters.CONTENT_TYPES[fmt])
+
+@api_view(["POST"])
+def export_job_create(request):
+    """Queue a background export (role, user, since, until, fmt); identical requests share one job"""
+    data = request.data
+    try:
+        job = export_jobs.submit(
+            role=data.get("role", "user"),
+            user=data.get("user", ""),
+            since=data.get("since"),
+            until=data.get("until"),
+            fmt=data.get("fmt", "xlsx"),
+        )
+    except export_jobs.ExportError as e:
+        return Response({"detail": str(e)}, status=400)
+    return Response(job.to_dict(), status=200 if job.status == "done" else 202)
+
+@api_view(["GET"])
+def export_job_status(request, job_id):
+    """Poll an export job: status, progress (0..1), rows written"""
+    job = export_jobs.get_job(job_id)
+    if not job:
+        return Response({"detail": "Export job not found"}, status=404)
+    return Response(job.to_dict())
+
+@api_view(["GET"])
+def export_job_download(request, job_id):
+    """Download a finished export artifact"""
+    job = export_jobs.get_job(job_id)
+    if not job:
+        return Response({"detail": "Export job not found"}, status=404)
+    if job.status != "done" or not job.path.exists():
+        return Response({"detail": f"Export is {job.status}", **job.to_dict()}, status=409)
+    return FileResponse(
+        open(job.path, "rb"),
+        as_attachment=True,
+        filename=f"deployment_logs.{job.fmt}",
+        content_type=exporters.CONTENT_TYPES[job.fmt],
+    )
 
 # --------------------------- AGENT --------------------------- #
+def _classify_messages(text):
+    return [
+        {"role": "system", "content": "Classify if text is about installing/downloading software or files."},
+        {"role": "user", "content": f"Text: {text}. Reply JSON with keys: intent, app, version, file"}
+    ]
+
+def _chat_messages(text):
+    return [
+        {"role": "system", "content": "You are a helpful IT support assistant."},
+        {"role": "user", "content": text}
+    ]
+
+def chat_reply(text, llm=None):
+    """Fallback chat answer through the response cache and coalescing, or None when no LLM is configured"""
+    if llm is None and not os.environ.get("GROQ_API_KEY"):
+        return None
+    return groq_chat(_chat_messages(text), llm=llm)
+
+def _parse_classification(classification):
+    try:
+        return json.loads(classification)
+    except Exception:
+        return {"intent": "other"}
+
+def classify_intent(text):
+    """Local matcher first; only low-confidence inputs go to Groq. Returns (parsed, source)"""
+    parsed = classify_local(text)
+    if parsed is not None:
+        return parsed, "local"
+    return _parse_classification(groq_chat(_classify_messages(text))), "llm"
+
+async def aclassify_intent(text):
+    parsed = await sync_to_async(classify_local)(text)
+    if parsed is not None:
+        return parsed, "local"
+    return _parse_classification(await agroq_chat(_classify_messages(text))), "llm"
+
+def resolve_intent(text, parsed, source):
+    """DB side of the agent → (payload, status), or None when the fallback chat should answer"""
+    if parsed.get("intent") not in ["install", "download"]:
+        return None
+
+    if parsed.get("file"):   # File download
+        fname = parsed["file"]
+        f = File.objects.filter(filename__icontains=fname).first()
+        if not f:
+            return {"detail": f"File '{fname}' not found", "classified_by": source}, 404
+        return {
+            "message": f"📂 File '{f.filename}' ready to download",
+            "file_id": f.id,
+            "classified_by": source,
+        }, 200
+
+    # Application case
+    app_name = parsed.get("app")
+    version = parsed.get("version")
+
+    if not app_name:
+        return {"detail": "Which application do you want to install/download?", "classified_by": source}, 200
+
+    app = ApplicationCatalog.objects.filter(app_name__iexact=app_name).first()
+    if not app:
+        return {"detail": f"App '{app_name}' not found", "classified_by": source}, 404
+
+    available_versions = app.version_list()
+    if version and version not in available_versions:
+        return {
+            "detail": f"Version not available. Choose from {available_versions}",
+            "classified_by": source,
+        }, 400
+
+    chosen_version = version or available_versions[-1]
+    audit.record(InstallLog(user_prompt=text, app=app, version=chosen_version, status="Installed"))
+
+    return {
+        "message": f"✅ {parsed['intent'].title()}ed {app_name} {chosen_version} (simulated)",
+        "app": app_name,
+        "version": chosen_version,
+        "status": "Installed",
+        "classified_by": source,
+    }, 200
+
+@api_view(["GET"])
+def agent_cache_stats(request):
+    """Hit/miss counters of the Groq response cache"""
+    return Response(get_cache().stats())
+
+@api_view(["GET"])
+def agent_metrics(request):
+    """Rate limiting (allowed/rejected per role), coalesced LLM calls and cache counters of this worker"""
+    return Response({
+        "rate_limit": get_limiter().stats(),
+        "coalescing": get_flight().stats(),
+        "cache": get_cache().stats(),
+    })
+
+def _sse(data, event=None):
+    head = f"event: {event}\n" if event else ""
+    return f"{head}data: {json.dumps(data)}\n\n"
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@rate_limited
+def agent_stream(request):
+    """Classify → app/file intent or fallback chat, as Server-Sent Events: chat tokens are sent as Groq produces them.
+
+    Events: `meta` (classified_by), unnamed `data: {"delta": ...}` chunks, `result`
+    for app/file intents, `error`, and a final `done`.
+    """
+    try:
+        data = json.loads(request.body)
+    except Exception as e:
+        return JsonResponse({"detail": f"Agent error: {e}"}, status=400)
+    text = data.get("input", "").strip()
+    if not text:
+        return JsonResponse({"detail": "Input required"}, status=400)
+
+    def events():
+        try:
+            parsed, source = classify_intent(text)
+            resolved = resolve_intent(text, parsed, source)
+            if resolved is not None:
+                payload, status = resolved
+                yield _sse(dict(payload, code=status), "result")
+            else:
+                yield _sse({"classified_by": source}, "meta")
+                for delta in groq_chat_stream(_chat_messages(text)):
+                    yield _sse({"delta": delta})
+        except Exception as e:
+            traceback.print_exc()
+            yield _sse({"detail": f"Agent error: {e}"}, "error")
+        yield _sse({}, "done")
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"   # don't let a proxy buffer the stream
+    return response
+
 @csrf_exempt
 @require_http_methods(["POST"])
-def agent_entry(request):
-    """Groq agent → classify intent: install/download app or file, else fallback chat"""
+@rate_limited
+async def agent_entry_async(request):
+    """Classify → app/file intent or fallback chat, for ASGI: LLM calls await instead of holding a worker thread"""
     try:
         data = json.loads(request.body)
         text = data.get("input", "").strip()
         if not text:
             return JsonResponse({"detail": "Input required"}, status=400)
 
-        # Ask Groq to classify
-        classification = groq_chat([
-            {"role": "system", "content": "Classify if text is about installing/downloading software or files."},
-            {"role": "user", "content": f"Text: {text}. Reply JSON with keys: intent, app, version, file"}
-        ])
+        parsed, source = await aclassify_intent(text)
 
-        try:
-            parsed = json.loads(classification)
-        except Exception:
-            parsed = {"intent": "other"}
-
-        # ---------------- APP / FILE INTENTS ---------------- #
-        if parsed.get("intent") in ["install", "download"]:
-            if parsed.get("file"):   # File download
-                fname = parsed["file"]
-                f = File.objects.filter(filename__icontains=fname).first()
-                if not f:
-                    return JsonResponse({"detail": f"File '{fname}' not found"}, status=404)
-                return JsonResponse({
-                    "message": f"📂 File '{f.filename}' ready to download",
-                    "file_id": f.id
-                })
-
-            # Application case
-            app_name = parsed.get("app")
-            version = parsed.get("version")
-
-            if not app_name:
-                return JsonResponse({"detail": "Which application do you want to install/download?"}, status=200)
-
-            app = ApplicationCatalog.objects.filter(app_name__iexact=app_name).first()
-            if not app:
-                return JsonResponse({"detail": f"App '{app_name}' not found"}, status=404)
-
-            available_versions = app.version_list()
-            if version and version not in available_versions:
-                return JsonResponse({
-                    "detail": f"Version not available. Choose from {available_versions}"
-                }, status=400)
-
-            chosen_version = version or available_versions[-1]
-            InstallLog.objects.create(user_prompt=text, app=app, version=chosen_version, status="Installed")
-
-            return JsonResponse({
-                "message": f"✅ {parsed['intent'].title()}ed {app_name} {chosen_version} (simulated)",
-                "app": app_name,
-                "version": chosen_version,
-                "status": "Installed"
-            })
-
-        # ---------------- FALLBACK ---------------- #
-        reply = groq_chat([
-            {"role": "system", "content": "You are a helpful IT support assistant."},
-            {"role": "user", "content": text}
-        ])
-        return JsonResponse({"output": reply})
+        resolved = await sync_to_async(resolve_intent)(text, parsed, source)
+        if resolved is not None:
+            payload, status = resolved
+            return JsonResponse(payload, status=status)
+
+        reply = await agroq_chat(_chat_messages(text))
+        return JsonResponse({"output": reply, "classified_by": source})
 
     except Exception as e:
         traceback.print_exc()
-        return JsonResponse({"detail": f"Agent error: {e}"}, status=500)
\ No newline at end of file
+        return JsonResponse({"detail": f"Agent error: {e}"}, status=500)
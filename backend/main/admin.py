@@ -1,6 +1,6 @@
 from django.contrib import admin
 from import_export.admin import ExportMixin
-from .models import Task, Log
+from .models import Task, Log, Ticket, EligibilityRule, UserRole
 
 
 class TaskAdmin(ExportMixin, admin.ModelAdmin):
@@ -17,5 +17,28 @@ class LogAdmin(ExportMixin, admin.ModelAdmin):
     ordering = ("-timestamp",)
 
 
+class TicketAdmin(ExportMixin, admin.ModelAdmin):
+    list_display = ("ticket_id", "user", "role", "action", "status", "created_at")
+    list_filter = ("status", "role", "created_at")
+    search_fields = ("ticket_id", "user", "action")
+    ordering = ("-created_at",)
+
+
+class EligibilityRuleAdmin(admin.ModelAdmin):
+    list_display = ("role", "app_name", "version", "updated_at")
+    list_filter = ("role", "app_name")
+    search_fields = ("app_name", "version")
+    ordering = ("role", "app_name", "id")
+
+
+class UserRoleAdmin(admin.ModelAdmin):
+    list_display = ("username", "role", "updated_at")
+    list_filter = ("role",)
+    search_fields = ("username",)
+
+
 admin.site.register(Task, TaskAdmin)
-admin.site.register(Log, LogAdmin)
\ No newline at end of file
+admin.site.register(Log, LogAdmin)
+admin.site.register(Ticket, TicketAdmin)
+admin.site.register(EligibilityRule, EligibilityRuleAdmin)
+admin.site.register(UserRole, UserRoleAdmin)
\ No newline at end of file
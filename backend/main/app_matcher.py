@@ -0,0 +1,174 @@
+# main/app_matcher.py
+"""Fuzzy app/version matcher for free-text chat messages.
+
+App names and their aliases are folded to lowercase alphanumerics
+("MS Word", "ms-word" and "msword" are the same key) and indexed by
+character trigram. A message is split into word spans of up to
+MAX_SPAN_WORDS words; each span only gets scored against the terms that
+share a trigram with it. Scores are the Dice coefficient of the two
+trigram sets (1.0 for an exact name or alias), so lookups stay cheap as
+the catalog grows.
+
+The vocabulary is every ApplicationCatalog app and its versions, so an app
+no role may install yet is still recognised; callers apply the eligibility
+policy with match(allowed=...). The shared matcher is rebuilt when the
+catalog table changes: local saves and deletes expire it at once, other
+processes' writes are picked up after CATALOG_REFRESH seconds.
+"""
+import re, threading, time
+from collections import Counter, defaultdict, namedtuple
+from functools import lru_cache
+from itertools import chain
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_save
+
+from core.models import ApplicationCatalog
+
+FOLD_RE = re.compile(r"[^a-z0-9]+")
+WORD_RE = re.compile(r"[A-Za-z0-9][\w.+#-]*")
+VERSION_RE = re.compile(r"^(?:\d+(?:\.\d+)*|latest)$", re.I)
+MAX_SPAN_WORDS = 3
+DEFAULT_CUTOFF = 0.5
+SHORTLIST = 20   # terms rescored per span
+SCORE_CACHE_SIZE = 8192   # spans like "install" or "please" recur in every message
+
+# Names people actually type; the "MS " prefix rule below covers "excel", "msexcel", ...
+ALIASES = {
+    "MS Word": ["winword", "word doc"],
+    "MS Excel": ["spreadsheet"],
+    "Zoom": ["zoom meetings"],
+}
+
+Candidate = namedtuple("Candidate", "app score term version")
+
+
+def _fold(text):
+    return FOLD_RE.sub("", text.lower())
+
+def _trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _aliases(app_name, extra=()):
+    terms = {app_name, *extra}
+    prefix, _, rest = app_name.partition(" ")
+    if prefix.lower() == "ms" and rest:
+        terms.update({rest, f"microsoft {rest}"})
+    return terms
+
+
+class AppMatcher:
+    def __init__(self, apps, aliases=None):
+        """apps: {app_name: [versions]}, aliases: {app_name: [alias, ...]}"""
+        aliases = ALIASES if aliases is None else aliases
+        self.apps = apps
+        self._terms = []                  # [(folded key, trigrams, app_name)]
+        self._exact = {}                  # folded key → app_name
+        self._index = defaultdict(list)   # trigram → [term id]
+        for app in apps:
+            for term in _aliases(app, aliases.get(app, ())):
+                key = _fold(term)
+                if len(key) < 2 or key in self._exact:
+                    continue
+                grams = _trigrams(key)
+                self._exact[key] = app
+                for gram in grams:
+                    self._index[gram].append(len(self._terms))
+                self._terms.append((key, grams, app))
+        self._score = lru_cache(maxsize=SCORE_CACHE_SIZE)(self._score)
+
+    def _spans(self, words):
+        for size in range(1, MAX_SPAN_WORDS + 1):
+            for start in range(len(words) - size + 1):
+                yield start + size, _fold("".join(words[start:start + size]))
+
+    def _version(self, app, words):
+        versions = self.apps.get(app) or []
+        by_key = {v.lower(): v for v in versions}
+        for word in words:
+            if word.lower() in by_key:
+                return by_key[word.lower()]
+        for word in words:
+            if VERSION_RE.match(word):
+                prefixed = [v for v in versions if v.lower().startswith(word.lower())]
+                if prefixed:
+                    return prefixed[0]
+        return None
+
+    def _score(self, key):
+        """[(app, score, term)] for one folded span; memoized per matcher"""
+        app = self._exact.get(key)
+        if app is not None:
+            return [(app, 1.0, key)]
+        grams = _trigrams(key)
+        # Count postings in C, then only rescore the terms sharing the most trigrams
+        shared = Counter(chain.from_iterable(self._index.get(gram, ()) for gram in grams))
+        scored = []
+        for term_id, n in shared.most_common(SHORTLIST):
+            term_key, term_grams, app = self._terms[term_id]
+            scored.append((app, 2 * n / (len(grams) + len(term_grams)), term_key))
+        return scored
+
+    def match(self, text, limit=5, cutoff=DEFAULT_CUTOFF, allowed=None):
+        """Ranked [Candidate(app, score, term, version)] for apps mentioned in text"""
+        words = WORD_RE.findall(text)
+        best = {}   # app → (score, term, end of matching span)
+        for end, key in self._spans(words):
+            if len(key) < 2:
+                continue
+            for app, score, term in self._score(key):
+                if score >= cutoff and score > best.get(app, (0,))[0]:
+                    best[app] = (score, term, end)
+
+        ranked = sorted(best.items(), key=lambda item: (-item[1][0], item[0]))
+        if allowed is not None:
+            allowed = set(allowed)
+            ranked = [item for item in ranked if item[0] in allowed]
+        return [
+            Candidate(app, round(score, 4), term, self._version(app, words[end:]) or self._version(app, words))
+            for app, (score, term, end) in ranked[:limit]
+        ]
+
+    def best(self, text, **kwargs):
+        found = self.match(text, limit=1, **kwargs)
+        return found[0] if found else None
+
+
+# --------------------------- SHARED MATCHER --------------------------- #
+def catalog_apps():
+    """{app_name: [versions]} from the application catalog; eligibility only filters matches (allowed=)"""
+    return {app.app_name: app.version_list() for app in ApplicationCatalog.objects.order_by("id")}
+
+_matcher = None
+_signature = None
+_checked_at = float("-inf")
+_matcher_lock = threading.Lock()
+
+def _table_signature():
+    return tuple(ApplicationCatalog.objects.aggregate(n=Count("id"), last=Max("updated_at")).values())
+
+def get_matcher():
+    """Process-wide matcher, rebuilt when the ApplicationCatalog table changed"""
+    global _matcher, _signature, _checked_at
+    refresh = getattr(settings, "CATALOG_REFRESH", 30)
+    if _matcher is not None and time.monotonic() - _checked_at < refresh:
+        return _matcher
+    with _matcher_lock:
+        if _matcher is None or time.monotonic() - _checked_at >= refresh:
+            signature = _table_signature()
+            if _matcher is None or signature != _signature:
+                _matcher, _signature = AppMatcher(catalog_apps()), signature
+            _checked_at = time.monotonic()
+    return _matcher
+
+def _invalidate(sender, **kwargs):
+    def expire():
+        global _checked_at
+        _checked_at = float("-inf")   # next get_matcher() compares signatures and rebuilds
+    transaction.on_commit(expire)
+
+post_save.connect(_invalidate, sender=ApplicationCatalog, dispatch_uid="app-matcher-save")
+post_delete.connect(_invalidate, sender=ApplicationCatalog, dispatch_uid="app-matcher-delete")
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class MainConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'main'
+
+    def ready(self):
+        from . import eligibility  # noqa: F401  (connects the policy index signals)
+        from . import stats  # noqa: F401  (dashboard counters follow Log/InstallLog/AppRequest writes)
+        from . import live  # noqa: F401  (Log/AppRequest/InstallJob writes feed /api/live/)
+        from mimic_backend import db  # noqa: F401  (SQLite pragmas on every new connection)
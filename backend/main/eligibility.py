@@ -0,0 +1,165 @@
+# main/eligibility.py
+"""Role → app → version eligibility, compiled from the EligibilityRule table.
+
+The policy lives in memory as one frozenset of versions per (role, app), so
+a check is a dict lookup plus a set membership test. Saves and deletes in
+this process patch only the (role, app) entries they touch, once the
+transaction commits. Other worker processes compare a cheap table signature
+at most every ELIGIBILITY_REFRESH seconds and rebuild when it moved.
+"""
+import itertools, threading, time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.signals import pre_save, post_save, post_delete
+
+from .models import EligibilityRule, UserRole
+
+DEFAULT_ROLE = "user"
+_generations = itertools.count(1)
+
+
+class EligibilityIndex:
+    def __init__(self, rules, users):
+        """rules: [(role, app_name, version)] in display order, users: {username: role}"""
+        ordered = {}
+        for role, app, version in rules:
+            ordered.setdefault((role, app), []).append(version)
+        self._ordered = ordered                                     # (role, app) → [versions]
+        self._rules = {key: frozenset(v) for key, v in ordered.items()}
+        self._available = {}                                        # app → versions any role may install
+        for (_, app), versions in self._rules.items():
+            self._available[app] = self._available.get(app, frozenset()) | versions
+        self._users = dict(users)
+        self._lock = threading.Lock()
+        self.generation = next(_generations)
+
+    @classmethod
+    def from_db(cls):
+        rules = EligibilityRule.objects.order_by("id").values_list("role", "app_name", "version")
+        users = UserRole.objects.values_list("username", "role")
+        return cls(rules, users)
+
+    # ---------------- Lookups ---------------- #
+    def role_of(self, username):
+        return self._users.get(username, DEFAULT_ROLE)
+
+    def check(self, role, app, version):
+        return version in self._rules.get((role, app), ())
+
+    def check_user(self, username, app, version):
+        return self.check(self.role_of(username), app, version)
+
+    def is_available(self, app, version):
+        return version in self._available.get(app, ())
+
+    def policy(self):
+        """{role: {app_name: [versions]}}"""
+        data = {}
+        for (role, app), versions in self._ordered.items():
+            data.setdefault(role, {})[app] = list(versions)
+        return data
+
+    # ---------------- Incremental updates ---------------- #
+    def set_rules(self, role, app, versions):
+        """Replace the versions of one (role, app); an empty list removes it"""
+        with self._lock:
+            key = (role, app)
+            if versions:
+                self._ordered[key] = list(versions)
+                self._rules[key] = frozenset(versions)
+            else:
+                self._ordered.pop(key, None)
+                self._rules.pop(key, None)
+            available = frozenset().union(*(v for (_, a), v in self._rules.items() if a == app))
+            if available:
+                self._available[app] = available
+            else:
+                self._available.pop(app, None)
+            self.generation = next(_generations)
+
+    def set_user(self, username, role=None):
+        """Assign a role; None forgets the user (they fall back to DEFAULT_ROLE)"""
+        with self._lock:
+            if role is None:
+                self._users.pop(username, None)
+            else:
+                self._users[username] = role
+            self.generation = next(_generations)
+
+
+# --------------------------- SHARED INDEX --------------------------- #
+_index = None
+_signature = None
+_checked_at = 0.0
+_index_lock = threading.Lock()
+
+def _table_signature():
+    rules = EligibilityRule.objects.aggregate(n=Count("id"), last=Max("updated_at"))
+    users = UserRole.objects.aggregate(n=Count("id"), last=Max("updated_at"))
+    return rules["n"], rules["last"], users["n"], users["last"]
+
+def get_index():
+    """Process-wide index, rebuilt when another process changed the policy"""
+    global _index, _signature, _checked_at
+    refresh = getattr(settings, "ELIGIBILITY_REFRESH", 30)
+    if _index is not None and time.monotonic() - _checked_at < refresh:
+        return _index
+    with _index_lock:
+        if _index is None or time.monotonic() - _checked_at >= refresh:
+            signature = _table_signature()
+            if _index is None or signature != _signature:
+                _index, _signature = EligibilityIndex.from_db(), signature
+            _checked_at = time.monotonic()
+    return _index
+
+def eligibility_data():
+    """{role: {app_name: [versions]}}"""
+    return get_index().policy()
+
+
+# --------------------------- SIGNALS --------------------------- #
+def _patch(update):
+    """Apply update(index) to the built index once the write commits"""
+    def apply():
+        global _signature
+        if _index is not None:
+            update(_index)
+            _signature = _table_signature()   # our own write must not trigger a full rebuild
+    transaction.on_commit(apply)
+
+def _remember_previous(sender, instance, **kwargs):
+    # A save may move a row to another (role, app) or username; the old entry needs patching too
+    fields = ("role", "app_name") if sender is EligibilityRule else ("username",)
+    instance._eligibility_previous = (
+        sender.objects.filter(pk=instance.pk).values_list(*fields).first() if instance.pk else None
+    )
+
+def _rule_changed(sender, instance, **kwargs):
+    keys = {(instance.role, instance.app_name), getattr(instance, "_eligibility_previous", None)} - {None}
+
+    def update(index):
+        for role, app in keys:
+            versions = EligibilityRule.objects.filter(role=role, app_name=app).order_by("id")
+            index.set_rules(role, app, list(versions.values_list("version", flat=True)))
+    _patch(update)
+
+def _user_saved(sender, instance, **kwargs):
+    previous = getattr(instance, "_eligibility_previous", None)
+
+    def update(index):
+        if previous and previous[0] != instance.username:
+            index.set_user(previous[0])
+        index.set_user(instance.username, instance.role)
+    _patch(update)
+
+def _user_deleted(sender, instance, **kwargs):
+    _patch(lambda index: index.set_user(instance.username))
+
+for _model in (EligibilityRule, UserRole):
+    pre_save.connect(_remember_previous, sender=_model, dispatch_uid=f"eligibility-{_model.__name__}-pre")
+post_save.connect(_rule_changed, sender=EligibilityRule, dispatch_uid="eligibility-rule-save")
+post_delete.connect(_rule_changed, sender=EligibilityRule, dispatch_uid="eligibility-rule-delete")
+post_save.connect(_user_saved, sender=UserRole, dispatch_uid="eligibility-user-save")
+post_delete.connect(_user_deleted, sender=UserRole, dispatch_uid="eligibility-user-delete")
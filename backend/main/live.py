@@ -0,0 +1,254 @@
+# main/live.py
+"""Live row changes for dashboards: GET /api/live/ as Server-Sent Events.
+
+Writers append the rows they changed to the LiveEvent outbox inside their
+own transaction, so an event exists exactly when its change committed,
+whichever process made it (web worker, audit sink, install worker):
+
+    logs       Log rows                 as LogSerializer renders them
+    requests   AppRequest creates/edits as AppRequestSerializer renders them
+    installs   InstallJob progress      as core.install_jobs.to_dict renders it
+
+Each web process runs one tailer thread that reads the outbox past the last
+id it has seen and fans the batch out to that process's open streams. N
+open dashboards cost one indexed query per LIVE_POLL_INTERVAL instead of N
+full list reloads; commits made in this process wake the tailer at once.
+
+Event ids are outbox ids. A client reconnecting with Last-Event-ID (or
+?after=) gets what it missed replayed from the table, or a `reset` event
+when that is more than LIVE_REPLAY_MAX rows or already pruned, meaning
+"refetch your snapshot". Events older than LIVE_RETENTION seconds are pruned.
+
+Streams stay open for as long as the client listens, so /api/live/ is only
+served under ASGI (mimic_backend.asgi); WSGI workers answer 501.
+"""
+import asyncio, json, logging, threading, time
+from collections import deque
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Max, Min
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from core.models import InstallJob
+from mimic_backend import audit
+from .models import AppRequest, LiveEvent, Log
+from .serializers import AppRequestSerializer, LogSerializer
+
+logger = logging.getLogger(__name__)
+
+STREAMS = ("logs", "requests", "installs")
+EVENT_FIELDS = ("id", "stream", "user", "key", "data")
+PRUNE_EVERY = 60   # seconds between outbox prunes per process
+
+
+# --------------------------- PUBLISH --------------------------- #
+_pruned_at = float("-inf")
+
+def publish(stream, events):
+    """Append [(key, user, row)] to the outbox, in the caller's transaction"""
+    global _pruned_at
+    if not events:
+        return
+    LiveEvent.objects.bulk_create([
+        LiveEvent(stream=stream, key=str(key), user=user or "", data=row) for key, user, row in events
+    ])
+    transaction.on_commit(hub.wake)
+    if time.monotonic() - _pruned_at > PRUNE_EVERY:
+        _pruned_at = time.monotonic()
+        prune()
+
+def prune():
+    """Delete events older than LIVE_RETENTION; returns how many"""
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, "LIVE_RETENTION", 3600))
+    return LiveEvent.objects.filter(created_at__lt=cutoff).delete()[0]
+
+def publish_logs(logs):
+    rows = LogSerializer(logs, many=True).data
+    publish("logs", [(log.pk, log.user, row) for log, row in zip(logs, rows)])
+
+def publish_requests(requests):
+    rows = AppRequestSerializer(requests, many=True).data
+    publish("requests", [(req.pk, req.requested_by, row) for req, row in zip(requests, rows)])
+
+
+# --------------------------- SIGNALS --------------------------- #
+def _log_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        publish_logs([instance])
+
+def _rows_written(sender, objs, **kwargs):
+    if sender is Log:
+        publish_logs(objs)
+
+def _request_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        publish_requests([instance])
+
+def _install_job_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        from core.install_jobs import to_dict
+        publish("installs", [(instance.pk, instance.user, to_dict(instance))])
+
+post_save.connect(_log_saved, sender=Log, dispatch_uid="live-log-save")
+audit.rows_written.connect(_rows_written, dispatch_uid="live-rows-written")
+post_save.connect(_request_saved, sender=AppRequest, dispatch_uid="live-request-save")
+post_save.connect(_install_job_saved, sender=InstallJob, dispatch_uid="live-installjob-save")
+
+
+# --------------------------- HUB --------------------------- #
+def current_cursor():
+    return LiveEvent.objects.aggregate(last=Max("id"))["last"] or 0
+
+
+class Subscriber:
+    """One open stream: matching events, handed over on its own event loop"""
+
+    def __init__(self, loop, streams, user=None):
+        self.loop = loop
+        self.streams = frozenset(streams)
+        self.user = user                 # None: every user's rows
+        self.pending = deque()
+        self.ready = asyncio.Event()
+        self.overflowed = False
+        self.last_id = 0                 # newest event offered, delivered or not
+
+    def wants(self, stream, user):
+        return stream in self.streams and (self.user is None or user == self.user)
+
+    def offer(self, events):
+        """Runs on the subscriber's loop; past LIVE_QUEUE_MAX the stream is told to reset"""
+        self.last_id = events[-1][0]
+        if self.overflowed or len(self.pending) + len(events) > getattr(settings, "LIVE_QUEUE_MAX", 1000):
+            self.overflowed = True
+            self.pending.clear()
+        else:
+            self.pending.extend(events)
+        self.ready.set()
+
+
+class Hub:
+    """Per-process outbox tailer; runs only while some stream is open"""
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self.last_id = 0
+
+    def wake(self):
+        self._wake.set()
+
+    def subscribe(self, sub):
+        """Register sub; returns the cursor after which the tailer will deliver to it"""
+        with self._lock:
+            if self._thread is None:
+                self.last_id = current_cursor()
+                self._thread = threading.Thread(target=self._run, name="live-tailer", daemon=True)
+                self._thread.start()
+            self._subscribers.add(sub)
+            return self.last_id
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def _fan_out(self, rows):
+        # Under the lock, so a stream subscribing now sees either all of this batch or none
+        for sub in list(self._subscribers):
+            matching = [row for row in rows if sub.wants(row[1], row[2])]
+            if not matching:
+                continue
+            try:
+                sub.loop.call_soon_threadsafe(sub.offer, matching)
+            except RuntimeError:   # its loop is gone
+                self._subscribers.discard(sub)
+
+    def _run(self):
+        interval = getattr(settings, "LIVE_POLL_INTERVAL", 1.0)
+        batch = getattr(settings, "LIVE_BATCH", 500)
+        while True:
+            self._wake.wait(interval)
+            self._wake.clear()
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    break
+                after = self.last_id
+            close_old_connections()
+            try:
+                rows = list(LiveEvent.objects.filter(id__gt=after).order_by("id").values_list(*EVENT_FIELDS)[:batch])
+            except Exception:
+                logger.exception("live tailer: outbox read failed")
+                continue
+            if not rows:
+                continue
+            with self._lock:
+                self.last_id = rows[-1][0]
+                self._fan_out(rows)
+            if len(rows) == batch:
+                self._wake.set()   # more waiting: read on without sleeping
+        connection.close()
+
+
+hub = Hub()
+
+
+# --------------------------- STREAMS --------------------------- #
+def replay(after, until, streams, user=None):
+    """Events in (after, until] for the filter, or None when the client must refetch instead"""
+    if after >= until:
+        return []
+    oldest = LiveEvent.objects.aggregate(first=Min("id"))["first"]
+    if oldest is None or oldest > after + 1:
+        return None   # pruned past the client's cursor
+    events = LiveEvent.objects.filter(id__gt=after, id__lte=until, stream__in=streams)
+    if user is not None:
+        events = events.filter(user=user)
+    limit = getattr(settings, "LIVE_REPLAY_MAX", 1000)
+    rows = list(events.order_by("id").values_list(*EVENT_FIELDS)[:limit + 1])
+    return None if len(rows) > limit else rows
+
+
+def _sse(event_id, event, data):
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _event(row):
+    event_id, stream, user, key, data = row
+    return _sse(event_id, stream, {"key": key, "row": data})
+
+
+async def stream(streams, user=None, after=None):
+    """SSE body: `hello` (or the missed events), then one event per row change, `: ping` when idle"""
+    sub = Subscriber(asyncio.get_running_loop(), streams, user)
+    start = await sync_to_async(hub.subscribe)(sub)
+    keepalive = getattr(settings, "LIVE_KEEPALIVE", 15)
+    try:
+        if after is None:
+            yield _sse(start, "hello", {"cursor": start})
+        else:
+            missed = await sync_to_async(replay)(after, start, streams, user)
+            if missed is None:
+                yield _sse(start, "reset", {"cursor": start})
+            else:
+                for row in missed:
+                    yield _event(row)
+        while True:
+            try:
+                await asyncio.wait_for(sub.ready.wait(), keepalive)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            sub.ready.clear()
+            if sub.overflowed:
+                sub.overflowed = False
+                yield _sse(sub.last_id, "reset", {"cursor": sub.last_id})
+                continue
+            while sub.pending:
+                yield _event(sub.pending.popleft())
+    finally:
+        hub.unsubscribe(sub)
@@ -0,0 +1,96 @@
+# main/log_query.py
+"""Shared read path for the audit log tables (Log, core.InstallLog).
+
+fetch() applies every filter before ordering and slicing, projects the
+requested columns with values_list() so no model instances are built, and
+lets the database format timestamps (FormatTimestamp) instead of calling
+strftime per row. A page is addressed by limit plus either offset or a
+keyset cursor on (timestamp, id); the cursor is the same one /api/logs/
+hands out, so a client can switch endpoints without re-paging.
+"""
+import base64
+from datetime import datetime
+
+from django.db import NotSupportedError
+from django.db.models import CharField, F, Func, Q
+
+DEFAULT_LIMIT = 200
+MAX_LIMIT = 1000
+MAX_OFFSET = 100_000      # deeper pages should use the cursor
+ORDERING = ("-timestamp", "-id")
+
+
+class LogQueryError(ValueError):
+    pass
+
+
+# --------------------------- FORMATTING --------------------------- #
+class FormatTimestamp(Func):
+    """UTC 'YYYY-MM-DD HH:MM:SS' string computed in SQL (the old strftime output)"""
+    arity = 1
+    output_field = CharField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.source_expressions[0])
+        return f"STRFTIME(%s, {sql})", ("%Y-%m-%d %H:%M:%S", *params)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.source_expressions[0])
+        return f"TO_CHAR({sql} AT TIME ZONE 'UTC', %s)", (*params, "YYYY-MM-DD HH24:MI:SS")
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.source_expressions[0])
+        return f"DATE_FORMAT({sql}, %s)", (*params, "%Y-%m-%d %H:%i:%s")
+
+    def as_sql(self, compiler, connection, **extra_context):
+        raise NotSupportedError(f"FormatTimestamp is not implemented for {connection.vendor}")
+
+
+# --------------------------- CURSOR --------------------------- #
+def encode_cursor(timestamp, pk):
+    return base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{pk}".encode()).decode()
+
+def decode_cursor(cursor):
+    """→ (timestamp, pk); LogQueryError on anything malformed"""
+    try:
+        ts, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(ts), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise LogQueryError("Invalid cursor")
+
+
+# --------------------------- QUERY --------------------------- #
+def page_params(params, default_limit=DEFAULT_LIMIT):
+    """limit / offset / cursor from query params, validated and clamped"""
+    try:
+        limit = int(params.get("limit", default_limit))
+        offset = int(params.get("offset", 0))
+    except (TypeError, ValueError):
+        raise LogQueryError("limit and offset must be integers")
+    if offset < 0 or offset > MAX_OFFSET:
+        raise LogQueryError(f"offset must be between 0 and {MAX_OFFSET}; use cursor for deeper pages")
+    cursor = params.get("cursor") or None
+    if cursor and offset:
+        raise LogQueryError("use either offset or cursor, not both")
+    return {"limit": max(1, min(limit, MAX_LIMIT)), "offset": offset, "cursor": cursor}
+
+
+def fetch(queryset, fields, filters=None, limit=DEFAULT_LIMIT, offset=0, cursor=None):
+    """One page of rows as dicts, newest first → (rows, next_cursor or None).
+
+    fields maps output key → model field path or expression, e.g.
+    {"timestamp": FormatTimestamp("timestamp"), "app": "app__app_name"}.
+    filters are lookups applied before the slice. Runs exactly one query.
+    """
+    qs = queryset.filter(**filters) if filters else queryset
+    if cursor:
+        ts, pk = decode_cursor(cursor)
+        qs = qs.filter(Q(timestamp__lt=ts) | Q(timestamp=ts, id__lt=pk))
+    names = list(fields)
+    columns = [F(f) if isinstance(f, str) else f for f in fields.values()]
+    # The raw (timestamp, id) of the last row become the next cursor
+    qs = qs.order_by(*ORDERING).values_list(*columns, "timestamp", "id")
+
+    raw = list(qs[offset:offset + limit + 1])
+    next_cursor = encode_cursor(*raw[limit - 1][-2:]) if len(raw) > limit else None
+    return [dict(zip(names, row)) for row in raw[:limit]], next_cursor
@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from main import retention
+
+
+class Command(BaseCommand):
+    help = "Roll up, archive (gzip JSONL or parquet) and prune audit rows older than the retention window"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--source", choices=[*retention.SOURCES, "all"], default="all")
+        parser.add_argument("--days", type=int, default=getattr(settings, "LOG_RETENTION_DAYS", 90),
+                            help="Keep this many days in the hot tables (default: LOG_RETENTION_DAYS)")
+        parser.add_argument("--before", help="Archive days before this date (YYYY-MM-DD) instead of --days")
+        parser.add_argument("--format", choices=sorted(retention.FORMATS), default="jsonl")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many rows each day holds")
+
+    def handle(self, *args, **options):
+        if options["before"]:
+            before = parse_date(options["before"])
+            if before is None:
+                raise CommandError(f"Invalid --before: {options['before']}")
+        else:
+            before = timezone.now().date() - timedelta(days=options["days"])
+
+        sources = list(retention.SOURCES) if options["source"] == "all" else [options["source"]]
+        total = 0
+        for source in sources:
+            try:
+                processed = retention.run(
+                    source, before,
+                    fmt=options["format"],
+                    batch_size=options["batch_size"],
+                    dry_run=options["dry_run"],
+                    log=self.stdout.write,
+                )
+            except retention.RetentionError as e:
+                if options["source"] == "all":
+                    self.stderr.write(self.style.WARNING(f"Skipping {source}: {e}"))
+                    continue
+                raise CommandError(str(e))
+            total += sum(processed.values())
+
+        verb = "Would archive" if options["dry_run"] else "Archived"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {total} rows older than {before} to {retention.archive_root()}"))
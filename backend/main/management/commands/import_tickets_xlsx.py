@@ -0,0 +1,51 @@
+from pathlib import Path
+
+import pandas as pd
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from main.models import Ticket
+
+VALID_STATUSES = {value for value, _ in Ticket.STATUS_CHOICES}
+
+
+def _status(value):
+    value = value.strip().lower()
+    return value if value in VALID_STATUSES else "open"
+
+
+class Command(BaseCommand):
+    help = "Import tickets from the legacy Streamlit tickets.xlsx into the Ticket table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", default=settings.BASE_DIR.parent / "frontend" / "tickets.xlsx")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.exists():
+            raise CommandError(f"{path} not found")
+
+        df = pd.read_excel(path, dtype=str).fillna("")
+        missing = {"TicketID", "User", "Action", "Status"} - set(df.columns)
+        if missing:
+            raise CommandError(f"{path} is missing columns: {sorted(missing)}")
+
+        tickets = [
+            Ticket(
+                ticket_id=row["TicketID"],
+                user=row["User"],
+                role=row.get("Role") or "user",
+                action=row["Action"],
+                status=_status(row["Status"]),
+            )
+            for row in df.to_dict("records")
+            if row["TicketID"]
+        ]
+        before = Ticket.objects.count()
+        # Re-running the import is safe: existing ticket_ids are skipped
+        Ticket.objects.bulk_create(tickets, batch_size=options["batch_size"], ignore_conflicts=True)
+        created = Ticket.objects.count() - before
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {created} tickets ({len(tickets) - created} already present) from {path}"
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from main import stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the /api/stats/ counters from the Log, AppRequest, InstallLog and rollup tables"
+
+    def handle(self, *args, **options):
+        total = stats.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt dashboard counters ({total} events)"))
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:48
+
+import django.utils.timezone
+import main.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0005_log_log_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('app_name', models.CharField(max_length=100)),
+                ('version', models.CharField(default='latest', max_length=50)),
+                ('requested_by', models.CharField(max_length=100)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected')], default='pending', max_length=20)),
+                ('eligibility', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('decided_at', models.DateTimeField(blank=True, null=True)),
+                ('note', models.TextField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Ticket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ticket_id', models.CharField(default=main.models._ticket_id, editable=False, max_length=16, unique=True)),
+                ('user', models.CharField(max_length=50)),
+                ('role', models.CharField(default='user', max_length=20)),
+                ('action', models.TextField()),
+                ('status', models.CharField(choices=[('open', 'Open'), ('closed', 'Closed'), ('rejected', 'Rejected')], default='open', max_length=20)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'status'], name='ticket_user_status_idx'), models.Index(fields=['status', '-created_at'], name='ticket_status_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0006_apprequest_ticket'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='log',
+            index=models.Index(fields=['-timestamp', '-id'], name='log_ts_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='log',
+            index=models.Index(fields=['user', '-timestamp', '-id'], name='log_user_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='log',
+            index=models.Index(fields=['log_type', '-timestamp', '-id'], name='log_type_ts_idx'),
+        ),
+    ]
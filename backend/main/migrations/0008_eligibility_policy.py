@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+# Policy previously hard-coded in the frontend: APP_ELIGIBILITY in app.py (chat and
+# requests tabs) and the users of its login buttons; install_direct only checked the catalog
+SEED_RULES = {
+    "user": {"Zoom": ["latest", "5.0"]},
+    "manager": {"Zoom": ["latest", "5.0", "5.1"], "MS Excel": ["2019", "2021"]},
+    "admin": {
+        "MS Word": ["2016", "2019", "2021"],
+        "MS Excel": ["2016", "2019", "2021"],
+        "Zoom": ["5.0", "5.1", "latest"],
+        "Slack": ["4.20", "4.21", "latest"],
+    },
+}
+SEED_USERS = {"alice": "user", "bob": "manager", "admin": "admin"}
+
+
+def seed_policy(apps, schema_editor):
+    EligibilityRule = apps.get_model("main", "EligibilityRule")
+    UserRole = apps.get_model("main", "UserRole")
+    EligibilityRule.objects.bulk_create(
+        [
+            EligibilityRule(role=role, app_name=app, version=version)
+            for role, role_apps in SEED_RULES.items()
+            for app, versions in role_apps.items()
+            for version in versions
+        ],
+        ignore_conflicts=True,
+    )
+    UserRole.objects.bulk_create(
+        [UserRole(username=username, role=role) for username, role in SEED_USERS.items()],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_log_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserRole',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('username', models.CharField(max_length=50, unique=True)),
+                ('role', models.CharField(default='user', max_length=20)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='EligibilityRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(max_length=20)),
+                ('app_name', models.CharField(max_length=100)),
+                ('version', models.CharField(max_length=50)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('role', 'app_name', 'version'), name='eligibility_rule_unique')],
+            },
+        ),
+        migrations.RunPython(seed_policy, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0008_eligibility_policy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=20)),
+                ('day', models.DateField()),
+                ('user', models.CharField(blank=True, default='', max_length=50)),
+                ('log_type', models.CharField(blank=True, default='', max_length=20)),
+                ('app_name', models.CharField(blank=True, default='', max_length=100)),
+                ('status', models.CharField(blank=True, default='', max_length=50)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['source', '-day'], name='daily_rollup_source_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('source', 'day', 'user', 'log_type', 'app_name', 'status'), name='daily_rollup_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0011_liveevent'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='dailyrollup',
+            name='daily_rollup_unique',
+        ),
+        migrations.AddField(
+            model_name='dailyrollup',
+            name='version',
+            field=models.CharField(blank=True, default='', max_length=50),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyrollup',
+            constraint=models.UniqueConstraint(fields=('source', 'day', 'user', 'log_type', 'app_name', 'version', 'status'), name='daily_rollup_unique'),
+        ),
+    ]
@@ -1,3 +1,5 @@
+import uuid
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.utils import timezone
 
@@ -26,6 +28,13 @@ class Log(models.Model):
     log_type = models.CharField(max_length=20, choices=LOG_TYPES, default="chat")
     timestamp = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["-timestamp", "-id"], name="log_ts_id_idx"),
+            models.Index(fields=["user", "-timestamp", "-id"], name="log_user_ts_idx"),
+            models.Index(fields=["log_type", "-timestamp", "-id"], name="log_type_ts_idx"),
+        ]
+
     def __str__(self):
         return f"[{self.log_type.upper()}] {self.user} @ {self.timestamp:%Y-%m-%d %H:%M} - {self.action[:40]}"
 
@@ -48,3 +57,114 @@ class AppRequest(models.Model):
 
     def __str__(self):
         return f"{self.app_name} {self.version} - {self.status}"
+
+
+def _ticket_id():
+    return uuid.uuid4().hex[:8]
+
+
+class Ticket(models.Model):
+    STATUS_CHOICES = [
+        ("open", "Open"),
+        ("closed", "Closed"),
+        ("rejected", "Rejected"),
+    ]
+    # Allowed status transitions; everything else is rejected by the API
+    TRANSITIONS = {
+        "open": {"closed", "rejected"},
+    }
+
+    ticket_id = models.CharField(max_length=16, unique=True, default=_ticket_id, editable=False)
+    user = models.CharField(max_length=50)
+    role = models.CharField(max_length=20, default="user")
+    action = models.TextField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="open")
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "status"], name="ticket_user_status_idx"),
+            models.Index(fields=["status", "-created_at"], name="ticket_status_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.ticket_id} {self.user} - {self.status}"
+
+
+class EligibilityRule(models.Model):
+    """One (role, app, version) a role may install; compiled by main.eligibility"""
+    role = models.CharField(max_length=20)
+    app_name = models.CharField(max_length=100)
+    version = models.CharField(max_length=50)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["role", "app_name", "version"], name="eligibility_rule_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.role}: {self.app_name} {self.version}"
+
+
+class UserRole(models.Model):
+    username = models.CharField(max_length=50, unique=True)
+    role = models.CharField(max_length=20, default="user")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.username} ({self.role})"
+
+
+class DailyRollup(models.Model):
+    """Per-day counts kept for archived audit rows (see main.retention)"""
+    source = models.CharField(max_length=20)              # "log" or "installlog"
+    day = models.DateField()
+    user = models.CharField(max_length=50, blank=True, default="")
+    log_type = models.CharField(max_length=20, blank=True, default="")
+    app_name = models.CharField(max_length=100, blank=True, default="")
+    version = models.CharField(max_length=50, blank=True, default="")
+    status = models.CharField(max_length=50, blank=True, default="")
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["source", "day", "user", "log_type", "app_name", "version", "status"],
+                name="daily_rollup_unique",
+            ),
+        ]
+        indexes = [models.Index(fields=["source", "-day"], name="daily_rollup_source_day_idx")]
+
+    def __str__(self):
+        return f"{self.source} {self.day}: {self.count}"
+
+
+class DailyCounter(models.Model):
+    """Incrementally maintained dashboard counters (see main.stats)"""
+    metric = models.CharField(max_length=20)                    # logs, active_user, install, request
+    day = models.DateField()
+    key = models.CharField(max_length=100, blank=True, default="")
+    subkey = models.CharField(max_length=100, blank=True, default="")
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["metric", "day", "key", "subkey"], name="daily_counter_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.metric} {self.day} {self.key} {self.subkey}: {self.count}"
+
+
+class LiveEvent(models.Model):
+    """Outbox of row changes pushed to dashboards over /api/live/ (see main.live)"""
+    stream = models.CharField(max_length=20)                       # logs, requests, installs
+    key = models.CharField(max_length=50)                           # id of the changed row
+    user = models.CharField(max_length=100, blank=True, default="")  # owner, for per-user streams
+    data = models.JSONField(encoder=DjangoJSONEncoder)              # the row as its list endpoint renders it
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"#{self.pk} {self.stream} {self.key}"
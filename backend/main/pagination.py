@@ -0,0 +1,71 @@
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .log_query import LogQueryError, decode_cursor, encode_cursor
+
+
+class KeysetPagination(BasePagination):
+    """Newest-first keyset pagination on (timestamp, id).
+
+    The cursor encodes the last row of the previous page, so every page is an
+    index range scan no matter how deep the client pages.
+    """
+    page_size = 50
+    max_page_size = 500
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+
+    def encode_cursor(self, row):
+        # row is a model instance or a named values_list() row (fast list path)
+        return encode_cursor(row.timestamp, row.pk if hasattr(row, "pk") else row.id)
+
+    def decode_cursor(self, cursor):
+        try:
+            return decode_cursor(cursor)
+        except LogQueryError as e:
+            raise NotFound(str(e))
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            size = self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        cursor = request.query_params.get(self.cursor_query_param)
+
+        queryset = queryset.order_by("-timestamp", "-id")
+        if cursor:
+            ts, pk = self.decode_cursor(cursor)
+            queryset = queryset.filter(Q(timestamp__lt=ts) | Q(timestamp=ts, id__lt=pk))
+
+        # One extra row tells us whether there is a next page without a COUNT(*)
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.page = rows[:page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
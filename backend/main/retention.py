@@ -0,0 +1,188 @@
+# main/retention.py
+"""Retention for audit tables: daily rollups, compressed archives, batched pruning.
+
+Rows older than the cutoff are handled one UTC day and one batch (by id) at
+a time. Each batch is written to
+LOG_ARCHIVE_DIR/<source>/day=YYYY-MM-DD/part-<first id>-<last id>.<ext>, then
+its counts are added to DailyRollup and the rows are deleted in one
+transaction. A run that dies between the file and the commit leaves the
+rows in place; the next run picks the same batch, rewrites the same file
+and carries on, so nothing is counted or archived twice.
+
+read_archive() streams archived rows back, filtered by day range and field
+values, for history the hot tables no longer hold.
+"""
+import gzip, json, os
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from .models import DailyRollup, Log
+
+FORMATS = {"jsonl": ".jsonl.gz", "parquet": ".parquet"}
+
+
+class RetentionError(ValueError):
+    pass
+
+
+# --------------------------- SOURCES --------------------------- #
+def _install_log_model():
+    from core.models import InstallLog
+    return InstallLog
+
+SOURCES = {
+    # rollup dimension → model field, archived columns (output name → model field)
+    "log": {
+        "model": lambda: Log,
+        "dims": {"user": "user", "log_type": "log_type"},
+        "fields": {"id": "id", "timestamp": "timestamp", "user": "user", "log_type": "log_type", "action": "action"},
+    },
+    "installlog": {
+        "model": _install_log_model,
+        "dims": {"app_name": "app__app_name", "version": "version", "status": "status"},
+        "fields": {
+            "id": "id", "timestamp": "timestamp", "app_name": "app__app_name",
+            "version": "version", "status": "status", "user_prompt": "user_prompt",
+        },
+    },
+}
+
+def _source(name):
+    if name not in SOURCES:
+        raise RetentionError(f"source must be one of {sorted(SOURCES)}")
+    try:
+        return SOURCES[name]["model"](), SOURCES[name]
+    except ImportError as e:
+        raise RetentionError(f"source {name} is not available: {e}")
+
+
+def archive_root():
+    return Path(getattr(settings, "LOG_ARCHIVE_DIR", settings.BASE_DIR / "log_archive"))
+
+def _day_bounds(day):
+    start = datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+# --------------------------- WRITE --------------------------- #
+def _jsonable(row):
+    return {k: (v.isoformat() if isinstance(v, datetime) else v) for k, v in row.items()}
+
+def _write_part(path, rows, fmt):
+    tmp = path.with_name(path.name + ".tmp")
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        pq.write_table(pa.Table.from_pylist([_jsonable(r) for r in rows]), tmp)
+    else:
+        with gzip.open(tmp, "wt", encoding="utf-8") as out:
+            for row in rows:
+                out.write(json.dumps(_jsonable(row), ensure_ascii=False) + "\n")
+    os.replace(tmp, path)
+
+def _add_rollups(source_name, day, counts):
+    """Add {((dim, value), ...): n} to the day's DailyRollup rows"""
+    for dims, n in counts.items():
+        key = {"source": source_name, "day": day, **dict(dims)}
+        if not DailyRollup.objects.filter(**key).update(count=F("count") + n):
+            DailyRollup.objects.create(count=n, **key)
+
+
+def archive_day(source_name, day, fmt="jsonl", batch_size=5000, dry_run=False):
+    """Roll up, archive and prune one UTC day; returns rows processed"""
+    model, spec = _source(source_name)
+    start, end = _day_bounds(day)
+    fields = spec["fields"]
+    qs = model.objects.filter(timestamp__gte=start, timestamp__lt=end).order_by("id")
+    if dry_run:
+        return qs.count()
+
+    part_dir = archive_root() / source_name / f"day={day.isoformat()}"
+    done = 0
+    while True:
+        raw = list(qs.values(*fields.values())[:batch_size])
+        if not raw:
+            return done
+        part_dir.mkdir(parents=True, exist_ok=True)
+        rows = [{name: r[field] for name, field in fields.items()} for r in raw]
+        ids = [r["id"] for r in rows]
+        _write_part(part_dir / f"part-{ids[0]:012d}-{ids[-1]:012d}{FORMATS[fmt]}", rows, fmt)
+
+        counts = {}
+        for r in raw:
+            dims = tuple((dim, r[field] or "") for dim, field in spec["dims"].items())
+            counts[dims] = counts.get(dims, 0) + 1
+        with transaction.atomic():
+            _add_rollups(source_name, day, counts)
+            model.objects.filter(id__in=ids).delete()
+        done += len(ids)
+
+
+def run(source_name, before, fmt="jsonl", batch_size=5000, dry_run=False, log=print):
+    """Process every day strictly before `before` (a date); returns {day: rows}"""
+    if fmt not in FORMATS:
+        raise RetentionError(f"format must be one of {sorted(FORMATS)}")
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise RetentionError("parquet archives require pyarrow")
+    model, _ = _source(source_name)
+    cutoff, _ = _day_bounds(before)
+    old = model.objects.filter(timestamp__lt=cutoff).order_by("timestamp").values_list("timestamp", flat=True)
+    processed = {}
+    lower = None
+    while True:
+        # Jump straight to the next day that has rows instead of walking empty days
+        oldest = (old.filter(timestamp__gte=lower) if lower else old).first()
+        if oldest is None:
+            return processed
+        day = oldest.astimezone(dt_timezone.utc).date()
+        n = archive_day(source_name, day, fmt=fmt, batch_size=batch_size, dry_run=dry_run)
+        processed[day] = n
+        log(f"{source_name} {day}: {'would archive' if dry_run else 'archived'} {n} rows")
+        _, lower = _day_bounds(day)
+
+
+# --------------------------- READ --------------------------- #
+def _read_part(path):
+    if path.name.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        yield from pq.read_table(path).to_pylist()
+    else:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+def archive_days(source_name):
+    """Archived days for a source, oldest first"""
+    root = archive_root() / source_name
+    if not root.exists():
+        return []
+    days = []
+    for part_dir in root.iterdir():
+        if part_dir.is_dir() and part_dir.name.startswith("day="):
+            days.append(datetime.strptime(part_dir.name[4:], "%Y-%m-%d").date())
+    return sorted(days)
+
+def read_archive(source_name, since=None, until=None, **filters):
+    """Yield archived rows (dicts) for days in [since, until), oldest first.
+
+    filters match columns exactly, e.g. read_archive("log", user="alice").
+    """
+    if source_name not in SOURCES:
+        raise RetentionError(f"source must be one of {sorted(SOURCES)}")
+    root = archive_root() / source_name
+    for day in archive_days(source_name):
+        if (since and day < since) or (until and day >= until):
+            continue
+        for path in sorted((root / f"day={day.isoformat()}").iterdir()):
+            if not path.name.endswith(tuple(FORMATS.values())):
+                continue
+            for row in _read_part(path):
+                if all(row.get(k) == v for k, v in filters.items()):
+                    yield row
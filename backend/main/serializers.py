@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Task, Log, AppRequest
+from .models import Task, Log, AppRequest, Ticket
 
 
 class TaskSerializer(serializers.ModelSerializer):
@@ -18,3 +18,10 @@ class AppRequestSerializer(serializers.ModelSerializer):
     class Meta:
         model = AppRequest
         fields = "__all__"
+
+
+class TicketSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Ticket
+        fields = "__all__"
+        read_only_fields = ("status",)
@@ -0,0 +1,195 @@
+# main/stats.py
+"""Dashboard counters kept up to date as audit rows are written.
+
+Every Log, InstallLog and AppRequest write adds to DailyCounter buckets
+(metric, UTC day, key, subkey) with a single INSERT ... ON CONFLICT DO
+UPDATE, inside the writer's transaction. /api/stats/ then reads one row
+per bucket instead of scanning raw rows, and the counts survive
+archive_logs pruning the raw tables.
+
+    logs         key=log_type                 rows per type
+    active_user  key=user                     one bucket per active user
+    install      key=app,   subkey=version    InstallLog rows
+    request      key=event, subkey=app_name   created / approved / rejected
+
+Counters are updated from post_save and from audit.rows_written (buffered
+bulk inserts). Code that writes with bulk_create or queryset.update() calls
+count_logs()/count_requests() itself. `manage.py rebuild_stats` recomputes
+everything from the tables.
+"""
+from collections import Counter
+from datetime import timezone as dt_timezone
+
+from django.db import connection, transaction
+from django.db.models.signals import pre_save, post_save
+from django.utils import timezone
+
+from core.models import InstallLog
+from mimic_backend import audit
+from .models import AppRequest, DailyCounter, DailyRollup, Log
+
+DECISIONS = ("approved", "rejected")
+
+
+def _day(ts):
+    return (ts or timezone.now()).astimezone(dt_timezone.utc).date()
+
+
+def bump(buckets):
+    """Add {(metric, day, key, subkey): n} to the counters in one statement"""
+    if not buckets:
+        return
+    q = connection.ops.quote_name
+    table = q(DailyCounter._meta.db_table)
+    key_cols = ", ".join(q(c) for c in ("metric", "day", "key", "subkey"))
+    sql = (
+        f"INSERT INTO {table} ({key_cols}, {q('count')}) VALUES (%s, %s, %s, %s, %s) "
+        f"ON CONFLICT ({key_cols}) DO UPDATE SET {q('count')} = {table}.{q('count')} + excluded.{q('count')}"
+    )
+    adapt = connection.ops.adapt_datefield_value
+    rows = [(m, adapt(d), (k or "")[:100], (s or "")[:100], n) for (m, d, k, s), n in buckets.items()]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+# --------------------------- COUNTING --------------------------- #
+def count_logs(logs):
+    buckets = Counter()
+    for log in logs:
+        day = _day(log.timestamp)
+        buckets[("logs", day, log.log_type, "")] += 1
+        buckets[("active_user", day, log.user, "")] += 1
+    bump(buckets)
+
+def count_installs(install_logs):
+    buckets = Counter()
+    for row in install_logs:
+        app = row.app.app_name if row.app_id else ""
+        buckets[("install", _day(row.timestamp), app, row.version)] += 1
+    bump(buckets)
+
+def count_requests(event, requests, when=None):
+    """event: created | approved | rejected"""
+    buckets = Counter()
+    for req in requests:
+        ts = req.created_at if event == "created" else (when or req.decided_at)
+        buckets[("request", _day(ts), event, req.app_name)] += 1
+    bump(buckets)
+
+
+# --------------------------- SIGNALS --------------------------- #
+def _log_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        count_logs([instance])
+
+def _install_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        count_installs([instance])
+
+def _rows_written(sender, objs, **kwargs):
+    if sender is Log:
+        count_logs(objs)
+    elif sender is InstallLog:
+        count_installs(objs)
+
+def _request_status_before(sender, instance, raw=False, **kwargs):
+    instance._stats_previous_status = (
+        AppRequest.objects.filter(pk=instance.pk).values_list("status", flat=True).first()
+        if instance.pk and not raw else None
+    )
+
+def _request_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        count_requests("created", [instance])
+    if instance.status in DECISIONS and getattr(instance, "_stats_previous_status", None) != instance.status:
+        count_requests(instance.status, [instance], when=instance.decided_at or timezone.now())
+
+post_save.connect(_log_saved, sender=Log, dispatch_uid="stats-log-save")
+audit.rows_written.connect(_rows_written, dispatch_uid="stats-rows-written")
+pre_save.connect(_request_status_before, sender=AppRequest, dispatch_uid="stats-request-pre")
+post_save.connect(_request_saved, sender=AppRequest, dispatch_uid="stats-request-save")
+post_save.connect(_install_saved, sender=InstallLog, dispatch_uid="stats-installlog-save")
+
+
+# --------------------------- READ --------------------------- #
+def dashboard(since, until):
+    """Aggregates for days in [since, until) from the counter buckets"""
+    rows = DailyCounter.objects.filter(day__gte=since, day__lt=until).values_list(
+        "metric", "day", "key", "subkey", "count"
+    )
+    installs, requests_by_app = Counter(), {}
+    logs, users_per_day, actions_per_day = [], Counter(), Counter()
+    for metric, day, key, subkey, count in rows.iterator():
+        if metric == "install":
+            installs[(key, subkey)] += count
+        elif metric == "request":
+            by_app = requests_by_app.setdefault(subkey, {"app": subkey, "created": 0, "approved": 0, "rejected": 0})
+            by_app[key] = by_app.get(key, 0) + count
+        elif metric == "logs":
+            logs.append({"day": day, "log_type": key, "count": count})
+        elif metric == "active_user":
+            users_per_day[day] += 1
+            actions_per_day[day] += count
+
+    totals = {event: sum(a[event] for a in requests_by_app.values()) for event in ("created", *DECISIONS)}
+    decided = totals["approved"] + totals["rejected"]
+    return {
+        "since": since,
+        "until": until,
+        "installs": [
+            {"app": app, "version": version, "count": n}
+            for (app, version), n in sorted(installs.items(), key=lambda item: (-item[1], item[0]))
+        ],
+        "requests": {
+            **totals,
+            "approval_rate": round(totals["approved"] / decided, 4) if decided else None,
+            "by_app": sorted(requests_by_app.values(), key=lambda a: a["app"]),
+        },
+        "active_users": [
+            {"day": day, "users": users_per_day[day], "actions": actions_per_day[day]}
+            for day in sorted(users_per_day)
+        ],
+        "logs": sorted(logs, key=lambda r: (r["day"], r["log_type"])),
+    }
+
+
+# --------------------------- REBUILD --------------------------- #
+def rebuild():
+    """Recompute every counter from the current tables and the rollups of archived rows"""
+    from django.db.models import Count
+    from django.db.models.functions import TruncDate
+
+    buckets = Counter()
+    by_day = TruncDate("timestamp", tzinfo=dt_timezone.utc)
+    for day, log_type, n in Log.objects.values_list(by_day, "log_type").annotate(n=Count("id")).order_by():
+        buckets[("logs", day, log_type, "")] += n
+    for day, user, n in Log.objects.values_list(by_day, "user").annotate(n=Count("id")).order_by():
+        buckets[("active_user", day, user, "")] += n
+    for day, user, log_type, n in DailyRollup.objects.filter(source="log").values_list("day", "user", "log_type", "count"):
+        buckets[("logs", day, log_type, "")] += n
+        buckets[("active_user", day, user, "")] += n
+
+    created_day = TruncDate("created_at", tzinfo=dt_timezone.utc)
+    for day, app, n in AppRequest.objects.values_list(created_day, "app_name").annotate(n=Count("id")).order_by():
+        buckets[("request", day, "created", app)] += n
+    decided = AppRequest.objects.filter(status__in=DECISIONS).exclude(decided_at=None)
+    for day, status, app, n in decided.values_list(
+        TruncDate("decided_at", tzinfo=dt_timezone.utc), "status", "app_name"
+    ).annotate(n=Count("id")).order_by():
+        buckets[("request", day, status, app)] += n
+
+    for day, app, version, n in InstallLog.objects.values_list(by_day, "app__app_name", "version").annotate(
+        n=Count("id")
+    ).order_by():
+        buckets[("install", day, app or "", version)] += n
+    for day, app, version, n in DailyRollup.objects.filter(source="installlog").values_list(
+        "day", "app_name", "version", "count"
+    ):
+        buckets[("install", day, app, version)] += n
+
+    with transaction.atomic():
+        DailyCounter.objects.all().delete()
+        bump(buckets)
+    return sum(buckets.values())
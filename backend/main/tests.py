@@ -1,3 +1,757 @@
-from django.test import TestCase
+import asyncio, io, os, tempfile
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import ApplicationCatalog
+from mimic_backend import audit
+from . import app_matcher, eligibility, live, log_query, retention, stats
+from .models import AppRequest, DailyCounter, DailyRollup, EligibilityRule, LiveEvent, Log, Task, Ticket, UserRole
+
+
+@override_settings(AUDIT_LOG_MODE="sync")
+class LogQueryTests(TestCase):
+    """fetch() filters before slicing, formats in SQL and pages by offset or cursor in one query"""
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        Log.objects.bulk_create([
+            Log(user="alice" if i % 2 else "bob", log_type="chat", action=f"message {i}")
+            for i in range(30)
+        ])
+        # Spread the rows over time; a few share a timestamp to exercise the id tie-break
+        for n, log in enumerate(Log.objects.order_by("id")):
+            Log.objects.filter(pk=log.pk).update(timestamp=now - timedelta(minutes=n // 3))
+
+    def fields(self):
+        return {"id": "id", "user": "user", "timestamp": log_query.FormatTimestamp("timestamp")}
+
+    def test_filter_applies_before_slice(self):
+        with self.assertNumQueries(1):
+            rows, _ = log_query.fetch(Log.objects.all(), self.fields(), filters={"user": "alice"}, limit=10)
+        self.assertEqual(len(rows), 10)
+        self.assertTrue(all(r["user"] == "alice" for r in rows))
+
+    def test_timestamp_formatted_like_strftime(self):
+        rows, _ = log_query.fetch(Log.objects.all(), self.fields(), limit=5)
+        for row in rows:
+            expected = Log.objects.get(pk=row["id"]).timestamp.strftime("%Y-%m-%d %H:%M:%S")
+            self.assertEqual(row["timestamp"], expected)
+
+    def test_cursor_pages_cover_every_row_once(self):
+        seen, cursor = [], None
+        while True:
+            with self.assertNumQueries(1):
+                rows, cursor = log_query.fetch(Log.objects.all(), self.fields(), limit=7, cursor=cursor)
+            seen += [r["id"] for r in rows]
+            if not cursor:
+                break
+        expected = list(Log.objects.order_by("-timestamp", "-id").values_list("id", flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_offset_matches_cursor(self):
+        first, cursor = log_query.fetch(Log.objects.all(), self.fields(), limit=8)
+        by_cursor, _ = log_query.fetch(Log.objects.all(), self.fields(), limit=8, cursor=cursor)
+        by_offset, _ = log_query.fetch(Log.objects.all(), self.fields(), limit=8, offset=8)
+        self.assertEqual(by_cursor, by_offset)
+
+    def test_page_params_validation(self):
+        self.assertEqual(log_query.page_params({"limit": "5000"})["limit"], log_query.MAX_LIMIT)
+        for bad in ({"limit": "x"}, {"offset": "-1"}, {"offset": "5", "cursor": "abc"}):
+            with self.assertRaises(log_query.LogQueryError):
+                log_query.page_params(bad)
+        with self.assertRaises(log_query.LogQueryError):
+            log_query.decode_cursor("not-a-cursor")
+
+
+@override_settings(AUDIT_LOG_MODE="sync")
+class LogEndpointQueryCountTests(TestCase):
+    """Query-count regression tests for every endpoint that reads log tables.
+
+    Log lists take their ETag from the page they render, so a 200 and a 304
+    both cost the page query alone; page size must never change that.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        Log.objects.bulk_create([
+            Log(user=f"user{i % 5}", log_type="chat" if i % 3 else "install", action=f"action {i}")
+            for i in range(120)
+        ])
+        stats.rebuild()
+        DailyRollup.objects.create(source="log", day=date(2024, 1, 1), user="user1", log_type="chat", count=3)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def get(self, url, queries, **headers):
+        with self.assertNumQueries(queries):
+            response = self.client.get(url, **headers)
+        self.assertIn(response.status_code, (200, 304), response.content)
+        return response
+
+    def test_log_list(self):
+        first = self.get("/api/logs/?page_size=100", 1)
+        self.assertEqual(len(first.data["results"]), 100)
+        self.get(first.data["next"], 1)
+        self.get("/api/logs/?user=user1&log_type=chat&since=2000-01-01&page_size=10", 1)
+
+    def test_log_list_not_modified(self):
+        etag = self.get("/api/logs/", 1)["ETag"]
+        response = self.get("/api/logs/", 1, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_deletes_invalidate_the_etag(self):
+        first = self.get("/api/logs/?page_size=10", 1)
+        self.assertNotIn("Last-Modified", first)
+        Log.objects.filter(pk=first.data["results"][3]["id"]).delete()
+        response = self.get("/api/logs/?page_size=10", 1, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], first["ETag"])
+        # If-Modified-Since alone can't vouch for a list whose rows were deleted
+        response = self.get("/api/logs/?page_size=10", 1, HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT")
+        self.assertEqual(response.status_code, 200)
+
+    def test_latest_logs(self):
+        response = self.get("/api/logs-latest/", 1)
+        self.assertEqual(len(response.data), 50)
+
+    def test_log_detail(self):
+        pk = Log.objects.values_list("pk", flat=True).first()
+        self.get(f"/api/logs/{pk}/", 2)
+
+    def test_log_rollups(self):
+        response = self.get("/api/log-rollups/?source=log&user=user1", 1)
+        self.assertEqual(response.data[0]["count"], 3)
+
+    def test_log_archive_reads_no_tables(self):
+        with self.settings(LOG_ARCHIVE_DIR="/nonexistent/log_archive"):
+            response = self.get("/api/log-archive/?source=log", 0)
+        self.assertEqual(response.data["results"], [])
+
+    def test_stats(self):
+        response = self.get("/api/stats/", 1)
+        self.assertEqual(sum(row["count"] for row in response.data["logs"]), 120)
+
+    def test_install_logs(self):
+        from django.test import RequestFactory
+        from core import views as core_views
+
+        request = RequestFactory().get("/api/install-logs/", {"app": "Zoom", "limit": 10})
+        with self.assertNumQueries(1):
+            response = core_views.logs(request)
+        self.assertEqual(response.status_code, 200)
+
+
+class _StubCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, model, messages, temperature, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content=f"reply #{self.calls} to {messages[-1]['content']}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+@override_settings(AUDIT_LOG_MODE="sync", RATE_LIMIT_ENABLED=False)
+class AgentCacheTests(TestCase):
+    """/api/agent/'s fallback chat goes through the Groq response cache"""
+
+    def setUp(self):
+        from core import llm_cache, views as core_views
+
+        self.completions = _StubCompletions()
+        llm = SimpleNamespace(chat=SimpleNamespace(completions=self.completions))
+        self.enterContext(mock.patch.object(core_views, "get_client", return_value=llm))
+        self.enterContext(mock.patch.dict(os.environ, {"GROQ_API_KEY": "test"}))
+        llm_cache.set_cache(llm_cache.MemoryCache())
+        self.addCleanup(llm_cache.set_cache, None)
+        self.client = APIClient()
+
+    def ask(self, text):
+        response = self.client.post("/api/agent/", {"input": text, "user": "alice"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        return response.data["output"]
+
+    def test_repeated_prompt_is_answered_from_cache(self):
+        first = self.ask("What is a VPN?")
+        self.assertEqual(self.ask("what is a   VPN?"), first)   # normalized to the same key
+        self.assertEqual(self.completions.calls, 1)
+        self.assertNotEqual(self.ask("What is SSO?"), first)
+        self.assertEqual(self.completions.calls, 2)
+        stats = self.client.get("/api/agent/cache/").data
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+
+    def test_install_commands_skip_the_llm(self):
+        response = self.client.post("/api/agent/", {"input": "install zoom 5.1", "user": "alice"}, format="json")
+        self.assertIn("request_id", response.data)
+        self.assertEqual(self.completions.calls, 0)
+
+    def test_echo_without_api_key(self):
+        with mock.patch.dict(os.environ, {"GROQ_API_KEY": ""}):
+            self.assertEqual(self.ask("hello"), "🤖 You said: hello")
+        self.assertEqual(self.completions.calls, 0)
+
+
+@override_settings(AUDIT_LOG_MODE="sync", RATE_LIMIT_ENABLED=True)
+class RateLimitTests(TestCase):
+    """/api/agent/ charges the caller's user and role buckets; internal log writes don't"""
+
+    LIMITS = {
+        "user": {"user": (1, 2), "role": (1, 3)},
+        "manager": {"user": (1, 1), "role": (1, 5)},
+    }
+
+    def setUp(self):
+        from mimic_backend.ratelimit import build_limiter, set_limiter
+
+        set_limiter(build_limiter("memory", limits=self.LIMITS))
+        self.addCleanup(set_limiter, None)
+        self.enterContext(mock.patch.dict(os.environ, {"GROQ_API_KEY": ""}))   # echo replies, no LLM
+        self.client = APIClient()
+
+    def ask(self, user):
+        return self.client.post("/api/agent/", {"input": "hello", "user": user}, format="json")
+
+    def test_empty_bucket_is_429_with_retry_after(self):
+        self.assertEqual([self.ask("alice").status_code for _ in range(2)], [200, 200])
+        response = self.ask("alice")
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response["Retry-After"]), 1)
+        self.assertLessEqual(int(response["Retry-After"]), 60)
+        self.assertEqual(response.json()["retry_after"], int(response["Retry-After"]))
+
+    def test_buckets_are_per_user_and_per_role(self):
+        self.assertEqual(self.ask("bob").status_code, 200)
+        self.assertEqual(self.ask("bob").status_code, 429)     # manager burst is 1
+        self.assertEqual(self.ask("alice").status_code, 200)   # "user" role buckets are separate
+        self.assertEqual(self.ask("alice").status_code, 200)
+        self.assertEqual(self.ask("carol").status_code, 200)   # unknown users get the "user" role
+        self.assertEqual(self.ask("dave").status_code, 429)    # ... and its shared role bucket is empty
+        stats = self.client.get("/api/agent/metrics/").json()["rate_limit"]
+        self.assertEqual(stats["allowed"], {"manager": 1, "user": 3})
+        self.assertEqual(stats["rejected"], {"manager": 1, "user": 1})
+
+    def test_log_writes_are_not_rate_limited(self):
+        for i in range(5):
+            response = self.client.post(
+                "/api/logs/", {"user": "alice", "action": f"SYSTEM: Ticket {i} created", "log_type": "system"},
+                format="json",
+            )
+            self.assertEqual(response.status_code, 201)
+        self.assertEqual(Log.objects.filter(user="alice", log_type="system").count(), 5)
+        self.assertEqual(self.ask("alice").status_code, 200)   # the full burst is still there
+        self.assertEqual(self.ask("alice").status_code, 200)
+
+
+@override_settings(ELIGIBILITY_REFRESH=0)
+class EligibilityIndexTests(TestCase):
+    """Lookups on the compiled policy, and keeping it current across processes"""
+
+    def setUp(self):
+        eligibility._index = None
+        self.addCleanup(setattr, eligibility, "_index", None)
+
+    def test_checks(self):
+        index = eligibility.get_index()
+        self.assertTrue(index.check("manager", "Zoom", "5.1"))
+        self.assertFalse(index.check("user", "Zoom", "5.1"))
+        self.assertTrue(index.check_user("bob", "Zoom", "5.1"))
+        self.assertFalse(index.check_user("alice", "Zoom", "5.1"))
+        self.assertEqual(index.role_of("nobody"), eligibility.DEFAULT_ROLE)
+        self.assertTrue(index.is_available("Slack", "4.21"))
+        self.assertFalse(index.is_available("Slack", "9.9"))
+
+    def test_saves_patch_the_index_in_place(self):
+        index = eligibility.get_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            EligibilityRule.objects.create(role="user", app_name="Slack", version="latest")
+            UserRole.objects.filter(username="alice").update(role="manager")   # no signal: another process
+        self.assertIs(eligibility.get_index(), index)
+        self.assertTrue(index.check_user("alice", "Slack", "latest"))
+        self.assertEqual(index.role_of("alice"), "user")
+
+    def test_rebuilds_when_the_signature_moves(self):
+        index = eligibility.get_index()
+        # bulk_create sends no signals, like a write made by another worker process
+        UserRole.objects.bulk_create([UserRole(username="carol", role="admin")])
+        rebuilt = eligibility.get_index()
+        self.assertIsNot(rebuilt, index)
+        self.assertTrue(rebuilt.check_user("carol", "MS Word", "2016"))
+        self.assertIs(eligibility.get_index(), rebuilt)   # unchanged signature: no rebuild
+
+
+class EligibilityCheckViewTests(TestCase):
+    """POST /api/eligibility/check/ answers a batch of user or role checks in one call"""
+
+    def setUp(self):
+        eligibility._index = None
+        self.addCleanup(setattr, eligibility, "_index", None)
+
+    def check(self, checks):
+        return APIClient().post("/api/eligibility/check/", {"checks": checks}, format="json")
+
+    def test_mixed_batch(self):
+        response = self.check([
+            {"user": "alice", "app": "Zoom", "version": "5.0"},        # user role allows it
+            {"user": "alice", "app": "Zoom", "version": "5.1"},        # ... but not this one
+            {"user": "bob", "app": "Zoom", "version": "5.1"},          # bob is a manager
+            {"role": "admin", "app": "Slack", "version": "4.21"},
+            {"user": "stranger", "app": "MS Word", "version": "2016"},  # unknown users get the user role
+            {"role": "manager", "app": "Zoom", "version": "9.9"},      # unknown version
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(r["user"], r["role"], r["eligible"]) for r in response.data["results"]],
+            [("alice", "user", True), ("alice", "user", False), ("bob", "manager", True),
+             (None, "admin", True), ("stranger", "user", False), (None, "manager", False)],
+        )
+
+    def test_bad_batches(self):
+        for checks in ([], "alice", [{"user": "alice", "app": "Zoom"}], [["alice", "Zoom", "5.0"]]):
+            self.assertEqual(self.check(checks).status_code, 400)
+        too_many = [{"role": "user", "app": "Zoom", "version": "5.0"}] * 1001
+        self.assertEqual(self.check(too_many).status_code, 400)
+
+
+@override_settings(CATALOG_REFRESH=0)
+class AppMatcherTests(TestCase):
+    """/api/match/ draws its vocabulary from the catalog; the eligibility policy only filters it"""
+
+    def setUp(self):
+        app_matcher._checked_at = float("-inf")
+        eligibility._index = None
+        self.addCleanup(setattr, eligibility, "_index", None)
+
+    def match(self, **params):
+        response = APIClient().get("/api/match/", params)
+        self.assertEqual(response.status_code, 200)
+        return [(c["app"], c["version"]) for c in response.data["candidates"]]
+
+    def test_catalog_app_without_policy_is_matched(self):
+        # bulk_create sends no signals, like a write made by another worker
+        ApplicationCatalog.objects.bulk_create([ApplicationCatalog(app_name="Notion", versions="2.0,2.1")])
+        self.assertFalse(EligibilityRule.objects.filter(app_name="Notion").exists())
+        self.assertEqual(self.match(q="install notion 2.1")[0], ("Notion", "2.1"))
+        self.assertEqual(self.match(q="install notion 2.1", role="admin"), [])   # no role may install it yet
+
+    def test_role_filters_matches(self):
+        self.assertEqual(self.match(q="ms word 2019")[0], ("MS Word", "2019"))
+        self.assertNotIn("MS Word", [app for app, _ in self.match(q="ms word 2019", role="manager")])
+
+
+class AuditSinkTests(TestCase):
+    """Buffered audit rows are written in one batch and announced with rows_written"""
+
+    def setUp(self):
+        self.batches = []
+        audit.rows_written.connect(self.on_rows_written)
+        self.addCleanup(audit.rows_written.disconnect, self.on_rows_written)
+
+    def on_rows_written(self, sender, objs, **kwargs):
+        self.batches.append((sender, len(objs)))
+
+    def buffered(self, **kwargs):
+        with mock.patch.object(audit.BufferedSink, "_run"):   # flushed by the test, not a thread
+            sink = audit.BufferedSink(**kwargs)
+        self.addCleanup(sink.close)
+        return sink
+
+    def test_buffered_rows_wait_for_flush(self):
+        sink = self.buffered()
+        for i in range(3):
+            sink.record(Log(user="alice", log_type="chat", action=f"message {i}"))
+        self.assertEqual(Log.objects.filter(user="alice").count(), 0)
+        self.assertEqual(sink.stats()["pending"], 3)
+        self.assertEqual(sink.flush(), 3)
+        self.assertEqual(Log.objects.filter(user="alice").count(), 3)
+        self.assertEqual(self.batches, [(Log, 3)])
+        self.assertEqual((sink.stats()["pending"], sink.stats()["written"]), (0, 3))
+
+    def test_backpressure_saves_directly(self):
+        sink = self.buffered(max_pending=1)
+        sink.record(Log(user="alice", log_type="chat", action="queued"))
+        sink.record(Log(user="alice", log_type="chat", action="over the cap"))
+        self.assertEqual(list(Log.objects.filter(user="alice").values_list("action", flat=True)), ["over the cap"])
+        sink.flush()
+        self.assertEqual(Log.objects.filter(user="alice").count(), 2)
+
+    def test_sync_mode_saves_on_record(self):
+        with self.settings(AUDIT_LOG_MODE="sync"):
+            audit.record(Log(user="alice", log_type="chat", action="now"))
+            self.assertEqual(audit.get_sink().mode, "sync")
+        self.assertTrue(Log.objects.filter(user="alice", action="now").exists())
+        self.assertEqual(self.batches, [])
+
+
+@override_settings(AUDIT_LOG_MODE="sync")
+class LiveOutboxTests(TestCase):
+    """Row changes land in the LiveEvent outbox and replay from a cursor"""
+
+    def log(self, user, action):
+        return Log.objects.create(user=user, log_type="chat", action=action)
+
+    def test_saves_publish_and_replay(self):
+        cursor = live.current_cursor()
+        alice = self.log("alice", "hello")
+        bob = self.log("bob", "hi")
+        events = live.replay(cursor, live.current_cursor(), ["logs"])
+        self.assertEqual([(stream, user, key) for _, stream, user, key, _ in events],
+                         [("logs", "alice", str(alice.pk)), ("logs", "bob", str(bob.pk))])
+        self.assertEqual(events[0][4]["action"], "hello")
+        mine = live.replay(cursor, live.current_cursor(), ["logs"], user="bob")
+        self.assertEqual([key for _, _, _, key, _ in mine], [str(bob.pk)])
+        self.assertEqual(live.replay(cursor, live.current_cursor(), ["requests"]), [])
+
+    def test_buffered_batches_are_published(self):
+        cursor = live.current_cursor()
+        with mock.patch.object(audit.BufferedSink, "_run"):
+            sink = audit.BufferedSink()
+        self.addCleanup(sink.close)
+        sink.record(Log(user="alice", log_type="chat", action="batched"))
+        sink.flush()
+        events = live.replay(cursor, live.current_cursor(), ["logs"])
+        self.assertEqual([data["action"] for *_, data in events], ["batched"])
+
+    def test_reset_when_pruned_or_too_far_behind(self):
+        self.log("alice", "old")
+        cursor = live.current_cursor()
+        for i in range(3):
+            self.log("alice", f"new {i}")
+        with self.settings(LIVE_REPLAY_MAX=2):
+            self.assertIsNone(live.replay(cursor, live.current_cursor(), ["logs"]))
+        LiveEvent.objects.update(created_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(live.prune(), 4)
+        self.log("alice", "after the prune")
+        self.assertIsNone(live.replay(cursor, live.current_cursor(), ["logs"]))
+
+    def first_event(self, **kwargs):
+        async def read():
+            body = live.stream(["logs"], **kwargs)
+            try:
+                return await body.__anext__()
+            finally:
+                await body.aclose()
+        return async_to_sync(read)()
+
+    def test_stream_starts_with_hello_or_reset(self):
+        self.log("alice", "hello")
+        cursor = live.current_cursor()
+        self.assertIn("event: hello", self.first_event())
+        LiveEvent.objects.all().delete()
+        self.log("alice", "after the prune")
+        self.assertIn("event: reset", self.first_event(after=cursor - 1))
+
+
+@override_settings(AUDIT_LOG_MODE="sync")
+class StatsRebuildTests(TestCase):
+    """rebuild_stats after archive_logs gives back the counters the live signals kept"""
+
+    def setUp(self):
+        from core.models import ApplicationCatalog, InstallLog
+
+        self.enterContext(override_settings(LOG_ARCHIVE_DIR=self.enterContext(tempfile.TemporaryDirectory())))
+        zoom = ApplicationCatalog.objects.get(app_name="Zoom")
+        old = timezone.now() - timedelta(days=10)
+        for i, version in enumerate(["5.0", "5.1", "5.1", "latest"]):
+            InstallLog.objects.create(app=zoom, version=version, user_prompt=f"install zoom {i}", timestamp=old)
+        InstallLog.objects.create(version="1.0", user_prompt="unknown app", timestamp=old)
+        InstallLog.objects.create(app=zoom, version="5.1", user_prompt="recent")
+        for i in range(3):
+            Log.objects.create(user="alice", log_type="chat", action=f"old {i}", timestamp=old)
+        Log.objects.create(user="bob", log_type="install", action="recent")
+        today = timezone.now().date()
+        self.window = (today - timedelta(days=30), today + timedelta(days=1))
+
+    def test_archive_then_rebuild_keeps_every_counter(self):
+        before = stats.dashboard(*self.window)
+        self.assertIn({"app": "Zoom", "version": "5.1", "count": 3}, before["installs"])
+        cutoff = timezone.now().date() - timedelta(days=1)
+        retention.run("log", cutoff, log=lambda line: None)
+        retention.run("installlog", cutoff, log=lambda line: None)
+        self.assertEqual(Log.objects.count(), 1)
+        stats.rebuild()
+        self.assertEqual(stats.dashboard(*self.window), before)
+
+
+@override_settings(AUDIT_LOG_MODE="sync")
+class RetentionTests(TestCase):
+    """archive_logs: rollups, part files, pruning, and safe re-runs"""
+
+    def setUp(self):
+        self.root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(LOG_ARCHIVE_DIR=self.root))
+        today = timezone.now().date()
+        self.day1, self.day2 = today - timedelta(days=12), today - timedelta(days=11)
+        for day, users in ((self.day1, ["alice", "alice", "bob"]), (self.day2, ["alice", "bob"])):
+            noon = datetime.combine(day, datetime.min.time(), tzinfo=dt_timezone.utc) + timedelta(hours=12)
+            for i, user in enumerate(users):
+                Log.objects.create(user=user, log_type="chat", action=f"{user} {i}", timestamp=noon + timedelta(minutes=i))
+        self.recent = Log.objects.create(user="alice", log_type="chat", action="recent")
+        self.before = today - timedelta(days=1)
+
+    def rollups(self):
+        return set(DailyRollup.objects.filter(source="log").values_list("day", "user", "log_type", "count"))
+
+    def parts(self, day):
+        path = Path(self.root) / "log" / f"day={day.isoformat()}"
+        return sorted(p.name for p in path.iterdir()) if path.exists() else []
+
+    def test_run_archives_rolls_up_and_prunes(self):
+        processed = retention.run("log", self.before, batch_size=2, log=lambda line: None)
+        self.assertEqual(processed, {self.day1: 3, self.day2: 2})
+        self.assertEqual(list(Log.objects.values_list("pk", flat=True)), [self.recent.pk])
+        self.assertEqual(len(self.parts(self.day1)), 2)   # two batches of at most 2 rows
+        self.assertEqual(self.rollups(), {
+            (self.day1, "alice", "chat", 2), (self.day1, "bob", "chat", 1),
+            (self.day2, "alice", "chat", 1), (self.day2, "bob", "chat", 1),
+        })
+        rows = list(retention.read_archive("log", user="alice"))
+        self.assertEqual([r["action"] for r in rows], ["alice 0", "alice 1", "alice 0"])
+        self.assertEqual([r["action"] for r in retention.read_archive("log", since=self.day2)], ["alice 0", "bob 1"])
+
+    def test_dry_run_leaves_rows_alone(self):
+        processed = retention.run("log", self.before, dry_run=True, log=lambda line: None)
+        self.assertEqual(processed, {self.day1: 3, self.day2: 2})
+        self.assertEqual(Log.objects.count(), 6)
+        self.assertEqual(self.rollups(), set())
+        self.assertFalse((Path(self.root) / "log").exists())
+
+    def test_rows_stay_when_the_part_file_fails(self):
+        with mock.patch.object(retention, "_write_part", side_effect=OSError("disk full")), self.assertRaises(OSError):
+            retention.archive_day("log", self.day1)
+        self.assertEqual(Log.objects.count(), 6)
+        self.assertEqual(self.rollups(), set())
+
+    def test_rerun_after_a_crash_counts_once(self):
+        # The part file is written, then the rollup/delete transaction dies
+        with mock.patch.object(retention, "_add_rollups", side_effect=RuntimeError("killed")), \
+                self.assertRaises(RuntimeError):
+            retention.archive_day("log", self.day1)
+        self.assertEqual(Log.objects.count(), 6)
+        self.assertEqual(len(self.parts(self.day1)), 1)
+        self.assertEqual(retention.archive_day("log", self.day1), 3)
+        self.assertEqual(len(self.parts(self.day1)), 1)   # the same part, rewritten
+        self.assertEqual(len(list(retention.read_archive("log", since=self.day1, until=self.day2))), 3)
+        self.assertEqual(self.rollups(), {(self.day1, "alice", "chat", 2), (self.day1, "bob", "chat", 1)})
+
+    def test_rollups_add_up_across_runs(self):
+        retention.archive_day("log", self.day1)
+        late = datetime.combine(self.day1, datetime.min.time(), tzinfo=dt_timezone.utc) + timedelta(hours=20)
+        Log.objects.create(user="bob", log_type="chat", action="late arrival", timestamp=late)
+        self.assertEqual(retention.archive_day("log", self.day1), 1)
+        self.assertEqual(self.rollups(), {(self.day1, "alice", "chat", 2), (self.day1, "bob", "chat", 2)})
+
+    def test_parquet_archives(self):
+        retention.run("log", self.before, fmt="parquet", log=lambda line: None)
+        self.assertTrue(all(name.endswith(".parquet") for name in self.parts(self.day1)))
+        self.assertEqual(len(list(retention.read_archive("log"))), 5)
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command("archive_logs", "--source", "log", "--before", self.before.isoformat(), "--dry-run", stdout=out)
+        self.assertIn("Would archive 5 rows", out.getvalue())
+        self.assertEqual(Log.objects.count(), 6)
+        call_command("archive_logs", "--source", "log", "--days", "1", stdout=io.StringIO())
+        self.assertEqual(Log.objects.count(), 1)
+        with self.assertRaises(CommandError):
+            call_command("archive_logs", "--before", "last week", stdout=io.StringIO())
+        with self.assertRaises(retention.RetentionError):
+            retention.run("log", self.before, fmt="csv")
+
+
+@override_settings(AUDIT_LOG_MODE="sync")
+class BulkDecideTests(TestCase):
+    """POST /api/app-requests/bulk-decide/ decides many pending requests in one transaction"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.zoom = AppRequest.objects.create(app_name="Zoom", version="5.1", requested_by="alice")
+        self.slack = AppRequest.objects.create(app_name="Slack", version="latest", requested_by="bob")
+        self.done = AppRequest.objects.create(app_name="Zoom", version="5.0", requested_by="bob", status="rejected")
+        DailyCounter.objects.all().delete()   # count only what bulk_decide adds
+
+    def decide(self, ids, decision, **extra):
+        return self.client.post("/api/app-requests/bulk-decide/", {"ids": ids, "decision": decision, **extra}, format="json")
+
+    def decided_counts(self, event):
+        rows = DailyCounter.objects.filter(metric="request", key=event).values_list("subkey", "count")
+        return dict(rows)
+
+    def test_approve_writes_statuses_logs_stats_and_live_events(self):
+        cursor = live.current_cursor()
+        response = self.decide([self.zoom.pk, self.slack.pk, self.done.pk, 999999], "approve", admin="carol")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["decided"], [self.zoom.pk, self.slack.pk])
+        self.assertEqual(response.data["skipped"], [self.done.pk, 999999])
+
+        statuses = dict(AppRequest.objects.values_list("pk", "status"))
+        self.assertEqual(statuses, {self.zoom.pk: "approved", self.slack.pk: "approved", self.done.pk: "rejected"})
+        for req in AppRequest.objects.filter(status="approved"):
+            self.assertTrue(req.eligibility)
+            self.assertIsNotNone(req.decided_at)
+        logs = Log.objects.filter(user="carol", log_type="system")
+        self.assertEqual(sorted(logs.values_list("action", flat=True)), ["✅ Approved Slack vlatest", "✅ Approved Zoom v5.1"])
+        self.assertEqual(self.decided_counts("approved"), {"Zoom": 1, "Slack": 1})
+        self.assertEqual(DailyCounter.objects.get(metric="logs", key="system").count, 2)
+
+        events = live.replay(cursor, live.current_cursor(), ["requests", "logs"])
+        requests = {key: data["status"] for _, stream, _, key, data in events if stream == "requests"}
+        self.assertEqual(requests, {str(self.zoom.pk): "approved", str(self.slack.pk): "approved"})
+        self.assertEqual(sum(1 for event in events if event[1] == "logs"), 2)
+
+    def test_reject(self):
+        self.decide([self.zoom.pk], "reject")
+        self.zoom.refresh_from_db()
+        self.assertEqual((self.zoom.status, self.zoom.eligibility), ("rejected", False))
+        self.assertEqual(self.decided_counts("rejected"), {"Zoom": 1})
+        self.assertEqual(AppRequest.objects.get(pk=self.slack.pk).status, "pending")
+
+    def test_already_decided_requests_are_skipped(self):
+        self.decide([self.zoom.pk], "approve")
+        response = self.decide([self.zoom.pk], "reject")
+        self.assertEqual((response.data["decided"], response.data["skipped"]), ([], [self.zoom.pk]))
+        self.assertEqual(AppRequest.objects.get(pk=self.zoom.pk).status, "approved")
+        self.assertEqual(self.decided_counts("rejected"), {})
+
+    def test_all_or_nothing(self):
+        with mock.patch.object(stats, "count_logs", side_effect=RuntimeError("boom")), self.assertRaises(RuntimeError):
+            self.decide([self.zoom.pk, self.slack.pk], "approve")
+        self.assertEqual(AppRequest.objects.filter(status="pending").count(), 2)
+        self.assertFalse(Log.objects.filter(log_type="system").exists())
+        self.assertEqual(self.decided_counts("approved"), {})
+
+    def test_bad_input(self):
+        for ids, decision in (([self.zoom.pk], "maybe"), ([], "approve"), ("1,2", "approve"), (["x"], "approve")):
+            self.assertEqual(self.decide(ids, decision).status_code, 400)
+        self.assertEqual(AppRequest.objects.filter(status="pending").count(), 2)
+
+
+@override_settings(AUDIT_LOG_MODE="sync")
+class TicketTests(TestCase):
+    """/api/tickets/: create, filtered pages, and compare-and-set transitions"""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def create(self, user, action="install zoom 5.1", **extra):
+        response = self.client.post("/api/tickets/", {"user": user, "action": action, **extra}, format="json")
+        self.assertEqual(response.status_code, 201)
+        return response.data
+
+    def transition(self, ticket_id, new_status, by="admin"):
+        return self.client.post(f"/api/tickets/{ticket_id}/transition/", {"status": new_status, "by": by}, format="json")
+
+    def test_create_and_list(self):
+        ticket = self.create("alice", status="closed")   # status is read-only: every ticket starts open
+        self.assertEqual((ticket["status"], ticket["role"]), ("open", "user"))
+        for i in range(3):
+            self.create("bob", action=f"install slack {i}", role="manager")
+        page = self.client.get("/api/tickets/", {"user": "bob", "page_size": 2}).data
+        self.assertEqual((page["count"], len(page["results"])), (3, 2))
+        self.assertIsNotNone(page["next"])
+        self.assertEqual(self.client.get(f"/api/tickets/{ticket['ticket_id']}/").data["action"], "install zoom 5.1")
+        self.transition(ticket["ticket_id"], "closed")
+        self.assertEqual(self.client.get("/api/tickets/", {"status": "open"}).data["count"], 3)
+
+    def test_transition_is_compare_and_set(self):
+        ticket_id = self.create("alice")["ticket_id"]
+        response = self.transition(ticket_id, "closed", by="bob")
+        self.assertEqual((response.status_code, response.data["status"]), (200, "closed"))
+        self.assertTrue(Log.objects.filter(user="bob", log_type="system", action=f"🎫 Ticket {ticket_id} closed").exists())
+        # A second approver acting on the stale "open" state loses
+        stale = self.transition(ticket_id, "rejected", by="admin")
+        self.assertEqual(stale.status_code, 409)
+        self.assertIn("already closed", stale.data["detail"])
+        self.assertEqual(Ticket.objects.get(ticket_id=ticket_id).status, "closed")
+        self.assertEqual(Log.objects.filter(log_type="system").count(), 1)
+
+    def test_transition_errors(self):
+        ticket_id = self.create("alice")["ticket_id"]
+        self.assertEqual(self.transition(ticket_id, "open").status_code, 400)
+        self.assertEqual(self.transition("nope", "closed").status_code, 404)
+
+
+class ImportTicketsTests(TestCase):
+    """manage.py import_tickets_xlsx loads the legacy tickets.xlsx once"""
+
+    def write(self, rows, columns=("TicketID", "User", "Role", "Action", "Status")):
+        import pandas as pd
+
+        path = Path(self.enterContext(tempfile.TemporaryDirectory())) / "tickets.xlsx"
+        pd.DataFrame(rows, columns=list(columns)).to_excel(path, index=False)
+        return path
+
+    def test_import_is_idempotent(self):
+        path = self.write([
+            ["T1", "alice", "user", "install zoom 5.1", "Closed"],
+            ["T2", "bob", "", "install slack latest", "pending"],
+            ["", "carol", "user", "no id", "open"],
+        ])
+        out = io.StringIO()
+        call_command("import_tickets_xlsx", str(path), stdout=out)
+        self.assertIn("Imported 2 tickets (0 already present)", out.getvalue())
+        tickets = {t.ticket_id: (t.user, t.role, t.status) for t in Ticket.objects.all()}
+        self.assertEqual(tickets, {"T1": ("alice", "user", "closed"), "T2": ("bob", "user", "open")})
+        out = io.StringIO()
+        call_command("import_tickets_xlsx", str(path), stdout=out)
+        self.assertIn("Imported 0 tickets (2 already present)", out.getvalue())
+
+    def test_bad_files(self):
+        with self.assertRaises(CommandError):
+            call_command("import_tickets_xlsx", "/nonexistent/tickets.xlsx")
+        path = self.write([["T1", "alice"]], columns=("TicketID", "User"))
+        with self.assertRaisesMessage(CommandError, "missing columns"):
+            call_command("import_tickets_xlsx", str(path))
+
+
+class FastRowsParityTests(TestCase):
+    """serialize_many + ORJSONRenderer give the same data and bytes as ModelSerializer + JSONRenderer"""
+
+    @classmethod
+    def setUpTestData(cls):
+        ts = timezone.now().replace(microsecond=123456)
+        Log.objects.create(user="alice", log_type="chat", action="line\u2028break\u2029 ünïcode 🎉", timestamp=ts)
+        Log.objects.create(user="bob", log_type="system", action='quotes " and \\ backslash', timestamp=ts)
+        AppRequest.objects.create(app_name="Zoom", version="5.1", requested_by="alice", note=None)
+        AppRequest.objects.create(app_name="Slack", version="latest", requested_by="bob", status="approved",
+                                  eligibility=True, decided_at=ts, note="ok")
+        Ticket.objects.create(user="alice", action="install zoom 5.1")
+        Task.objects.create(title="no description")
+        Task.objects.create(title="done", description="\u2028", completed=True)
+
+    def assert_parity(self, serializer_class, queryset):
+        from rest_framework.renderers import JSONRenderer
+        from mimic_backend.fastjson import ORJSONRenderer, fast_rows, serialize_many
+
+        self.assertIsNotNone(fast_rows(serializer_class), f"{serializer_class.__name__} left the fast path")
+        fast = serialize_many(serializer_class, queryset)
+        slow = serializer_class(queryset, many=True).data
+        self.assertEqual(len(fast), len(slow))   # rows hold datetimes where the serializer has strings; bytes match
+        self.assertEqual(ORJSONRenderer().render(fast), JSONRenderer().render(slow))
+        paged = {"next": None, "previous": "http://testserver/api/logs/?cursor=x", "results": fast}
+        self.assertEqual(ORJSONRenderer().render(paged), JSONRenderer().render({**paged, "results": slow}))
+
+    def test_models_match_their_serializers(self):
+        from .serializers import AppRequestSerializer, LogSerializer, TaskSerializer, TicketSerializer
+
+        cases = [
+            (LogSerializer, Log.objects.order_by("id")),
+            (AppRequestSerializer, AppRequest.objects.order_by("id")),
+            (TicketSerializer, Ticket.objects.order_by("id")),
+            (TaskSerializer, Task.objects.order_by("id")),
+        ]
+        for tz in ("UTC", "Asia/Kolkata", "America/New_York"):
+            with timezone.override(tz):
+                for serializer_class, queryset in cases:
+                    with self.subTest(serializer=serializer_class.__name__, tz=tz):
+                        self.assert_parity(serializer_class, queryset)
 
-# Create your tests here.
@@ -1,42 +1,97 @@
-from rest_framework import viewsets
+from rest_framework import viewsets, mixins, status
 from rest_framework.decorators import api_view, action
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
-from django.http import HttpResponse
+from django.db import transaction
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from .models import Task, Log, AppRequest
-from .serializers import TaskSerializer, LogSerializer, AppRequestSerializer
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.views.decorators.http import require_GET
+from .models import Task, Log, AppRequest, Ticket, EligibilityRule, DailyRollup
+from .serializers import TaskSerializer, LogSerializer, AppRequestSerializer, TicketSerializer
+from .pagination import KeysetPagination
+from .app_matcher import get_matcher
+from . import live, retention, stats
+from .eligibility import eligibility_data, get_index
+from mimic_backend import audit
+from mimic_backend.ratelimit import rate_limited
+from mimic_backend.conditional import conditional, ConditionalMixin
+from mimic_backend.fastjson import FastListMixin, serialize_many
 import re
+from datetime import datetime, time, timedelta
+from itertools import islice
 
 
 # ----------------- VIEWSETS ----------------- #
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(FastListMixin, viewsets.ModelViewSet):
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
 
 
-class LogViewSet(viewsets.ModelViewSet):
-    queryset = Log.objects.all().order_by("-timestamp")
+def _parse_bound(value, name):
+    """ISO datetime or date from a query param (dates are taken as midnight)"""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValidationError({name: f"Invalid date/datetime: {value}"})
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class LogViewSet(ConditionalMixin, FastListMixin, viewsets.ModelViewSet):
+    """Logs, newest first, cursor-paginated (?user=&log_type=&since=&until=&cursor=)"""
     serializer_class = LogSerializer
+    pagination_class = KeysetPagination
+    conditional_timestamp_field = "timestamp"
 
+    def get_queryset(self):
+        qs = Log.objects.all().order_by("-timestamp", "-id")
+        params = self.request.query_params
+        if params.get("user"):
+            qs = qs.filter(user=params["user"])
+        if params.get("log_type"):
+            qs = qs.filter(log_type=params["log_type"])
+        if params.get("since"):
+            qs = qs.filter(timestamp__gte=_parse_bound(params["since"], "since"))
+        if params.get("until"):
+            qs = qs.filter(timestamp__lt=_parse_bound(params["until"], "until"))
+        return qs
 
-class AppRequestViewSet(viewsets.ModelViewSet):
-    """Admin + User requests for apps"""
-    queryset = AppRequest.objects.all().order_by("-created_at")
+
+class AppRequestViewSet(FastListMixin, viewsets.ModelViewSet):
+    """Admin + User requests for apps (?status=&requested_by= filters)"""
     serializer_class = AppRequestSerializer
 
+    def get_queryset(self):
+        qs = AppRequest.objects.all().order_by("-created_at")
+        status_ = self.request.query_params.get("status")
+        requested_by = self.request.query_params.get("requested_by")
+        if status_:
+            qs = qs.filter(status=status_)
+        if requested_by:
+            qs = qs.filter(requested_by=requested_by)
+        return qs
+
     # Custom endpoint → Approve
     @action(detail=True, methods=["post"])
     def approve(self, request, pk=None):
         app_req = self.get_object()
         app_req.status = "approved"
         app_req.eligibility = True
+        app_req.decided_at = timezone.now()
         app_req.save()
 
-        Log.objects.create(
+        audit.record(Log(
             user=request.data.get("admin", "admin"),
             log_type="system",
             action=f"✅ Approved {app_req.app_name} v{app_req.version}",
-        )
+        ))
         return Response({"message": f"{app_req.app_name} v{app_req.version} approved."})
 
     # Custom endpoint → Reject
@@ -45,34 +100,151 @@ class AppRequestViewSet(viewsets.ModelViewSet):
         app_req = self.get_object()
         app_req.status = "rejected"
         app_req.eligibility = False
+        app_req.decided_at = timezone.now()
         app_req.save()
 
-        Log.objects.create(
+        audit.record(Log(
             user=request.data.get("admin", "admin"),
             log_type="system",
             action=f"❌ Rejected {app_req.app_name} v{app_req.version}",
-        )
+        ))
         return Response({"message": f"{app_req.app_name} v{app_req.version} rejected."})
 
+    # Custom endpoint → Approve/Reject many pending requests in one transaction
+    @action(detail=False, methods=["post"], url_path="bulk-decide")
+    def bulk_decide(self, request):
+        raw_ids = request.data.get("ids")
+        try:
+            ids = [int(i) for i in raw_ids] if isinstance(raw_ids, list) else []
+        except (TypeError, ValueError):
+            ids = []
+        decision = request.data.get("decision")
+        admin = request.data.get("admin", "admin")
+        if decision not in ("approve", "reject"):
+            return Response({"detail": "decision must be 'approve' or 'reject'"}, status=status.HTTP_400_BAD_REQUEST)
+        if not ids:
+            return Response({"detail": "ids must be a non-empty list of request ids"}, status=status.HTTP_400_BAD_REQUEST)
+
+        approved = decision == "approve"
+        with transaction.atomic():
+            pending = list(
+                AppRequest.objects.select_for_update()
+                .filter(pk__in=ids, status="pending")
+                .only("id", "app_name", "version")
+            )
+            decided_at = timezone.now()
+            AppRequest.objects.filter(pk__in=[r.pk for r in pending]).update(
+                status="approved" if approved else "rejected",
+                eligibility=approved,
+                decided_at=decided_at,
+            )
+            verb = "✅ Approved" if approved else "❌ Rejected"
+            logs = Log.objects.bulk_create([
+                Log(user=admin, log_type="system", action=f"{verb} {r.app_name} v{r.version}")
+                for r in pending
+            ])
+            # update()/bulk_create() skip signals, so the dashboard counters and live feed are fed here
+            stats.count_requests("approved" if approved else "rejected", pending, when=decided_at)
+            stats.count_logs(logs)
+            live.publish_requests(list(AppRequest.objects.filter(pk__in=[r.pk for r in pending])))
+            live.publish_logs(logs)
+
+        decided = {r.pk for r in pending}
+        return Response({
+            "message": f"{len(decided)} request(s) {'approved' if approved else 'rejected'}.",
+            "decided": sorted(decided),
+            "skipped": [i for i in ids if i not in decided],
+        })
+
+
+class TicketPagination(PageNumberPagination):
+    page_size = 25
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+
+class TicketViewSet(ConditionalMixin,
+                    FastListMixin,
+                    mixins.CreateModelMixin,
+                    mixins.ListModelMixin,
+                    mixins.RetrieveModelMixin,
+                    viewsets.GenericViewSet):
+    """Tickets: create, paginated list (?user=&status=), and status transitions"""
+    serializer_class = TicketSerializer
+    pagination_class = TicketPagination
+    lookup_field = "ticket_id"
+    conditional_timestamp_field = "updated_at"
+
+    def get_queryset(self):
+        qs = Ticket.objects.order_by("-created_at")
+        user = self.request.query_params.get("user")
+        status_ = self.request.query_params.get("status")
+        if user:
+            qs = qs.filter(user=user)
+        if status_:
+            qs = qs.filter(status=status_)
+        return qs
+
+    # Custom endpoint → Transition (open → closed/rejected)
+    @action(detail=True, methods=["post"])
+    def transition(self, request, ticket_id=None):
+        new_status = request.data.get("status")
+        allowed = {s for targets in Ticket.TRANSITIONS.values() for s in targets}
+        if new_status not in allowed:
+            return Response({"detail": f"status must be one of {sorted(allowed)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        from_states = [s for s, targets in Ticket.TRANSITIONS.items() if new_status in targets]
+        # Compare-and-set in one UPDATE so concurrent decisions can't both win
+        updated = Ticket.objects.filter(ticket_id=ticket_id, status__in=from_states).update(
+            status=new_status, updated_at=timezone.now()
+        )
+        ticket = get_object_or_404(Ticket, ticket_id=ticket_id)
+        if not updated:
+            return Response(
+                {"detail": f"Ticket {ticket_id} is already {ticket.status}."},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        audit.record(Log(
+            user=request.data.get("by", "admin"),
+            log_type="system",
+            action=f"🎫 Ticket {ticket_id} {new_status}",
+        ))
+        return Response(TicketSerializer(ticket).data)
+
 
 # ----------------- SIMPLE VIEWS ----------------- #
 def home(request):
     return HttpResponse("Hello 👋, Django API is running! Go to /api/tasks/")
 
 
+AGENT_VERB_RE = re.compile(r"\b(install|download)\b\s*(?P<rest>.*)", re.I | re.S)
+AGENT_APP_RE = re.compile(r"(?P<app>[A-Za-z0-9_\-]+)\s*(?P<version>[\d\.]*)")
+
+
 @api_view(["POST"])
+@rate_limited
 def agent_view(request):
     """Agent endpoint: handles install/download commands and logs requests for approval."""
     user_input = request.data.get("input", "")
     user = request.data.get("user", "demo")
 
     # Detect install or download
-    m = re.match(r".*(install|download)\s+(?P<app>[A-Za-z0-9_\-]+)\s*(?P<version>[\d\.]*)", user_input, re.I)
+    m = AGENT_VERB_RE.search(user_input)
+    app = version = None
     if m:
-        action_type = m.group(1).lower()
-        app = m.group("app")
-        version = m.group("version") or "latest"
+        # Resolve the app against the catalog (aliases, typos); unknown apps keep the raw word
+        found = get_matcher().best(m.group("rest"))
+        raw = AGENT_APP_RE.match(m.group("rest").strip())
+        if found:
+            app = found.app
+            version = found.version or (raw.group("version") if raw else "") or "latest"
+        elif raw:
+            app = raw.group("app")
+            version = raw.group("version") or "latest"
 
+    if app:
+        action_type = m.group(1).lower()
         # Create AppRequest (pending approval)
         app_req = AppRequest.objects.create(
             app_name=app,
@@ -83,7 +255,7 @@ def agent_view(request):
         )
 
         message = f"📌 Request created for {app} v{version}. Waiting for admin approval."
-        Log.objects.create(user=user, log_type="install" if action_type == "install" else "file", action=message)
+        audit.record(Log(user=user, log_type="install" if action_type == "install" else "file", action=message))
 
         return Response({
             "message": message,
@@ -92,23 +264,154 @@ def agent_view(request):
             "eligibility": app_req.eligibility
         })
 
-    # Otherwise → fallback chat
-    output = f"🤖 You said: {user_input}"
-    Log.objects.create(user=user, log_type="chat", action=output)
+    # Otherwise → fallback chat: Groq through core's response cache, an echo when no key is configured
+    from core.views import chat_reply
+    output = chat_reply(user_input) or f"🤖 You said: {user_input}"
+    audit.record(Log(user=user, log_type="chat", action=output))
     return Response({"output": output})
 
 
 @api_view(["GET"])
+def match_view(request):
+    """Ranked app candidates for free text (?q=&role=&limit=)."""
+    query = request.query_params.get("q", "")
+    role = request.query_params.get("role")
+    try:
+        limit = min(max(int(request.query_params.get("limit", 5)), 1), 20)
+    except ValueError:
+        raise ValidationError({"limit": "Must be an integer."})
+    allowed = list(eligibility_data().get(role, {})) if role else None
+    candidates = get_matcher().match(query, limit=limit, allowed=allowed)
+    return Response({"query": query, "candidates": [c._asdict() for c in candidates]})
+
+
+ELIGIBILITY_BATCH_MAX = 1000
+
+
+@api_view(["GET"])
+@conditional(lambda request: EligibilityRule.objects.all(), timestamp_field="updated_at")
+def eligibility_view(request):
+    """Compiled policy: {role: {app_name: [versions]}}."""
+    return Response({"policy": eligibility_data()})
+
+
+@api_view(["POST"])
+def eligibility_check_view(request):
+    """Check many (user or role, app, version) tuples in one call."""
+    checks = request.data.get("checks")
+    if not isinstance(checks, list) or not checks:
+        raise ValidationError({"checks": "Must be a non-empty list of {user|role, app, version} objects."})
+    if len(checks) > ELIGIBILITY_BATCH_MAX:
+        raise ValidationError({"checks": f"At most {ELIGIBILITY_BATCH_MAX} checks per call."})
+
+    index = get_index()
+    results = []
+    for i, item in enumerate(checks):
+        if not isinstance(item, dict) or not item.get("app") or not item.get("version"):
+            raise ValidationError({"checks": f"Item {i} needs app and version."})
+        role = item.get("role") or index.role_of(item.get("user"))
+        results.append({
+            "user": item.get("user"),
+            "role": role,
+            "app": item["app"],
+            "version": item["version"],
+            "eligible": index.check(role, item["app"], item["version"]),
+        })
+    return Response({"results": results})
+
+
+ARCHIVE_READ_MAX = 5000
+
+
+@api_view(["GET"])
+def log_rollups_view(request):
+    """Daily counts of archived rows (?source=&since=&until=&user=&log_type=&app_name=&version=&status=)."""
+    params = request.query_params
+    qs = DailyRollup.objects.filter(source=params.get("source", "log")).order_by(
+        "-day", "user", "log_type", "app_name", "version", "status"
+    )
+    if params.get("since"):
+        qs = qs.filter(day__gte=_parse_bound(params["since"], "since").date())
+    if params.get("until"):
+        qs = qs.filter(day__lt=_parse_bound(params["until"], "until").date())
+    for field in ("user", "log_type", "app_name", "version", "status"):
+        if params.get(field):
+            qs = qs.filter(**{field: params[field]})
+    return Response(list(qs.values("day", "user", "log_type", "app_name", "version", "status", "count")))
+
+
+@api_view(["GET"])
+def log_archive_view(request):
+    """Archived raw rows, oldest first (?source=&since=&until=&user=&log_type=&limit=)."""
+    params = request.query_params
+    try:
+        limit = min(max(int(params.get("limit", 500)), 1), ARCHIVE_READ_MAX)
+    except ValueError:
+        raise ValidationError({"limit": "Must be an integer."})
+    since = _parse_bound(params["since"], "since").date() if params.get("since") else None
+    until = _parse_bound(params["until"], "until").date() if params.get("until") else None
+    filters = {f: params[f] for f in ("user", "log_type", "app_name", "status") if params.get(f)}
+    try:
+        rows = retention.read_archive(params.get("source", "log"), since=since, until=until, **filters)
+        results = list(islice(rows, limit + 1))
+    except retention.RetentionError as e:
+        raise ValidationError({"source": str(e)})
+    return Response({"results": results[:limit], "truncated": len(results) > limit})
+
+
+STATS_DEFAULT_DAYS = 30
+
+
+@api_view(["GET"])
+def stats_view(request):
+    """Installs per app/version, request approval rates and active users per day (?since=&until=, UTC days)."""
+    params = request.query_params
+    until = _parse_bound(params["until"], "until").date() if params.get("until") else timezone.now().date() + timedelta(days=1)
+    since = _parse_bound(params["since"], "since").date() if params.get("since") else until - timedelta(days=STATS_DEFAULT_DAYS)
+    if since >= until:
+        raise ValidationError({"since": "Must be before until."})
+    return Response(stats.dashboard(since, until))
+
+
+@api_view(["GET"])
+@conditional()
 def logs_view(request):
     """Return latest 50 logs."""
-    logs = Log.objects.order_by("-timestamp")[:50]
-    serializer = LogSerializer(logs, many=True)
-    return Response(serializer.data)
+    return Response(serialize_many(LogSerializer, Log.objects.order_by("-timestamp")[:50]))
 
 
 @api_view(["GET"])
+@conditional(lambda request, pk: Log.objects.filter(pk=pk), timestamp_field="timestamp")
 def log_detail_view(request, pk):
     """Fetch a single log by ID."""
     log = get_object_or_404(Log, pk=pk)
     serializer = LogSerializer(log)
     return Response(serializer.data)
+
+
+@require_GET
+async def live_view(request):
+    """Server-Sent Events of Log rows, AppRequest changes and install progress (see main.live).
+
+    ?streams=logs,requests,installs (default all), ?role=&user= (users only get
+    their own rows), resume with Last-Event-ID or ?after=<event id>.
+    """
+    params = request.GET
+    streams = [s for s in params.get("streams", ",".join(live.STREAMS)).split(",") if s]
+    if not streams or not set(streams) <= set(live.STREAMS):
+        return JsonResponse({"detail": f"streams must be some of {', '.join(live.STREAMS)}"}, status=400)
+    user = params.get("user") or None
+    if params.get("role", "user") not in ("admin", "manager") and not user:
+        return JsonResponse({"detail": "user is required for this role"}, status=400)
+    after = request.headers.get("Last-Event-ID") or params.get("after")
+    try:
+        after = int(after) if after else None
+    except ValueError:
+        return JsonResponse({"detail": "Last-Event-ID / after must be an event id"}, status=400)
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({"detail": "Live updates need the ASGI server (uvicorn mimic_backend.asgi:application)"}, status=501)
+
+    response = StreamingHttpResponse(live.stream(streams, user, after), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"   # don't let a proxy buffer the stream
+    return response
@@ -1,3 +1,8 @@
+"""ASGI entry point: uvicorn mimic_backend.asgi:application
+
+Needed for the async agent endpoint and for /api/live/ (main.live), whose
+Server-Sent Event streams stay open for as long as a dashboard is.
+"""
 import os
 from django.core.asgi import get_asgi_application
 
@@ -0,0 +1,178 @@
+"""Write-behind sink for audit rows (main.Log, core.InstallLog).
+
+Views hand unsaved model instances to record() instead of calling
+objects.create(). In "buffered" mode they are queued in-process and a
+background thread writes them with one bulk_create per model once
+AUDIT_BATCH_SIZE rows are waiting or AUDIT_FLUSH_INTERVAL seconds have
+passed, so a burst of requests costs one write transaction instead of one
+each. Whatever is still queued is flushed at interpreter exit. "sync" mode
+saves each row immediately (tests, one-off scripts):
+
+    @override_settings(AUDIT_LOG_MODE="sync")
+    class AgentTests(TestCase): ...
+
+Rows get their timestamps when they are built, not when they are flushed.
+bulk_create sends no post_save, so every batch is announced with
+rows_written(sender=model, objs=[...]) instead; rows saved one by one
+(sync mode, backpressure, retries) send the usual post_save.
+"""
+import atexit, logging, threading
+from collections import deque
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.dispatch import Signal
+
+logger = logging.getLogger(__name__)
+
+rows_written = Signal()   # sender=model class, objs=[saved instances]
+
+
+class SyncSink:
+    mode = "sync"
+
+    def record(self, obj):
+        obj.save()
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def stats(self):
+        return {"mode": self.mode, "pending": 0}
+
+
+class BufferedSink:
+    mode = "buffered"
+
+    def __init__(self, batch_size=200, flush_interval=1.0, max_pending=20000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.written = 0
+        self.failed = 0
+        self._queue = deque()
+        self._wakeup = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="audit-sink", daemon=True)
+        self._thread.start()
+
+    def record(self, obj):
+        pending = len(self._queue)
+        if self._closed or pending >= self.max_pending:
+            # Backpressure: past the cap the caller writes its own row instead of growing the queue
+            self._wakeup.set()
+            obj.save()
+            return
+        self._queue.append(obj)
+        if pending + 1 >= self.batch_size:
+            self._wakeup.set()
+
+    def _drain(self):
+        batch = []
+        while self._queue:
+            batch.append(self._queue.popleft())
+        return batch
+
+    def flush(self):
+        """Write everything queued so far; returns the number of rows written"""
+        with self._flush_lock:
+            batch = self._drain()
+            if not batch:
+                return 0
+            by_model = {}
+            for obj in batch:
+                by_model.setdefault(type(obj), []).append(obj)
+            written = 0
+            for model, objs in by_model.items():
+                try:
+                    model.objects.bulk_create(objs, batch_size=self.batch_size)
+                    written += len(objs)
+                    for _, error in rows_written.send_robust(sender=model, objs=objs):
+                        if error is not None:
+                            logger.error("audit sink: rows_written receiver failed: %r", error)
+                except Exception:
+                    # One bad row must not cost the whole batch; retry them one at a time
+                    logger.exception("audit sink: bulk insert of %d %s rows failed", len(objs), model.__name__)
+                    for obj in objs:
+                        try:
+                            obj.save()
+                            written += 1
+                        except Exception:
+                            self.failed += 1
+                            logger.exception("audit sink: dropped %s row", model.__name__)
+            self.written += written
+            return written
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if not self._queue:
+                continue
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("audit sink: flush failed")
+        connection.close()   # the flusher thread's own connection
+
+    def close(self):
+        """Stop the flusher and write what is left"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "pending": len(self._queue),
+            "written": self.written,
+            "failed": self.failed,
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval,
+        }
+
+
+# --------------------------- SHARED SINK --------------------------- #
+_sink = None
+_sink_lock = threading.Lock()
+
+def build_sink(mode=None):
+    mode = mode or getattr(settings, "AUDIT_LOG_MODE", "buffered")
+    if mode == "sync":
+        return SyncSink()
+    return BufferedSink(
+        batch_size=getattr(settings, "AUDIT_BATCH_SIZE", 200),
+        flush_interval=getattr(settings, "AUDIT_FLUSH_INTERVAL", 1.0),
+    )
+
+def get_sink():
+    """Process-wide sink; follows AUDIT_LOG_MODE, so override_settings switches it"""
+    global _sink
+    mode = getattr(settings, "AUDIT_LOG_MODE", "buffered")
+    if _sink is None or _sink.mode != mode:
+        with _sink_lock:
+            if _sink is None or _sink.mode != mode:
+                if _sink is not None:
+                    _sink.close()
+                _sink = build_sink(mode)
+    return _sink
+
+def record(obj):
+    """Queue an unsaved audit row (Log, InstallLog, ...)"""
+    get_sink().record(obj)
+
+def flush():
+    return get_sink().flush()
+
+@atexit.register
+def _close_at_exit():
+    if _sink is not None:
+        _sink.close()
@@ -0,0 +1,116 @@
+"""Conditional GET (ETag / If-None-Match) for read-only endpoints.
+
+Small tables get their ETag from one cheap aggregate over the queryset an
+endpoint reads: row count, max primary key and, where the model has one,
+the max timestamp. When the client's If-None-Match still matches, the view
+never runs and a bodiless 304 goes back.
+
+    @api_view(["GET"])
+    @conditional(lambda request: EligibilityRule.objects.all(), timestamp_field="updated_at")
+    def eligibility_view(request): ...
+
+A view that reads several tables returns a tuple of querysets; the
+validators then cover all of them.
+
+Unbounded, keyset-paginated tables (logs, tickets) must not pay a COUNT/MAX
+over every matching row per poll. Without a queryset_func the ETag is a
+digest of the page the view just rendered (its rows and Link header), so
+a poll costs the page query alone and a 304 only saves the body. Views
+served from an in-process index (files) use it too: a table aggregate
+could move ahead of the index and pin a stale body under a fresh ETag.
+
+    @api_view(["GET"])
+    @conditional()
+    def logs_view(request): ...
+
+    class LogViewSet(ConditionalMixin, viewsets.ModelViewSet):   # list() by page, retrieve() by aggregate
+        conditional_timestamp_field = "timestamp"
+
+No Last-Modified is sent and If-Modified-Since is ignored: a max timestamp
+does not move when rows are deleted, so it could answer 304 for a changed
+list. The ETag folds the row count in (or is the page itself) and does.
+"""
+import hashlib, json
+from functools import wraps
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+
+def _digest(parts):
+    raw = "|".join(map(str, parts))
+    return quote_etag(hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest())
+
+
+def queryset_validators(request, queryset, timestamp_field=None):
+    """ETag for the rows behind this request (a queryset or a tuple of them)"""
+    aggregates = {"n": Count("pk"), "last_pk": Max("pk")}
+    if timestamp_field:
+        aggregates["last_ts"] = Max(timestamp_field)
+    parts = [request.get_full_path()]
+    for qs in (queryset if isinstance(queryset, (list, tuple)) else (queryset,)):
+        agg = qs.order_by().aggregate(**aggregates)
+        parts += [agg["n"], agg["last_pk"], agg.get("last_ts")]
+    return _digest(parts)
+
+
+def page_validators(request, response):
+    """ETag for a rendered page: its own rows and next-page link, no extra query"""
+    body = json.dumps(response.data, cls=DjangoJSONEncoder, separators=(",", ":"))
+    return _digest([request.get_full_path(), body, response.get("Link", "")])
+
+
+def _finish(response, etag):
+    # Only successful representations get validators; a 404 must never turn into a 304
+    if response.status_code == 200:
+        response.headers.setdefault("ETag", etag)
+        response.headers.setdefault("Cache-Control", "no-cache")
+    return response
+
+
+def _respond(request, etag, render):
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        return response
+    return _finish(render(), etag)
+
+
+def _respond_page(request, render):
+    response = render()
+    if response.status_code != 200:
+        return response
+    etag = page_validators(request, response)
+    return get_conditional_response(request, etag=etag) or _finish(response, etag)
+
+
+def conditional(queryset_func=None, timestamp_field=None):
+    """Decorate a GET view; queryset_func(request, *args, **kwargs) returns the rows it reads,
+    or is omitted to validate on the rendered page"""
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+            render = lambda: view(request, *args, **kwargs)
+            if queryset_func is None:
+                return _respond_page(request, render)
+            etag = queryset_validators(request, queryset_func(request, *args, **kwargs), timestamp_field)
+            return _respond(request, etag, render)
+        return wrapped
+    return decorator
+
+
+class ConditionalMixin:
+    """Conditional list (validated on the page) and retrieve (on the row) for DRF viewsets"""
+    conditional_timestamp_field = None
+
+    def list(self, request, *args, **kwargs):
+        return _respond_page(request, lambda: super(ConditionalMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+        etag = queryset_validators(request, queryset, self.conditional_timestamp_field)
+        return _respond(request, etag, lambda: super(ConditionalMixin, self).retrieve(request, *args, **kwargs))
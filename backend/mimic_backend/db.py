@@ -0,0 +1,27 @@
+"""Per-connection database tuning.
+
+SQLite pragmas from settings.SQLITE_PRAGMAS are applied to every new
+connection: busy_timeout makes a writer wait for the lock instead of
+failing with "database is locked", and mmap_size serves reads from the
+page cache. With SQLITE_WAL=1 they also switch to WAL, which lets readers
+run alongside the single writer, and synchronous NORMAL, which is durable
+under WAL without an fsync per commit. WAL is off by default because the
+journal mode is persisted in the database file and the checked-in
+db.sqlite3 would be rewritten. Connected from MainConfig.ready().
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    pragmas = getattr(settings, "SQLITE_PRAGMAS", {})
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+connection_created.connect(apply_sqlite_pragmas, dispatch_uid="sqlite-pragmas")
@@ -0,0 +1,153 @@
+"""Read-only fast path for high-volume list endpoints.
+
+A plain ModelSerializer spends most of a large list in per-field
+to_representation() calls. For serializers whose fields are all "plain"
+(integers, strings, choices, booleans, primary keys, ISO dates and
+datetimes) FastRows reads the same columns with values_list() and builds
+the output dicts directly. The result is a RowList, which ORJSONRenderer
+renders with orjson.
+
+The bytes are identical to the serializer + JSONRenderer path:
+- datetimes are moved to the current time zone like DateTimeField does,
+  and orjson's OPT_UTC_Z writes UTC as "Z" like DRF
+- U+2028/U+2029 are escaped like JSONRenderer does
+- anything else (errors, other views, floats, indent requests, missing
+  orjson) goes through the stock JSONRenderer
+
+Serializers with any other field type simply keep the serializer path.
+"""
+import datetime as dt
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+try:
+    import orjson
+except ImportError:  # the stock renderer produces the same bytes, only slower
+    orjson = None
+
+# Field classes whose to_representation() returns the database value unchanged
+# (exact types: subclasses may override it)
+PLAIN_FIELDS = (
+    serializers.IntegerField, serializers.CharField, serializers.EmailField, serializers.SlugField,
+    serializers.URLField, serializers.BooleanField, serializers.ChoiceField, serializers.ReadOnlyField,
+)
+ENVELOPE_TYPES = (str, int, type(None))   # next/previous/count around a page of rows
+
+
+class RowList(list):
+    """Output rows built by FastRows; safe to hand to orjson"""
+
+
+def _plain(field):
+    kind = type(field)
+    if kind in PLAIN_FIELDS:
+        return True
+    if kind is getattr(serializers, "BigIntegerField", None):   # DRF >= 3.16
+        return not getattr(field, "coerce_to_string", getattr(api_settings, "COERCE_BIGINT_TO_STRING", False))
+    if kind is serializers.PrimaryKeyRelatedField:
+        return field.pk_field is None
+    if kind is serializers.DateTimeField:
+        return getattr(field, "format", api_settings.DATETIME_FORMAT) == ISO_8601 and not hasattr(field, "timezone")
+    if kind is serializers.DateField:
+        return getattr(field, "format", api_settings.DATE_FORMAT) == ISO_8601
+    return False
+
+
+def _is_utc(tz):
+    return tz is dt.timezone.utc or getattr(tz, "key", None) in ("UTC", "Etc/UTC")
+
+
+class FastRows:
+    """values_list() columns and output keys equivalent to serializer_class(many=True)"""
+
+    def __init__(self, serializer_class):
+        fields = [f for f in serializer_class().fields.values() if not f.write_only]
+        self.names = [f.field_name for f in fields]
+        self.columns = [f.source for f in fields]
+        self.datetime_columns = [i for i, f in enumerate(fields) if type(f) is serializers.DateTimeField]
+        self.supported = all(_plain(f) and "." not in f.source and f.source != "*" for f in fields)
+
+    def values(self, queryset, named=False):
+        return queryset.values_list(*self.columns, named=named)
+
+    def rows(self, rows):
+        names = self.names
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        if tz is None or not self.datetime_columns or _is_utc(tz):
+            return RowList(dict(zip(names, row)) for row in rows)
+        out = RowList()
+        for row in rows:
+            row = list(row)
+            for i in self.datetime_columns:
+                if row[i] is not None:
+                    row[i] = row[i].astimezone(tz)
+            out.append(dict(zip(names, row)))
+        return out
+
+
+@lru_cache(maxsize=None)
+def fast_rows(serializer_class):
+    """FastRows for the serializer, or None when a field needs the real serializer"""
+    plan = FastRows(serializer_class)
+    return plan if plan.supported else None
+
+
+def serialize_many(serializer_class, queryset):
+    """Same data as serializer_class(queryset, many=True).data, from values_list() when possible"""
+    plan = fast_rows(serializer_class)
+    if plan is None:
+        return serializer_class(queryset, many=True).data
+    return plan.rows(plan.values(queryset))
+
+
+# --------------------------- VIEWS --------------------------- #
+class FastListMixin:
+    """list() for ModelViewSets from values_list() rows (paginated or not)"""
+
+    def list(self, request, *args, **kwargs):
+        plan = fast_rows(self.get_serializer_class())
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+        # Named rows let keyset paginators read the cursor columns off the last row
+        queryset = plan.values(self.filter_queryset(self.get_queryset()), named=True)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(plan.rows(page))
+        return Response(plan.rows(queryset))
+
+
+# --------------------------- RENDERER --------------------------- #
+def _fast_payload(data):
+    if isinstance(data, RowList):
+        return True
+    return (
+        isinstance(data, dict)
+        and any(isinstance(v, RowList) for v in data.values())
+        and all(isinstance(v, (RowList, *ENVELOPE_TYPES)) for v in data.values())
+    )
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer that hands RowList payloads to orjson; everything else renders exactly as before"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or not _fast_payload(data)
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, option=orjson.OPT_UTC_Z)
+        except (orjson.JSONEncodeError, TypeError):   # e.g. integers beyond 64 bits
+            return super().render(data, accepted_media_type, renderer_context)
+        # JSONRenderer escapes these two for JavaScript compatibility
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
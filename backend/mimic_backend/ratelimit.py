@@ -0,0 +1,240 @@
+"""Token-bucket rate limits for the agent endpoints.
+
+Every call takes one token from two buckets:
+
+    user:<name>   the caller's own bucket, sized by their role
+    role:<role>   shared by everyone with that role, so a crowd of users
+                  can't burn the LLM quota either
+
+Limits are (requests per minute, burst) per role in RATE_LIMITS; roles come
+from the eligibility policy (the body's "user"), anonymous callers are
+bucketed by IP. A call is allowed only if both buckets have a token, and
+then both are charged; otherwise the view answers 429 with Retry-After
+(seconds until both would have one).
+
+Bucket state lives in a store shared by the workers of a host:
+- "sqlite" (RATE_LIMIT_BACKEND): a small WAL file; each take is one
+  BEGIN IMMEDIATE transaction, so workers never double-spend a token
+- "memory": per process (tests, single-worker runs)
+
+Allowed/rejected counters per role are reported by stats().
+"""
+import asyncio, functools, json, math, os, sqlite3, threading, time
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+
+IDLE_PRUNE = 3600   # seconds; an idle bucket is full again, so its row can go
+PRUNE_EVERY = 1000  # takes between prunes
+
+DEFAULT_LIMITS = {
+    "user": {"user": (20, 10), "role": (300, 100)},
+    "manager": {"user": (40, 20), "role": (200, 60)},
+    "admin": {"user": (60, 30), "role": (200, 60)},
+}
+
+
+def _refill(tokens, updated, now, per_minute, burst):
+    return min(float(burst), tokens + (now - updated) * per_minute / 60.0)
+
+
+def _decide(states, limits, now, cost):
+    """(allowed, retry_after, new states) for [(tokens, updated)] against [(per_minute, burst)]"""
+    levels = [
+        _refill(tokens, updated, now, per_minute, burst) if updated is not None else float(burst)
+        for (tokens, updated), (per_minute, burst) in zip(states, limits)
+    ]
+    waits = [
+        (cost - level) * 60.0 / per_minute if per_minute else math.inf
+        for level, (per_minute, _) in zip(levels, limits) if level < cost
+    ]
+    if waits:
+        return False, max(waits), [(level, now) for level in levels]
+    return True, 0.0, [(level - cost, now) for level in levels]
+
+
+# --------------------------- STORES --------------------------- #
+class MemoryStore:
+    name = "memory"
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, buckets, cost=1):
+        """buckets: [(key, per_minute, burst)] → (allowed, retry_after seconds)"""
+        now = time.time()
+        with self._lock:
+            states = [self._buckets.get(key, (0.0, None)) for key, _, _ in buckets]
+            allowed, wait, states = _decide(states, [b[1:] for b in buckets], now, cost)
+            for (key, _, _), state in zip(buckets, states):
+                self._buckets[key] = state
+        return allowed, wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class SQLiteStore:
+    name = "sqlite"
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+        self._takes = 0
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets ("
+            " key TEXT PRIMARY KEY,"
+            " tokens REAL NOT NULL,"
+            " updated REAL NOT NULL)"
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def take(self, buckets, cost=1):
+        conn = self._conn()
+        now = time.time()
+        keys = [key for key, _, _ in buckets]
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = dict(
+                (key, (tokens, updated)) for key, tokens, updated in conn.execute(
+                    f"SELECT key, tokens, updated FROM rate_buckets WHERE key IN ({','.join('?' * len(keys))})", keys
+                )
+            )
+            states = [rows.get(key, (0.0, None)) for key in keys]
+            allowed, wait, states = _decide(states, [b[1:] for b in buckets], now, cost)
+            conn.executemany(
+                "INSERT OR REPLACE INTO rate_buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                [(key, tokens, updated) for key, (tokens, updated) in zip(keys, states)],
+            )
+            self._takes += 1
+            if self._takes % PRUNE_EVERY == 0:
+                conn.execute("DELETE FROM rate_buckets WHERE updated < ?", (now - IDLE_PRUNE,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed, wait
+
+    def clear(self):
+        self._conn().execute("DELETE FROM rate_buckets")
+
+
+# --------------------------- LIMITER --------------------------- #
+class RateLimiter:
+    def __init__(self, store, limits=None):
+        self.store = store
+        self.limits = limits or DEFAULT_LIMITS
+        self.allowed = Counter()
+        self.rejected = Counter()
+        self._stats_lock = threading.Lock()
+
+    def check(self, user, role, cost=1):
+        """(allowed, retry_after seconds) for one call by user with role"""
+        limits = self.limits.get(role) or self.limits["user"]
+        allowed, wait = self.store.take([
+            (f"user:{user}", *limits["user"]),
+            (f"role:{role}", *limits["role"]),
+        ], cost)
+        with self._stats_lock:
+            (self.allowed if allowed else self.rejected)[role] += 1
+        return allowed, wait
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "backend": self.store.name,
+                "enabled": getattr(settings, "RATE_LIMIT_ENABLED", True),
+                "allowed": dict(self.allowed),
+                "rejected": dict(self.rejected),
+                "limits": {role: {k: {"per_minute": r, "burst": b} for k, (r, b) in v.items()}
+                           for role, v in self.limits.items()},
+            }
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+def build_limiter(backend=None, path=None, limits=None):
+    backend = backend or getattr(settings, "RATE_LIMIT_BACKEND", "sqlite")
+    limits = limits or getattr(settings, "RATE_LIMITS", DEFAULT_LIMITS)
+    if backend == "sqlite":
+        path = path or getattr(settings, "RATE_LIMIT_PATH", os.path.join(settings.BASE_DIR, "ratelimit.sqlite3"))
+        return RateLimiter(SQLiteStore(path), limits)
+    return RateLimiter(MemoryStore(), limits)
+
+def get_limiter():
+    """Process-wide limiter configured from settings"""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = build_limiter()
+    return _limiter
+
+def set_limiter(limiter):
+    """Swap the process-wide limiter (tests)"""
+    global _limiter
+    _limiter = limiter
+
+
+# --------------------------- VIEWS --------------------------- #
+def _caller(request):
+    """(bucket name, role) from the body's "user" (DRF or plain JSON), else the client IP"""
+    data = getattr(request, "data", None)
+    if data is None:
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            data = {}
+    user = data.get("user") if isinstance(data, dict) else None
+    if not user:
+        return f"ip:{request.META.get('REMOTE_ADDR', '')}", "user"
+    from main.eligibility import get_index
+    return str(user), get_index().role_of(user)
+
+def _check(request):
+    """None when the call may proceed, else the 429 response"""
+    if not getattr(settings, "RATE_LIMIT_ENABLED", True):
+        return None
+    user, role = _caller(request)
+    allowed, wait = get_limiter().check(user, role)
+    if allowed:
+        return None
+    retry_after = max(1, math.ceil(wait)) if math.isfinite(wait) else 3600
+    response = JsonResponse(
+        {"detail": f"Rate limit exceeded for {user} ({role}); retry in {retry_after}s", "retry_after": retry_after},
+        status=429,
+    )
+    response["Retry-After"] = str(retry_after)
+    return response
+
+
+def rate_limited(view):
+    """Charge one token per call (user + role buckets); 429 with Retry-After when either is empty"""
+    if asyncio.iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            limited = await sync_to_async(_check)(request)
+            if limited is not None:
+                return limited
+            return await view(request, *args, **kwargs)
+    else:
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            limited = _check(request)
+            if limited is not None:
+                return limited
+            return view(request, *args, **kwargs)
+    return wrapper
@@ -67,11 +67,52 @@ TEMPLATES = [
 WSGI_APPLICATION = "mimic_backend.wsgi.application"
 
 # -------------------- DATABASE -------------------- #
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# DB_PROFILE=sqlite (default; tuned in mimic_backend/db.py, WAL with SQLITE_WAL=1) or postgres
+DB_PROFILE = os.environ.get("DB_PROFILE", "sqlite")
+
+if DB_PROFILE == "postgres":
+    # Django's pool (psycopg 3) and persistent connections are mutually exclusive
+    DB_POOL = os.environ.get("DB_POOL", "True") == "True"
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("POSTGRES_DB", "mimic"),
+            "USER": os.environ.get("POSTGRES_USER", "mimic"),
+            "PASSWORD": os.environ.get("POSTGRES_PASSWORD", ""),
+            "HOST": os.environ.get("POSTGRES_HOST", "127.0.0.1"),
+            "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+            "CONN_MAX_AGE": 0 if DB_POOL else int(os.environ.get("DB_CONN_MAX_AGE", "600")),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                "pool": {
+                    "min_size": int(os.environ.get("DB_POOL_MIN", "2")),
+                    "max_size": int(os.environ.get("DB_POOL_MAX", "10")),
+                    "timeout": float(os.environ.get("DB_POOL_TIMEOUT", "10")),
+                },
+            } if DB_POOL else {},
+        }
     }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
+            "OPTIONS": {
+                "timeout": 20,                      # seconds a connection waits for the write lock
+                "transaction_mode": "IMMEDIATE",    # take the write lock at BEGIN, not mid-transaction
+            },
+        }
+    }
+
+# ✅ WAL is opt-in (SQLITE_WAL=1): journal_mode is stored in the database file and WAL leaves
+# -wal/-shm files beside it, which would rewrite the checked-in db.sqlite3 on first connect
+SQLITE_WAL = os.environ.get("SQLITE_WAL", "0") == "1"
+
+# Applied to every new SQLite connection by mimic_backend/db.py
+SQLITE_PRAGMAS = {
+    **({"journal_mode": "WAL", "synchronous": "NORMAL"} if SQLITE_WAL else {}),
+    "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "20000")),
+    "mmap_size": int(os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
 }
 
 # -------------------- PASSWORDS -------------------- #
@@ -106,5 +147,96 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # -------------------- CUSTOM -------------------- #
-SERVICE_NOW_EXCEL = os.environ.get("SERVICE_NOW_EXCEL", "servicenow_requests.xlsx")
+# ServiceNow-style request sheet, one row per completed install (see core/sn_excel.py for its size limit)
+SERVICE_NOW_EXCEL = os.environ.get("SERVICE_NOW_EXCEL", str(BASE_DIR / "servicenow_requests.xlsx"))
 BACKEND_URL = os.environ.get("BACKEND_URL", "http://127.0.0.1:8000/api")
+
+# ✅ Groq response cache: "memory" (per worker), "sqlite" (shared by workers) or "none"
+LLM_CACHE_BACKEND = os.environ.get("LLM_CACHE_BACKEND", "memory")
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", str(BASE_DIR / "llm_cache.sqlite3"))
+LLM_CACHE_MAXSIZE = int(os.environ.get("LLM_CACHE_MAXSIZE", "1024"))
+LLM_CACHE_TTL = int(os.environ.get("LLM_CACHE_TTL", "3600"))
+
+# ✅ Minimum confidence for the local intent matcher to skip the Groq classification call
+LOCAL_INTENT_THRESHOLD = float(os.environ.get("LOCAL_INTENT_THRESHOLD", "0.8"))
+
+# ✅ Async agent (ASGI): per-call Groq timeout (seconds) and max in-flight LLM calls per worker
+LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", "20"))
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "64"))
+
+# ✅ Background log exports: worker threads, artifact cache dir and max artifact age (seconds)
+EXPORT_WORKERS = int(os.environ.get("EXPORT_WORKERS", "2"))
+EXPORT_CACHE_DIR = os.environ.get("EXPORT_CACHE_DIR", str(BASE_DIR / "export_cache"))
+EXPORT_CACHE_MAX_AGE = int(os.environ.get("EXPORT_CACHE_MAX_AGE", str(24 * 3600)))
+
+# ✅ Eligibility index: seconds between checks for policy changes made by other processes
+ELIGIBILITY_REFRESH = float(os.environ.get("ELIGIBILITY_REFRESH", "30"))
+
+# ✅ App matcher (chat / /api/match/): seconds between checks for catalog changes made by other processes
+CATALOG_REFRESH = float(os.environ.get("CATALOG_REFRESH", "30"))
+
+# ✅ Audit rows (Log/InstallLog): "buffered" write-behind or "sync" (one INSERT per row; use in tests)
+AUDIT_LOG_MODE = os.environ.get("AUDIT_LOG_MODE", "buffered")
+AUDIT_BATCH_SIZE = int(os.environ.get("AUDIT_BATCH_SIZE", "200"))
+AUDIT_FLUSH_INTERVAL = float(os.environ.get("AUDIT_FLUSH_INTERVAL", "1.0"))
+
+# ✅ Log retention (manage.py archive_logs): days kept in the hot tables and where archives go
+LOG_RETENTION_DAYS = int(os.environ.get("LOG_RETENTION_DAYS", "90"))
+LOG_ARCHIVE_DIR = os.environ.get("LOG_ARCHIVE_DIR", str(BASE_DIR / "log_archive"))
+
+# ✅ DRF: list endpoints built from values_list() rows are rendered with orjson (byte-identical output)
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "mimic_backend.fastjson.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+}
+
+# ✅ File catalog: storage root for downloads, index refresh (seconds) and optional
+# front-server offload ("x-sendfile" for Apache/lighttpd, "x-accel-redirect" for nginx)
+FILE_STORAGE_DIR = os.environ.get("FILE_STORAGE_DIR", str(BASE_DIR / "files"))
+FILE_INDEX_REFRESH = float(os.environ.get("FILE_INDEX_REFRESH", "30"))
+FILE_SENDFILE = os.environ.get("FILE_SENDFILE", "")
+FILE_SENDFILE_PREFIX = os.environ.get("FILE_SENDFILE_PREFIX", "/protected-files/")
+# Categories of private files each role may see ("*" = all); public files are visible to every role
+FILE_PERMISSIONS = {
+    "user": [],
+    "manager": ["general", "finance"],
+    "admin": ["*"],
+}
+
+# ✅ Installer package store: content-addressed blobs, LRU disk quota (bytes) and optional upstream
+# installers laid out as <PACKAGE_SOURCE_DIR>/<app>/<version>/<file> (else placeholder installers)
+PACKAGE_STORE_DIR = os.environ.get("PACKAGE_STORE_DIR", str(BASE_DIR / "package_store"))
+PACKAGE_STORE_QUOTA = int(os.environ.get("PACKAGE_STORE_QUOTA", str(5 * 1024 ** 3)))
+PACKAGE_SOURCE_DIR = os.environ.get("PACKAGE_SOURCE_DIR", "")
+
+# ✅ Install job queue: worker threads in the web process (0 = run `manage.py install_workers` instead),
+# idle poll (seconds), simulated deploy time, retry backoff base (seconds, doubled per attempt),
+# heartbeat lease before a running job is requeued, and attempts per job
+INSTALL_INLINE_WORKERS = int(os.environ.get("INSTALL_INLINE_WORKERS", "2"))
+INSTALL_POLL_INTERVAL = float(os.environ.get("INSTALL_POLL_INTERVAL", "1.0"))
+INSTALL_DEPLOY_SECONDS = float(os.environ.get("INSTALL_DEPLOY_SECONDS", "1.5"))
+INSTALL_RETRY_BACKOFF = float(os.environ.get("INSTALL_RETRY_BACKOFF", "5"))
+INSTALL_LEASE = float(os.environ.get("INSTALL_LEASE", "60"))
+INSTALL_MAX_ATTEMPTS = int(os.environ.get("INSTALL_MAX_ATTEMPTS", "3"))
+
+# ✅ Live updates (/api/live/, ASGI): outbox poll (seconds), SSE keepalive, event retention (seconds),
+# max events replayed on reconnect, per-stream backlog before a reset, and outbox rows read per poll
+LIVE_POLL_INTERVAL = float(os.environ.get("LIVE_POLL_INTERVAL", "1.0"))
+LIVE_KEEPALIVE = float(os.environ.get("LIVE_KEEPALIVE", "15"))
+LIVE_RETENTION = int(os.environ.get("LIVE_RETENTION", "3600"))
+LIVE_REPLAY_MAX = int(os.environ.get("LIVE_REPLAY_MAX", "1000"))
+LIVE_QUEUE_MAX = int(os.environ.get("LIVE_QUEUE_MAX", "1000"))
+LIVE_BATCH = int(os.environ.get("LIVE_BATCH", "500"))
+
+# ✅ Agent rate limits: token buckets per user and per role, as (requests per minute, burst);
+# "sqlite" shares the buckets between the workers of a host, "memory" is per process
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "1") == "1"
+RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "sqlite")
+RATE_LIMIT_PATH = os.environ.get("RATE_LIMIT_PATH", str(BASE_DIR / "ratelimit.sqlite3"))
+RATE_LIMITS = {
+    "user": {"user": (20, 10), "role": (300, 100)},
+    "manager": {"user": (40, 20), "role": (200, 60)},
+    "admin": {"user": (60, 30), "role": (200, 60)},
+}
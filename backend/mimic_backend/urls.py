@@ -5,7 +5,15 @@ from main.views import (
     TaskViewSet,
     LogViewSet,
     AppRequestViewSet,   
+    TicketViewSet,
     agent_view,
+    match_view,
+    eligibility_view,
+    eligibility_check_view,
+    log_rollups_view,
+    log_archive_view,
+    stats_view,
+    live_view,
     logs_view,
     log_detail_view,
     home,
@@ -15,12 +23,22 @@ router = routers.DefaultRouter()
 router.register(r'tasks', TaskViewSet, basename="task")
 router.register(r'logs', LogViewSet, basename="log")
 router.register(r'app-requests', AppRequestViewSet, basename="app-request")  
+router.register(r'tickets', TicketViewSet, basename="ticket")
 
 urlpatterns = [
     path('', home, name="home"),
     path('admin/', admin.site.urls),
-    path('api/', include(router.urls)),  # /api/tasks/, /api/logs/, /api/app-requests/
+    # core first: its logs/export/ must win over the router's logs/<pk>/, and its index replaces the router root
+    path('api/', include('core.urls')),  # /api/catalog/, /api/install/, /api/files/, /api/config/, /api/agent/stream/, ...
+    path('api/', include(router.urls)),  # /api/tasks/, /api/logs/, /api/app-requests/, /api/tickets/
     path('api/agent/', agent_view, name="agent"),  # POST endpoint
+    path('api/match/', match_view, name="match"),  # fuzzy app/version matcher
+    path('api/eligibility/', eligibility_view, name="eligibility"),  # compiled policy
+    path('api/eligibility/check/', eligibility_check_view, name="eligibility-check"),  # batch checks
+    path('api/log-rollups/', log_rollups_view, name="log-rollups"),  # daily counts of archived logs
+    path('api/log-archive/', log_archive_view, name="log-archive"),  # archived raw logs
+    path('api/stats/', stats_view, name="stats"),  # dashboard counters
+    path('api/live/', live_view, name="live"),  # SSE row changes (ASGI only)
     path('api/logs-latest/', logs_view, name="logs-latest"),  # latest logs only
     path('api/logs/<int:pk>/', log_detail_view, name="log-detail"),  # ✅ single log
 ]
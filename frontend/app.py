@@ -1,54 +1,112 @@
-import os, io, time, uuid, time
 import pandas as pd
 import streamlit as st
 import requests
-import difflib
-import re
-
-BACKEND_URL = os.environ.get("BACKEND_URL", "http://127.0.0.1:8000/api")
+from urllib.parse import urlparse, parse_qs, quote
+from backend_client import (BACKEND_URL, api_get, api_get_conditional, api_post, api_query, api_stream, get_live_feed,
+                            load_config, load_page_data)
 
 st.set_page_config(page_title="Mimic – Agentic UI", layout="wide")
 
 # --------------------------- HELPERS --------------------------- #
-def api_get(path, params=None):
-    r = requests.get(f"{BACKEND_URL}{path}", params=params)
-    r.raise_for_status()
-    return r.json()
-
-def api_post(path, data=None):
-    r = requests.post(f"{BACKEND_URL}{path}", json=data or {})
-    r.raise_for_status()
-    return r.json()
-
-def log_action_via_agent(text: str, user="system"):
-    """Send logs to Django backend via /agent/ endpoint"""
+def rate_limited_message(e):
+    """Friendly text for a 429 from the agent endpoints, else None"""
+    if e.response is None or e.response.status_code != 429:
+        return None
+    return f"⏳ Too many requests. Try again in {e.response.headers.get('Retry-After', 'a few')}s."
+
+def agent_reply_stream(payload):
+    """Agent reply chunk by chunk; falls back to one-shot /agent/ when streaming is unavailable"""
     try:
-        api_post("/agent/", {"input": text, "user": user})
+        yield from api_stream("/agent/stream/", payload)
+    except requests.HTTPError as e:
+        if rate_limited_message(e):   # the fallback would be refused too
+            yield rate_limited_message(e)
+            return
+        try:
+            res = api_post("/agent/", payload)
+            yield res.get("output") or res.get("message") or "⚠️ Unexpected backend response."
+        except Exception as e:
+            yield f"❌ Backend error: {e}"
+    except Exception as e:
+        yield f"❌ Backend error: {e}"
+
+def log_action(text: str, user="system", log_type="system"):
+    """Write an audit log row via /logs/ (not /agent/: no LLM call, no rate-limit token)"""
+    try:
+        api_post("/logs/", {"action": text, "user": user, "log_type": log_type})
+    except requests.HTTPError as e:
+        st.warning(rate_limited_message(e) or f"Could not log action: {e}")
     except Exception as e:
         st.warning(f"Could not log action: {e}")
 
-def create_ticket(user, action, status="Open"):
-    """Creates ticket locally and logs SYSTEM event in backend"""
-    ticket_id = str(uuid.uuid4())[:8]
-    ticket_file = "tickets.xlsx"
-    new_ticket = {
-        "TicketID": ticket_id,
-        "User": user["username"],
-        "Role": user["role"],
-        "Action": action,
-        "Status": status,
-    }
-    if os.path.exists(ticket_file):
-        df = pd.read_excel(ticket_file)
-        df = pd.concat([df, pd.DataFrame([new_ticket])], ignore_index=True)
-    else:
-        df = pd.DataFrame([new_ticket])
-    df.to_excel(ticket_file, index=False)
+def create_ticket(user, action):
+    """Creates ticket in the backend and logs SYSTEM event"""
+    ticket = api_post("/tickets/", {
+        "user": user["username"],
+        "role": user["role"],
+        "action": action,
+    })
+    ticket_id = ticket["ticket_id"]
 
     # Log SYSTEM event
-    log_action_via_agent(f"SYSTEM: Ticket {ticket_id} created for {action}", user["username"])
+    log_action(f"SYSTEM: Ticket {ticket_id} created for {action}", user["username"])
     return ticket_id
 
+def package_url(app, version, username):
+    """Installer download from the backend package store (eligibility is checked there)"""
+    return f"{BACKEND_URL}/packages/{quote(app, safe='')}/{quote(version, safe='')}/download/?user={quote(username)}"
+
+INSTALL_POLL_SECONDS = 1
+LIVE_REFRESH_SECONDS = 2   # live tables re-render from the in-process feed, no backend call
+LIVE_MAX_ROWS = 1000
+
+def live_table(name, stream, seed_rows, seed_cursor, match=lambda row: True):
+    """{id: row} for a table seeded from a snapshot taken at seed_cursor, then patched with live deltas"""
+    tables = st.session_state.setdefault("live_tables", {})
+    table = tables.get(name)
+    feed = get_live_feed()
+    events = feed.events_after(table["cursor"]) if table else None
+    if events is None:   # first render, or the feed can't cover our range: start over from the snapshot
+        table = tables[name] = {"cursor": seed_cursor, "rows": {r["id"]: r for r in seed_rows}}
+        events = feed.events_after(seed_cursor) or []
+    for event_id, event, _, row in events:
+        if event == stream and match(row):
+            table["rows"][row["id"]] = row
+        table["cursor"] = event_id
+    if len(table["rows"]) > LIVE_MAX_ROWS:
+        table["rows"] = dict(sorted(table["rows"].items())[-LIVE_MAX_ROWS:])
+    return table["rows"]
+
+@st.fragment(run_every=INSTALL_POLL_SECONDS)
+def install_progress():
+    """Progress bars for this session's queued installs; only this fragment reruns while they poll"""
+    finished = False
+    feed = get_live_feed()
+    for job_id, meta in list(st.session_state.install_jobs.items()):
+        # Pushed by the live feed when it is connected, else polled
+        job = feed.latest("installs", str(job_id))
+        if job is None:
+            try:
+                job = api_get(f"/install/jobs/{job_id}/")
+            except requests.RequestException as e:
+                st.warning(f"Could not fetch install status: {e}")
+                continue
+        label = f"{meta['app']} {meta['ver']}"
+        if job["status"] in ("queued", "running"):
+            retry = f" · retry {job['attempts']}/{job['max_attempts']}" if job["attempts"] > 1 else ""
+            st.progress(job["progress"], text=f"🚀 Deploying {label}: {job['step'] or 'queued'}{retry}")
+            continue
+        del st.session_state.install_jobs[job_id]
+        finished = True
+        if job["status"] == "succeeded":
+            st.session_state.show_download_modal = {"app": meta["app"], "ver": meta["ver"]}
+            text = f"✅ Installed {label}. Ticket {meta['ticket_id']} created."
+        else:
+            text = f"❌ Install of {label} failed after {job['attempts']} attempts: {job['error']}"
+        st.session_state.chat_history.append({"role": "assistant", "text": text})
+    if finished:
+        st.rerun()   # full rerun: chat history and the download modal live outside the fragment
+
 # --------------------------- LOGIN --------------------------- #
 def login_box():
     with st.sidebar:
@@ -74,34 +132,52 @@ user = st.session_state.user
 st.sidebar.success(f"👤 {user['username']} ({user['role']})")
 if st.sidebar.button("Logout"): st.session_state.clear(); st.rerun()
 
+# One aggregated round trip for the data every tab shows on first render
+try:
+    page_data = load_page_data(user["username"], user["role"])
+except Exception as e:
+    st.warning(f"Could not preload page data: {e}")
+    page_data = None
+
 st.title("🤖 Mimic – Agentic UI")
 st.caption("Role-based downloads, chatbot assistant, file access, and tickets")
 
-# --------------------------- APP LIST --------------------------- #
-AVAILABLE_APPS = {
-    "MS Word": ["2016", "2019", "2021"],
-    "MS Excel": ["2016", "2019", "2021"],
-    "Zoom": ["5.0", "5.1", "latest"],
-    "Slack": ["4.20", "4.21", "latest"],
-}
-ROLE_APPS = {
-    "user": ["Zoom"],
-    "manager": ["Zoom", "MS Excel"],
-    "admin": list(AVAILABLE_APPS.keys()),
+# --------------------------- CATALOG / POLICY --------------------------- #
+# Built-in catalog and policy, used only while the backend can't serve /config/
+FALLBACK_CONFIG = {
+    "catalog": [
+        {"app_name": "MS Word", "versions": ["2016", "2019", "2021"]},
+        {"app_name": "MS Excel", "versions": ["2016", "2019", "2021"]},
+        {"app_name": "Zoom", "versions": ["5.0", "5.1", "latest"]},
+        {"app_name": "Slack", "versions": ["4.20", "4.21", "latest"]},
+    ],
+    "eligibility": {
+        "user": {"Zoom": ["latest", "5.0"]},
+        "manager": {"Zoom": ["latest", "5.0", "5.1"], "MS Excel": ["2019", "2021"]},
+        "admin": {
+            "MS Word": ["2016", "2019", "2021"],
+            "MS Excel": ["2016", "2019", "2021"],
+            "Zoom": ["5.0", "5.1", "latest"],
+            "Slack": ["4.20", "4.21", "latest"],
+        },
+    },
+    "files": [],   # file ids only exist in the backend catalog
 }
 
-# --------------------------- FILES --------------------------- #
-FILES_DB = [
-    {"filename":"Employee_Handbook.pdf","category":"general","is_public":1},
-    {"filename":"VPN_Guide.pdf","category":"general","is_public":1},
-    {"filename":"Finance_Q3.xlsx","category":"finance","is_public":0},
-    {"filename":"Prod_DB_Creds.txt","category":"sensitive","is_public":0},
-]
-FILES_PERMISSIONS = {
-    "user": ["general"],
-    "manager": ["general", "finance"],
-    "admin": ["general", "finance", "sensitive"],
-}
+# Served by the backend (/config/); cached per role and revalidated via ETag
+try:
+    config = load_config(user["role"])
+except Exception as e:
+    st.warning(f"Could not load app catalog from backend, using the built-in one: {e}")
+    config = FALLBACK_CONFIG
+
+AVAILABLE_APPS = {a["app_name"]: a["versions"] for a in config["catalog"]}
+APP_ELIGIBILITY = config["eligibility"]
+ROLE_APPS = {role: list(apps) for role, apps in APP_ELIGIBILITY.items()}
+MY_ELIGIBLE = frozenset(   # (app, version) pairs this user's role may install
+    (app, ver) for app, versions in APP_ELIGIBILITY.get(user["role"], {}).items() for ver in versions
+)
+FILES_DB = config["files"]   # already filtered to what this role may see
 
 # --------------------------- TABS --------------------------- #
 tab_chat, tab_files, tab_logs, tab_tickets, tab_requests = st.tabs(
@@ -130,6 +206,8 @@ with tab_chat:
     if "detected_app" not in st.session_state:
         st.session_state.detected_app = None
         st.session_state.detected_version = None
+    if "install_jobs" not in st.session_state:
+        st.session_state.install_jobs = {}   # job id → {"app", "ver", "ticket_id"}
 
     # Display chat history
     for msg in st.session_state.chat_history:
@@ -138,28 +216,22 @@ with tab_chat:
         else:
             st.chat_message("assistant").write(msg["text"])
 
+    if st.session_state.install_jobs:
+        install_progress()
+
     # ---------------- Chat Input ---------------- #
     user_input = st.chat_input("Type your request (e.g., Install Zoom 5.1)")
     if user_input:
         st.session_state.chat_history.append({"role": "user", "text": user_input})
 
-        # Detect app/version
-        app_from_text, ver_from_text = None, None
-        m = re.match(r".*?(?P<app>[A-Za-z][\w\s]*)\s*(?P<version>[\w\.]+)?", user_input, re.I)
-        if m:
-            app_from_text = m.group("app").strip()
-            ver_from_text = (m.group("version") or "").strip()
-
-        # Fuzzy match app
-        detected_app = None
-        if app_from_text:
-            for app in allowed_apps:
-                if app_from_text.lower() in app.lower():
-                    detected_app = app
-                    break
-            if not detected_app:
-                close = difflib.get_close_matches(app_from_text, allowed_apps, n=1, cutoff=0.5)
-                if close: detected_app = close[0]
+        # Detect app/version with the backend's trigram matcher (aliases, typos, role's apps only)
+        detected_app, ver_from_text = None, None
+        try:
+            found = api_get("/match/", {"q": user_input, "role": user["role"], "limit": 1})["candidates"]
+        except requests.RequestException:
+            found = []
+        if found and found[0]["app"] in allowed_apps:
+            detected_app, ver_from_text = found[0]["app"], found[0]["version"]
 
         # Save detection in session state
         st.session_state.detected_app = detected_app
@@ -179,41 +251,18 @@ with tab_chat:
                                         index=allowed_apps.index(detected_app),
                                         key="chat_app")
 
-            versions = AVAILABLE_APPS[selected_app]
-            default_idx = 0
-            if ver_from_text and ver_from_text in versions:
-                default_idx = versions.index(ver_from_text)
-            elif ver_from_text:
-                close_ver = difflib.get_close_matches(ver_from_text, versions, n=1, cutoff=0.3)
-                if close_ver: default_idx = versions.index(close_ver[0])
+            versions = AVAILABLE_APPS.get(selected_app, [])
+            default_idx = versions.index(ver_from_text) if ver_from_text in versions else 0
 
             selected_ver = st.selectbox("Choose version", versions,
                                         index=default_idx,
                                         key="chat_ver")
 
-            # Eligibility
-            APP_ELIGIBILITY = {
-                "user": {"Zoom": ["latest", "5.0"]},
-                "manager": {"Zoom": ["latest", "5.0", "5.1"], "MS Excel": ["2019", "2021"]},
-                "admin": {
-                    "MS Word": ["2016", "2019", "2021"],
-                    "MS Excel": ["2016", "2019", "2021"],
-                    "Zoom": ["5.0", "5.1", "latest"],
-                    "Slack": ["4.20", "4.21", "latest"]
-                }
-            }
-            allowed_versions = APP_ELIGIBILITY.get(user["role"], {}).get(selected_app, [])
-            eligible = selected_ver in allowed_versions
+            eligible = (selected_app, selected_ver) in MY_ELIGIBLE
 
             if eligible:
                 with st.expander("✅ Eligible! Click to download installer"):
-                    st.download_button(
-                        "⬇️ Download Package",
-                        data=f"Dummy installer for {selected_app} {selected_ver}".encode(),
-                        file_name=f"{selected_app}-{selected_ver}.zip",
-                        mime="application/zip",
-                        key=f"dl_{selected_app}_{selected_ver}"
-                    )
+                    st.link_button("⬇️ Download Package", package_url(selected_app, selected_ver, user["username"]))
             else:
                 st.error(f"⛔ Not eligible for {selected_app} {selected_ver}")
 
@@ -223,25 +272,29 @@ with tab_chat:
                 else:
                     action = f"install {selected_app} {selected_ver}"
                     ticket_id = create_ticket(user, action)
-                    log_action_via_agent(action, user["username"])
-
-                    with st.spinner(f"🚀 Deploying {selected_app} {selected_ver}..."):
-                        progress = st.progress(0)
-                        for i in range(1, 101, 10):
-                            time.sleep(0.15)
-                            progress.progress(i)
-
-                    st.success(f"✅ Deployment complete! Ticket {ticket_id}")
-                    st.session_state.show_download_modal = {"app": selected_app, "ver": selected_ver}
-                    st.session_state.chat_history.append({
-                        "role": "assistant",
-                        "text": f"✅ Installed {selected_app} {selected_ver}. Ticket {ticket_id} created."
-                    })
-
-                    # Reset detection so dropdown disappears after install
-                    st.session_state.detected_app = None
-                    st.session_state.detected_version = None
-                    st.rerun()
+                    log_action(action, user["username"], log_type="install")
+
+                    # The backend queues the deployment; install_progress() polls it
+                    try:
+                        job = api_post("/install/", {
+                            "app_name": selected_app, "version": selected_ver,
+                            "user": user["username"], "note": action,
+                        })
+                    except requests.RequestException as e:
+                        st.error(f"❌ Could not queue install: {e}")
+                    else:
+                        st.session_state.install_jobs[job["job_id"]] = {
+                            "app": selected_app, "ver": selected_ver, "ticket_id": ticket_id,
+                        }
+                        st.session_state.chat_history.append({
+                            "role": "assistant",
+                            "text": f"🚀 Deploying {selected_app} {selected_ver}… Ticket {ticket_id} created."
+                        })
+
+                        # Reset detection so dropdown disappears after install
+                        st.session_state.detected_app = None
+                        st.session_state.detected_version = None
+                        st.rerun()
 
     # ---------------- Otherwise → Chatbot ---------------- #
     elif st.session_state.chat_history:
@@ -249,157 +302,264 @@ with tab_chat:
         if last_msg["role"] == "user":  # only if last was user input
             chosen_model = st.session_state.get("selected_model", "Default-Agent")
             payload = {"input": last_msg["text"], "user": user["username"], "model": chosen_model}
-            try:
-                res = api_post("/agent/", payload)
-                reply = res.get("output") or res.get("message") or "⚠️ Unexpected backend response."
-            except Exception as e:
-                reply = f"❌ Backend error: {e}"
+            with st.chat_message("assistant"):
+                reply = st.write_stream(agent_reply_stream(payload))
             st.session_state.chat_history.append({"role": "assistant", "text": reply})
             st.rerun()
 
 # --------------------------- FILES TAB --------------------------- #
 with tab_files:
     st.subheader("📁 Files (role-based access)")
-    allowed_categories = FILES_PERMISSIONS.get(user["role"], [])
-    visible = [f for f in FILES_DB if f["category"] in allowed_categories]
+    visible = FILES_DB   # already filtered to what this role may see
 
-    search = st.text_input("🔎 Search files")
+    c1, c2 = st.columns([3, 1])
+    search = c1.text_input("🔎 Search files")
+    category = c2.selectbox("Category", [""] + sorted({f.get("category") or "" for f in FILES_DB} - {""}))
     if search.strip():
-        visible = [f for f in visible if search.lower() in f["filename"].lower()]
+        # Prefix/typo search runs on the backend index, scoped to the role
+        try:
+            visible = api_get_conditional("/files/", {"role": user["role"], "q": search.strip(), "category": category})
+        except Exception as e:
+            st.error(f"Error searching files: {e}")
+            visible = []
+    elif category:
+        visible = [f for f in visible if f.get("category") == category]
 
     if not visible:
         st.info("No files available.")
     else:
         st.dataframe(pd.DataFrame(visible), use_container_width=True)
         for f in visible:
-            st.download_button(
+            # The browser streams the file straight from the backend (resumable via Range)
+            st.link_button(
                 f"📄 Download {f['filename']}",
-                data=f"Dummy data for {f['filename']}".encode(),
-                file_name=f['filename'],
-                key=f"dl_{f['filename']}"
+                f"{BACKEND_URL}/files/{f['id']}/download/?role={user['role']}",
             )
 
 # --------------------------- LOGS TAB --------------------------- #
-with tab_logs:
-    try:
-        logs = api_get("/logs/")
-    except Exception as e:
-        st.error(f"Error fetching logs: {e}")
-        logs = []
-
-    df = pd.DataFrame(logs or [])
-    if user["role"] == "user" and not df.empty and "user" in df.columns:
-        df = df[df["user"] == user["username"]]
-
+def show_logs(rows):
+    df = pd.DataFrame(rows)
     if not df.empty:
         st.dataframe(df, use_container_width=True, height=360)
     else:
         st.info("No logs available.")
 
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_logs_table(seed_rows, seed_cursor, only_user):
+    rows = live_table("logs", "logs", seed_rows, seed_cursor,
+                      match=lambda row: only_user is None or row["user"] == only_user)
+    show_logs(sorted(rows.values(), key=lambda r: (r["timestamp"], r["id"]), reverse=True))
+
+with tab_logs:
+    # Filters run server-side; users only ever see their own logs
+    c1, c2, c3 = st.columns(3)
+    if user["role"] == "user":
+        log_user = user["username"]
+        c1.text_input("User", value=log_user, disabled=True)
+    else:
+        log_user = c1.text_input("User", value="")
+    log_type = c2.selectbox("Type", ["", "install", "chat", "file", "system"],
+                            format_func=lambda t: t or "All")
+    log_range = c3.date_input("Date range", value=())
+
+    params = {"page_size": 100}
+    if log_user:
+        params["user"] = log_user
+    if log_type:
+        params["log_type"] = log_type
+    if len(log_range) == 2:
+        params["since"] = log_range[0].isoformat()
+        params["until"] = (log_range[1] + pd.Timedelta(days=1)).isoformat()
+
+    # Reset the cursor whenever the filters change
+    if st.session_state.get("log_filters") != params:
+        st.session_state.log_filters = params
+        st.session_state.log_cursor = None
+    # Unfiltered first page is already in the preloaded page data
+    default_view = params == ({"page_size": 100, "user": user["username"]} if user["role"] == "user" else {"page_size": 100})
+    if st.session_state.log_cursor:
+        params = {**params, "cursor": st.session_state.log_cursor}
+
+    if page_data and default_view and not st.session_state.log_cursor:
+        # Newest logs: the preloaded first page, kept current by the live feed
+        logs_page = page_data["logs"]
+        live_logs_table(logs_page["results"], page_data.get("live_cursor"), user["username"] if user["role"] == "user" else None)
+    else:
+        try:
+            logs_page = api_get_conditional("/logs/", params)
+        except Exception as e:
+            st.error(f"Error fetching logs: {e}")
+            logs_page = {"results": [], "next": None}
+        show_logs(logs_page.get("results") or [])
+
+    if user["role"] != "user":
+        with st.expander("📊 Last 30 days"):
+            try:
+                stats = api_get("/stats/")
+                reqs = stats["requests"]
+                c1, c2, c3 = st.columns(3)
+                c1.metric("Requests", reqs["created"])
+                c2.metric("Approval rate", f"{reqs['approval_rate']:.0%}" if reqs["approval_rate"] is not None else "–")
+                c3.metric("Installs", sum(i["count"] for i in stats["installs"]))
+                active = pd.DataFrame(stats["active_users"])
+                if not active.empty:
+                    st.bar_chart(active.set_index("day")["users"])
+                if stats["installs"]:
+                    st.dataframe(pd.DataFrame(stats["installs"]), use_container_width=True)
+            except Exception as e:
+                st.error(f"Error fetching stats: {e}")
+
+    nav1, nav2 = st.columns(2)
+    if st.session_state.log_cursor and nav1.button("⏮️ Newest"):
+        st.session_state.log_cursor = None
+        st.rerun()
+    if logs_page.get("next") and nav2.button("Older ▶️"):
+        st.session_state.log_cursor = parse_qs(urlparse(logs_page["next"]).query)["cursor"][0]
+        st.rerun()
+
 # --------------------------- TICKETS TAB --------------------------- #
 with tab_tickets:
     st.subheader("🎫 Ticket Tracking")
-    ticket_file = "tickets.xlsx"
+    page = st.number_input("Page", min_value=1, value=1, step=1, key="tickets_page")
+    params = {"page": page, "page_size": 25}
+    if user["role"] == "user":
+        params["user"] = user["username"]
 
-    if os.path.exists(ticket_file):
-        df_tickets = pd.read_excel(ticket_file)
-        if user["role"] == "user":
-            df_tickets = df_tickets[df_tickets["User"] == user["username"]]
+    try:
+        if page_data and page == 1:
+            tickets_page = page_data["tickets"]
+        else:
+            tickets_page = api_get_conditional("/tickets/", params)
+    except Exception as e:
+        st.error(f"Error fetching tickets: {e}")
+        tickets_page = {"count": 0, "results": []}
 
+    df_tickets = pd.DataFrame(tickets_page.get("results") or [])
+    if df_tickets.empty:
+        st.info("No tickets logged yet.")
+    else:
+        st.caption(f"{tickets_page['count']} tickets")
         st.dataframe(df_tickets, use_container_width=True)
 
-        if user["role"] in ["manager", "admin"] and not df_tickets.empty:
-            pending_tickets = df_tickets[df_tickets["Status"] == "Open"]
-            if not pending_tickets.empty:
-                chosen_id = st.selectbox("Select Pending Ticket", pending_tickets["TicketID"])
-                action_choice = st.radio("Action", ["Approve ✅", "Reject ❌"], horizontal=True)
-
-                if st.button("Submit Decision"):
-                    df_full = pd.read_excel(ticket_file)
-                    if action_choice == "Approve ✅":
-                        df_full.loc[df_full["TicketID"] == chosen_id, "Status"] = "Closed"
-                        df_full.to_excel(ticket_file, index=False)
-                        log_action_via_agent(f"SYSTEM: Ticket {chosen_id} deployment completed", user["username"])
+    if user["role"] in ["manager", "admin"]:
+        try:
+            if page_data:
+                pending_tickets = page_data["open_tickets"]
+            else:
+                pending_tickets = api_get_conditional("/tickets/", {"status": "open", "page_size": 200})["results"]
+        except Exception as e:
+            st.error(f"Error fetching open tickets: {e}")
+            pending_tickets = []
+
+        if pending_tickets:
+            chosen_id = st.selectbox("Select Pending Ticket", [t["ticket_id"] for t in pending_tickets])
+            action_choice = st.radio("Action", ["Approve ✅", "Reject ❌"], horizontal=True)
+
+            if st.button("Submit Decision"):
+                new_status = "closed" if action_choice == "Approve ✅" else "rejected"
+                try:
+                    api_post(f"/tickets/{chosen_id}/transition/", {"status": new_status, "by": user["username"]})
+                except requests.HTTPError as e:
+                    st.error(f"Could not update ticket {chosen_id}: {e}")
+                else:
+                    if new_status == "closed":
+                        log_action(f"SYSTEM: Ticket {chosen_id} deployment completed", user["username"])
                         st.success(f"🎉 Deployment finished! Ticket {chosen_id} closed.")
-                        st.session_state.show_download_modal = {"app": "Approved-App", "ver": "latest"}
-
-                    elif action_choice == "Reject ❌":
-                        df_full.loc[df_full["TicketID"] == chosen_id, "Status"] = "Closed"
-                        df_full.to_excel(ticket_file, index=False)
+                    else:
                         st.error(f"❌ Ticket {chosen_id} rejected.")
-
                     st.rerun()
-    else:
-        st.info("No tickets logged yet.")
 
 # --------------------------- REQUESTS TAB --------------------------- #
+def live_requests(seed_rows, seed_cursor):
+    rows = live_table("app_requests", "requests", seed_rows, seed_cursor)
+    return sorted(rows.values(), key=lambda r: (r["created_at"], r["id"]), reverse=True)
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_requests_table(seed_rows, seed_cursor):
+    st.dataframe(pd.DataFrame(live_requests(seed_rows, seed_cursor)), use_container_width=True)
+
 with tab_requests:
     st.subheader("📌 App Requests & Admin Approval")
-    req_file = "requests.xlsx"
-    if os.path.exists(req_file):
-        df_reqs = pd.read_excel(req_file)
-    else:
-        df_reqs = pd.DataFrame(columns=["RequestID","User","App","Version","Status"])
-
-    APP_ELIGIBILITY = {
-        "user": {"Zoom": ["latest", "5.0"]},
-        "manager": {"Zoom": ["latest", "5.0", "5.1"], "MS Excel": ["2019", "2021"]},
-        "admin": {
-            "MS Word": ["2016", "2019", "2021"],
-            "MS Excel": ["2016", "2019", "2021"],
-            "Zoom": ["5.0", "5.1", "latest"],
-            "Slack": ["4.20", "4.21", "latest"]
-        }
-    }
 
     if user["role"] == "user":
         req_app = st.selectbox("Select App", list(AVAILABLE_APPS.keys()))
         req_ver = st.selectbox("Select Version", AVAILABLE_APPS[req_app])
         if st.button("Submit Request"):
-            req_id = str(uuid.uuid4())[:8]
-            df_reqs = pd.concat([df_reqs, pd.DataFrame([{
-                "RequestID": req_id,
-                "User": user["username"],
-                "App": req_app,
-                "Version": req_ver,
-                "Status": "Pending",
-            }])], ignore_index=True)
-            df_reqs.to_excel(req_file, index=False)
-            st.success(f"✅ Request {req_id} submitted for {req_app} {req_ver}")
-            st.rerun()
+            try:
+                app_req = api_post("/app-requests/", {
+                    "app_name": req_app,
+                    "version": req_ver,
+                    "requested_by": user["username"],
+                })
+            except Exception as e:
+                st.error(f"Could not submit request: {e}")
+            else:
+                st.success(f"✅ Request {app_req['id']} submitted for {req_app} {req_ver}")
+                st.rerun()
 
     if user["role"] in ["manager","admin"]:
-        st.dataframe(df_reqs, use_container_width=True)
-        pending = df_reqs[df_reqs["Status"]=="Pending"]
-        if not pending.empty:
-            chosen_req_id = st.selectbox("Select Request", pending["RequestID"])
-            chosen_req = pending[pending["RequestID"] == chosen_req_id].iloc[0]
-            app_name, version, req_user = chosen_req["App"], chosen_req["Version"], chosen_req["User"]
-            req_role = "admin" if req_user=="admin" else ("manager" if req_user=="bob" else "user")
-            eligible = version in APP_ELIGIBILITY.get(req_role, {}).get(app_name, [])
-
-            if eligible: st.success("✅ Eligible")
-            else: st.error("⛔ Not Eligible")
-
+        if page_data:
+            # Preloaded list, kept current by the live feed (new requests and decisions from anywhere)
+            live_requests_table(page_data["app_requests"], page_data.get("live_cursor"))
+            reqs = live_requests(page_data["app_requests"], page_data.get("live_cursor"))
+        else:
+            try:
+                reqs = api_get("/app-requests/")
+            except Exception as e:
+                st.error(f"Error fetching requests: {e}")
+                reqs = []
+            st.dataframe(pd.DataFrame(reqs), use_container_width=True)
+
+        pending = {r["id"]: r for r in reqs if r["status"] == "pending"}
+        # Requester roles and policy are resolved by the backend, for all pending requests in one call
+        try:
+            checks = api_query("/eligibility/check/", {"checks": [
+                {"user": r["requested_by"], "app": r["app_name"], "version": r["version"]} for r in pending.values()
+            ]})["results"] if pending else []
+        except Exception as e:
+            st.warning(f"Could not check eligibility: {e}")
+            checks = [{"eligible": False}] * len(pending)
+        eligible_ids = {i for i, c in zip(pending, checks) if c["eligible"]}
+
+        def is_eligible(req):
+            return req["id"] in eligible_ids
+
+        if pending:
+            chosen_ids = st.multiselect(
+                "Select Requests", list(pending),
+                format_func=lambda i: f"#{i} {pending[i]['app_name']} {pending[i]['version']} ({pending[i]['requested_by']}) "
+                                      + ("✅ Eligible" if is_eligible(pending[i]) else "⛔ Not Eligible"),
+            )
             decision = st.selectbox("Decision", ["Approve","Reject"])
-            if st.button("Update Request"):
-                df_reqs.loc[df_reqs["RequestID"] == chosen_req_id, "Status"] = decision
-                df_reqs.to_excel(req_file, index=False)
-                if decision == "Approve" and eligible:
-                    st.session_state.show_download_modal = {"app": app_name, "ver": version}
-                st.rerun()
+            if st.button("Update Requests", disabled=not chosen_ids):
+                try:
+                    res = api_post("/app-requests/bulk-decide/", {
+                        "ids": chosen_ids,
+                        "decision": decision.lower(),
+                        "admin": user["username"],
+                    })
+                except Exception as e:
+                    st.error(f"Could not update requests: {e}")
+                else:
+                    st.success(res["message"])
+                    approved = [pending[i] for i in res["decided"] if i in pending]
+                    eligible = [r for r in approved if is_eligible(r)]
+                    if decision == "Approve" and eligible:
+                        # The installer link is for the requester: the package endpoint checks their eligibility
+                        st.session_state.show_download_modal = {
+                            "app": eligible[0]["app_name"], "ver": eligible[0]["version"],
+                            "user": eligible[0]["requested_by"],
+                        }
+                    st.rerun()
 
 # --------------------------- Modal Popup --------------------------- #
 if "show_download_modal" in st.session_state and st.session_state.show_download_modal:
     app_info = st.session_state.show_download_modal
     with st.modal("⬇️ Download Package"):
-        st.write(f"Here is your installer for **{app_info['app']} {app_info['ver']}**")
-        st.download_button(
-            "Download Now",
-            data=f"Dummy installer for {app_info['app']} {app_info['ver']}".encode(),
-            file_name=f"{app_info['app']}-{app_info['ver']}.zip",
-            mime="application/zip"
-        )
+        owner = app_info.get("user", user["username"])
+        whose = "your" if owner == user["username"] else f"{owner}'s"
+        st.write(f"Here is {whose} installer for **{app_info['app']} {app_info['ver']}**")
+        st.link_button("Download Now", package_url(app_info["app"], app_info["ver"], owner))
         if st.button("Close"):
             st.session_state.show_download_modal = None
             st.rerun()
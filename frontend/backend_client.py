@@ -0,0 +1,210 @@
+"""Shared HTTP client for the Django backend.
+
+One pooled keep-alive `requests.Session` per Streamlit server process (via
+st.cache_resource), explicit timeouts, and retry with exponential backoff for
+connection failures and transient 5xx on idempotent calls.
+
+LiveFeed keeps one /live/ event stream per server process for all sessions.
+"""
+import os, json, threading, time
+from collections import OrderedDict, deque
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+BACKEND_URL = os.environ.get("BACKEND_URL", "http://127.0.0.1:8000/api")
+TIMEOUT = (3.05, 30)          # (connect, read) seconds
+STREAM_TIMEOUT = (3.05, 120)  # token streams can be slow between chunks
+LIVE_TIMEOUT = (3.05, 60)     # the backend pings idle live streams every 15s
+LIVE_BUFFER = 5000            # live events kept for sessions catching up
+
+
+@st.cache_resource
+def get_session():
+    retry = Retry(
+        total=3,
+        connect=3,
+        read=2,
+        status=2,
+        backoff_factor=0.3,                     # 0.3s, 0.6s, 1.2s
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),   # never replay a POST after it reached the server
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def api_get(path, params=None):
+    r = get_session().get(f"{BACKEND_URL}{path}", params=params, timeout=TIMEOUT)
+    r.raise_for_status()
+    return r.json()
+
+VALIDATOR_CACHE_SIZE = 256   # cursor pages and filter combinations each get an entry
+
+@st.cache_resource
+def _validators():
+    """(path, params) → (etag, payload) of the last 200 seen, shared across sessions (LRU)"""
+    return OrderedDict(), threading.Lock()
+
+def api_get_conditional(path, params=None):
+    """GET with If-None-Match; a 304 reuses the payload we already have"""
+    key = (path, tuple(sorted((params or {}).items())))
+    store, lock = _validators()
+    with lock:
+        cached = store.get(key)
+    headers = {"If-None-Match": cached[0]} if cached else {}
+    r = get_session().get(f"{BACKEND_URL}{path}", params=params, headers=headers, timeout=TIMEOUT)
+    if r.status_code == 304 and cached:
+        with lock:
+            if key in store:
+                store.move_to_end(key)
+        return cached[1]
+    r.raise_for_status()
+    payload = r.json()
+    if r.headers.get("ETag"):
+        with lock:
+            store[key] = (r.headers["ETag"], payload)
+            store.move_to_end(key)
+            while len(store) > VALIDATOR_CACHE_SIZE:
+                store.popitem(last=False)
+    return payload
+
+def api_post(path, data=None):
+    r = get_session().post(f"{BACKEND_URL}{path}", json=data or {}, timeout=TIMEOUT)
+    r.raise_for_status()
+    load_page_data.clear()   # a write makes the preloaded page snapshot stale
+    return r.json()
+
+def api_query(path, data=None):
+    """POST a read-only query (e.g. batch lookups); unlike api_post it keeps the page snapshot"""
+    r = get_session().post(f"{BACKEND_URL}{path}", json=data or {}, timeout=TIMEOUT)
+    r.raise_for_status()
+    return r.json()
+
+def api_stream(path, data=None):
+    """POST and yield text chunks from a Server-Sent Events response"""
+    with get_session().post(f"{BACKEND_URL}{path}", json=data or {}, stream=True, timeout=STREAM_TIMEOUT) as r:
+        r.raise_for_status()
+        event = None
+        for line in r.iter_lines(decode_unicode=True):
+            if not line:
+                event = None
+            elif line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                payload = json.loads(line[len("data:"):])
+                if event is None:
+                    yield payload.get("delta", "")
+                elif event == "result":
+                    yield payload.get("message") or payload.get("detail") or ""
+                elif event == "error":
+                    yield f"❌ Backend error: {payload.get('detail')}"
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def load_config(role):
+    """Catalog, eligibility policy and role-visible files; revalidated with the backend at most once a minute"""
+    return api_get_conditional("/config/", {"role": role})
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def load_page_data(username, role):
+    """Everything a page load needs (logs, catalog, files, tickets, requests) in one round trip.
+
+    Cached for 30s so reruns don't refetch (the live tables are patched from
+    LiveFeed in between, starting at its live_cursor); returns
+    None when the backend has no /bootstrap/ endpoint, and tabs fall back to
+    their own calls.
+    """
+    try:
+        return api_get("/bootstrap/", {"user": username, "role": role})
+    except requests.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+            return None
+        raise
+
+
+# --------------------------- LIVE FEED --------------------------- #
+def _sse_events(response):
+    """(id, event, data) for each Server-Sent Event; comments (pings) are skipped"""
+    event_id, event, data = None, None, None
+    for line in response.iter_lines(decode_unicode=True):
+        if not line:
+            if data is not None:
+                yield event_id, event, data
+            event, data = None, None
+        elif line.startswith("id:"):
+            event_id = int(line[len("id:"):])
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data = json.loads(line[len("data:"):])
+
+
+class LiveFeed:
+    """Row changes from the backend's /live/ stream, shared by every session of this process.
+
+    Holds the last LIVE_BUFFER events as (event id, stream, key, row).
+    Reconnects with Last-Event-ID, so the backend replays what was missed.
+    A session seeded from /bootstrap/ at its live_cursor asks events_after(cursor);
+    None means the feed can't vouch for that range (it started later, reset,
+    or is not connected) and the session should reseed from a snapshot.
+    """
+
+    def __init__(self):
+        self._events = deque(maxlen=LIVE_BUFFER)
+        self._lock = threading.Lock()
+        self.base = None   # every event after this id is in the buffer
+        self._thread = threading.Thread(target=self._run, name="live-feed", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        last_id, delay = None, 1
+        while True:
+            headers = {"Last-Event-ID": str(last_id)} if last_id is not None else {}
+            try:
+                with get_session().get(f"{BACKEND_URL}/live/", params={"role": "admin"}, headers=headers,
+                                       stream=True, timeout=LIVE_TIMEOUT) as r:
+                    r.raise_for_status()   # 501 when the backend runs under WSGI
+                    delay = 1
+                    for event_id, event, data in _sse_events(r):
+                        self._apply(event_id, event, data)
+                        last_id = event_id
+            except (requests.RequestException, ValueError):
+                pass
+            time.sleep(delay)
+            delay = min(delay * 2, 30)
+
+    def _apply(self, event_id, event, data):
+        with self._lock:
+            if event in ("hello", "reset"):
+                self._events.clear()
+                self.base = event_id
+                return
+            if len(self._events) == self._events.maxlen:
+                self.base = self._events[0][0]   # about to be dropped
+            self._events.append((event_id, event, data["key"], data["row"]))
+
+    def events_after(self, cursor):
+        with self._lock:
+            if self.base is None or cursor is None or cursor < self.base:
+                return None
+            return [e for e in self._events if e[0] > cursor]
+
+    def latest(self, stream, key):
+        """Newest row seen for (stream, key), or None"""
+        with self._lock:
+            for _, event, event_key, row in reversed(self._events):
+                if event == stream and event_key == key:
+                    return row
+        return None
+
+
+@st.cache_resource
+def get_live_feed():
+    return LiveFeed()